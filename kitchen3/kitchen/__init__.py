@@ -27,15 +27,52 @@ Aggregate of a bunch of unrelated but helpful python modules.
 # Pylint disabled messages:
 # :C0103: We need gettext aliases for both unicode strings and byte strings.
 #   The byte string one (b_) triggers this warning.
-from kitchen import i18n
 from kitchen import versioning
 
-(_, N_) = i18n.easy_gettext_setup('kitchen.core')
+# The gettext functions for kitchen's own messages.  Setting up translations
+# means searching the locale directories and parsing message catalogs so we
+# put that off until the first message is translated.
+_gettext_funcs = {}
+
+class _LazyGettext(object):
+    '''Stand in for a gettext function that is set up on first use'''
+    __slots__ = ('_use_unicode', '_plural')
+
+    def __init__(self, use_unicode, plural):
+        self._use_unicode = use_unicode
+        self._plural = plural
+
+    def __call__(self, *args, **kwargs):
+        try:
+            funcs = _gettext_funcs[self._use_unicode]
+        except KeyError:
+            from kitchen import i18n
+            funcs = _gettext_funcs.setdefault(self._use_unicode,
+                    i18n.easy_gettext_setup('kitchen.core',
+                        use_unicode=self._use_unicode))
+        return funcs[self._plural](*args, **kwargs)
+
+_ = _LazyGettext(True, False)
+N_ = _LazyGettext(True, True)
 #pylint: disable-msg=C0103
-(b_, bN_) = i18n.easy_gettext_setup('kitchen.core', use_unicode=False)
+b_ = _LazyGettext(False, False)
+bN_ = _LazyGettext(False, True)
 #pylint: enable-msg=C0103
 
 __version_info__ = ((1, 2, 6),)
 __version__ = versioning.version_tuple_to_string(__version_info__)
 
+# Submodules are imported the first time they're accessed as attributes of the
+# package (PEP 562) so that importing kitchen doesn't load all of them
+_SUBMODULES = frozenset(('collections', 'exceptions', 'i18n', 'iterutils',
+    'pycompat24', 'pycompat25', 'pycompat27', 'release', 'text',
+    'versioning'))
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        # Importing a submodule sets it as an attribute of the package
+        __import__('%s.%s' % (__name__, name))
+        return globals()[name]
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
 __all__ = ('exceptions', 'release',)
@@ -89,17 +89,26 @@ See the documentation of :func:`easy_gettext_setup` and
 
 from kitchen.versioning import version_tuple_to_string
 
-__version_info__ = ((2, 2, 0),)
+__version_info__ = ((2, 3, 0),)
 __version__ = version_tuple_to_string(__version_info__)
 
+import collections.abc
+import contextvars
 import copy
 from errno import ENOENT
+import functools
 import gettext
 import itertools
 import locale
+import marshal
+import mmap
 import os
+import struct
 import sys
+import threading
+import time
 import warnings
+import weakref
 
 # We use the _default_localedir definition in get_translation_object
 try:
@@ -110,10 +119,261 @@ except ImportError:
 from kitchen.text.converters import to_bytes, to_unicode
 from kitchen.text.misc import byte_string_valid_encoding, isbasestring
 
+def _file_stamp(path):
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    return (file_stat.st_mtime_ns, file_stat.st_size)
+
+def _catalog_size(translation):
+    '''Estimate the memory used by a translation object's catalog'''
+    return _messages_size(getattr(translation, '_catalog', None))
+
+def _messages_size(catalog):
+    '''Estimate the memory used by a catalog'''
+    if type(catalog) is not dict:
+        # Catalogs that aren't dicts (LazyGNUTranslations) decode messages
+        # as they're used so there's not much to count up front
+        return sys.getsizeof(catalog)
+    size = sys.getsizeof(catalog)
+    for msgid, msgstr in catalog.items():
+        size += sys.getsizeof(msgid) + sys.getsizeof(msgstr)
+        if type(msgid) is tuple:
+            size += sys.getsizeof(msgid[0])
+    return size
+
+class _TranslationCache(object):
+    '''Thread-safe cache of the translation objects created for each
+    :term:`message catalog`
+
+    Entries are keyed by (translation class, path to the catalog).  Only one
+    thread loads a given catalog at a time; other threads asking for it wait
+    for that load to finish instead of parsing the file again.  The cache
+    may be bounded by number of entries and by an estimate of the memory
+    used by the catalogs.  The least recently used entries are evicted first.
+
+    Catalogs merged by :func:`get_translation_object` are kept here as well.
+    Their size counts toward the memory limit and they're dropped along with
+    any of the entries they were built from.
+    '''
+    def __init__(self, maxsize=None, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        # key => (translation, stamp, size)
+        self._entries = collections.OrderedDict()
+        # tuple of keys => (source catalogs, merged catalog, encoded entries,
+        # size)
+        self._merged = {}
+        # key => threading.Event set when the load finishes
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'reloads': 0, 'evictions': 0}
+
+    def get(self, key, load, revalidate=False):
+        '''Return the translation object for key, calling load() to create
+        it if necessary
+
+        :arg key: (translation class, path to the catalog)
+        :arg load: Function that creates the translation object
+        :kwarg revalidate: If :data:`True`, reload the catalog if its
+            modification time or size has changed since it was loaded
+        '''
+        path = key[1]
+        while True:
+            stamp = _file_stamp(path) if revalidate else None
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and (not revalidate or entry[1] == stamp):
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return entry[0]
+                loading = self._loading.get(key)
+                if loading is None:
+                    # Nobody is loading this catalog.  It's our job
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # Wait for the other thread then try again.  If its load failed
+            # we'll end up loading the catalog ourselves.
+            loading.wait()
+
+        try:
+            stamp = _file_stamp(path)
+            translation = load()
+            size = _catalog_size(translation)
+            with self._lock:
+                old_entry = self._entries.pop(key, None)
+                if old_entry is None:
+                    self._stats['misses'] += 1
+                else:
+                    self._bytes -= old_entry[2]
+                    self._drop_merged(key)
+                    self._stats['reloads'] += 1
+                self._entries[key] = (translation, stamp, size)
+                self._bytes += size
+                self._evict()
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+        return translation
+
+    def _evict(self):
+        # Called with the lock held.  Always keeps the newest entry
+        while len(self._entries) > 1 and (
+                (self.maxsize is not None and len(self._entries) > self.maxsize)
+                or (self.maxbytes is not None and self._bytes > self.maxbytes)):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry[2]
+            # Merged catalogs hold on to the evicted catalog
+            self._drop_merged(key)
+            self._stats['evictions'] += 1
+
+    def _drop_merged(self, key):
+        # Called with the lock held
+        for merged_key in [k for k in self._merged if key in k]:
+            self._bytes -= self._merged.pop(merged_key)[3]
+
+    def get_merged(self, keys, sources):
+        '''Return a catalog with the entries of all of the sources
+
+        :arg keys: The keys of the entries that the sources came from
+        :arg sources: The catalogs to merge.  Earlier catalogs win.
+        :returns: tuple of (merged catalog, dict to cache encoded entries of
+            the merged catalog in)
+        '''
+        with self._lock:
+            cached = self._merged.get(keys)
+            if cached is not None and len(cached[0]) == len(sources) and \
+                    all(old is new for old, new in zip(cached[0], sources)):
+                return cached[1:3]
+
+        merged = {}
+        for catalog in reversed(sources):
+            merged.update(catalog)
+        encoded = {}
+        size = _messages_size(merged)
+        with self._lock:
+            # Only keep it while all of the catalogs it was built from are
+            # cached.  Otherwise nothing would ever drop it
+            if all(key in self._entries for key in keys):
+                old = self._merged.pop(keys, None)
+                if old is not None:
+                    self._bytes -= old[3]
+                self._merged[keys] = (sources, merged, encoded, size)
+                self._bytes += size
+                self._evict()
+        return merged, encoded
+
+    def set_limits(self, maxsize=None, maxbytes=None):
+        with self._lock:
+            self.maxsize = maxsize
+            self.maxbytes = maxbytes
+            self._evict()
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+                self._drop_merged(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._merged.clear()
+            self._bytes = 0
+            for counter in self._stats:
+                self._stats[counter] = 0
+
+    def info(self):
+        with self._lock:
+            info = dict(self._stats)
+            info['entries'] = len(self._entries)
+            info['merged'] = len(self._merged)
+            info['bytes'] = self._bytes
+            info['maxsize'] = self.maxsize
+            info['maxbytes'] = self.maxbytes
+            info['paths'] = [key[1] for key in self._entries]
+        return info
+
+    def _after_fork(self):
+        # A thread that held the lock or was loading a catalog when the
+        # process forked doesn't exist in the child.  Start over with a new
+        # lock and no loads in progress
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
 # We cache parts of the translation objects just like stdlib's gettext so that
 # we don't reparse the message files and keep them in memory separately if the
 # same catalog is opened twice.
-_translations = {}
+_translations = _TranslationCache()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_translations._after_fork)
+# Message catalogs found by get_translation_object.  Keyed by (domain,
+# localedirs, languages).  Values are (mofiles, probes, stamp) where probes is
+# the number of paths checked to find the mofiles and stamp holds the
+# modification times used to revalidate the entry.
+_discovery_cache = {}
+_discovery_stats = {'hits': 0, 'misses': 0, 'stale': 0, 'probes': 0,
+        'probes_saved': 0}
+# Guards _discovery_cache and _discovery_stats.  The filesystem is searched
+# without holding it
+_discovery_lock = threading.Lock()
+# Language lists expanded the way gettext.find does it
+_expanded_languages = {}
+
+# Bump when the format of the compiled catalog cache files changes
+_CATALOG_CACHE_VERSION = 1
+
+# Plural functions look up the plural index for 0 <= n < _PLURAL_TABLE_SIZE in
+# a precomputed table.  Keyed by the Plural-Forms expression so catalogs for
+# the same language share a table.
+_PLURAL_TABLE_SIZE = 1001
+_plural_functions = {}
+
+# Returned by _get_cached_result() when there is no usable cached result
+_NOT_CACHED = object()
+
+class _ApiMethod(object):
+    '''Bind one of the gettext methods the first time it's used
+
+    :class:`DummyTranslations` implements the python2 and python3 gettext
+    APIs with private methods.  This descriptor picks the one that matches
+    the object's :attr:`~DummyTranslations.python2_api` and saves the bound
+    method on the object so later lookups are plain attribute accesses.
+    Objects that never use a method don't pay for binding it.
+    '''
+    __slots__ = ('name', 'python2_method', 'python3_method')
+
+    def __init__(self, name, python2_method, python3_method):
+        self.name = name
+        self.python2_method = python2_method
+        # None means the method doesn't exist in the python3 API
+        self.python3_method = python3_method
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return getattr(objtype, self.python3_method or self.python2_method)
+        if obj._python2_api:
+            method = getattr(obj, self.python2_method)
+        elif self.python3_method:
+            method = getattr(obj, self.python3_method)
+        else:
+            method = obj._removed_method_factory(self.name)
+        obj.__dict__[self.name] = method
+        return method
+
+_API_METHODS = ('gettext', 'lgettext', 'ugettext', 'ngettext', 'lngettext',
+        'ungettext')
 
 class DummyTranslations(gettext.NullTranslations):
     '''Safer version of :class:`gettext.NullTranslations`
@@ -203,9 +463,41 @@ class DummyTranslations(gettext.NullTranslations):
 
     .. versionchanged:: kitchen-1.2.0 ; API kitchen.i18n 2.2.0
         Add python2_api parameter to __init__()
+    .. versionchanged:: kitchen-1.3.0 ; API kitchen.i18n 2.3.0
+        * Add a per-object cache of translation results and
+          :meth:`clear_cache` to empty it.  See :attr:`result_cache_size`.
+        * Add :meth:`gettext_many` and :meth:`ngettext_many` to translate
+          several messages at once.
+        * The gettext methods for the selected API are bound to the object
+          the first time each one is used instead of whenever the object is
+          created, copied, or :attr:`python2_api` is set.
+
+    .. attribute:: result_cache_size
+
+        Maximum number of translation results remembered by this object.
+        :class:`NewGNUTranslations` caches the final value returned for each
+        msgid, method, and :attr:`output_charset` so that repeated lookups
+        skip converting the msgid and re-encoding the result.  The cache is
+        emptied whenever :meth:`set_output_charset`, :attr:`input_charset`,
+        or :meth:`add_fallback` change how messages are translated.  Set this
+        to ``0`` to disable the cache.
+
+        .. note:: :meth:`lgettext` and :meth:`lngettext` use
+            :func:`locale.getpreferredencoding` when :attr:`output_charset`
+            is not set.  If your program changes the locale after
+            translating messages, call :meth:`clear_cache` so that the new
+            locale's encoding is used.
     '''
     #pylint: disable-msg=C0103,C0111
+    result_cache_size = 4096
+
     def __init__(self, fp=None, python2_api=True):
+        # Oldest entries first so they can be evicted with popitem()
+        self._result_cache = collections.OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        # Encoded catalog entries.  Unlike the result cache, this is shared
+        # with copies of the object since they share the catalog
+        self._encoded_catalogs = {}
         gettext.NullTranslations.__init__(self, fp)
 
         # Python 2.3 compat
@@ -227,19 +519,112 @@ class DummyTranslations(gettext.NullTranslations):
                     ' switching to the python3 api by setting'
                     ' python2_api=False when creating the gettext object',
                     PendingDeprecationWarning, stacklevel=2)
-            self.gettext = self._gettext
-            self.lgettext = self._lgettext
-            self.ugettext = self._ugettext
-            self.ngettext = self._ngettext
-            self.lngettext = self._lngettext
-            self.ungettext = self._ungettext
-        else:
-            self.gettext = self._ugettext
-            self.lgettext = self._lgettext
-            self.ngettext = self._ungettext
-            self.lngettext = self._lngettext
-            self.ugettext = self._removed_method_factory('ugettext')
-            self.ungettext = self._removed_method_factory('ungettext')
+        # Forget methods bound for the other API.  The _ApiMethod
+        # descriptors bind the right ones when they're next used.
+        for name in _API_METHODS:
+            self.__dict__.pop(name, None)
+
+    def __copy__(self):
+        # Shallow copies share the message catalog but get their own result
+        # cache since their fallbacks and charsets may differ
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new._result_cache = collections.OrderedDict()
+        new._result_cache_lock = threading.Lock()
+        # Methods bound to self must be bound to the copy instead
+        for name in _API_METHODS:
+            new.__dict__.pop(name, None)
+        return new
+
+    def _new_view(self, python2_api, output_charset=None):
+        # A copy that shares the catalog, charset, and plural function with
+        # this object but has its own API, output charset, and fallbacks.
+        # get_translation_object() uses this for each catalog in the stacks
+        # it returns.  Setting the attributes directly skips the
+        # python2_api property (which would warn once per catalog) and
+        # set_output_charset() (which has no cache or fallbacks to update
+        # on a new object)
+        new = self.__copy__()
+        new._python2_api = python2_api
+        if output_charset:
+            new._output_charset = output_charset
+        return new
+
+    def clear_cache(self):
+        '''Forget all of the cached translation results
+
+        This is called automatically whenever the charsets or fallbacks of
+        this object change.  Call it yourself if something else that the
+        translations depend on changes (for instance, the locale).
+
+        .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+        '''
+        with self._result_cache_lock:
+            self._result_cache.clear()
+
+    def _get_cached_result(self, key):
+        try:
+            return self._result_cache.get(key, _NOT_CACHED)
+        except TypeError:
+            # A message that isn't hashable can't be cached
+            return _NOT_CACHED
+
+    def _cache_result(self, key, result):
+        cache = self._result_cache
+        if self.result_cache_size <= 0:
+            return result
+        try:
+            hash(key)
+        except TypeError:
+            # A message that isn't hashable can't be cached
+            return result
+        with self._result_cache_lock:
+            while len(cache) >= self.result_cache_size:
+                cache.popitem(last=False)
+            cache[key] = result
+        return result
+
+    def add_fallback(self, fallback):
+        '''Add a translation object to look up messages we don't have
+
+        Adding a fallback may change the results of lookups so this also
+        clears the result cache.
+        '''
+        self.clear_cache()
+        gettext.NullTranslations.add_fallback(self, fallback)
+
+    def gettext_many(self, messages):
+        '''Translate several messages at once
+
+        :arg messages: Iterable of messages to translate
+        :returns: :class:`list` with the result of calling :meth:`gettext`
+            on each message, in the same order
+
+        This is meant for code that translates a lot of strings in one go,
+        for instance, a template engine translating all of a template's
+        strings when it compiles the template.  The method that does the
+        translating is looked up once for the whole batch and
+        :class:`NewGNUTranslations` also skips most of the per call work
+        for messages that it has already translated.
+
+        .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+        '''
+        gettext_ = self.gettext
+        return [gettext_(message) for message in messages]
+
+    def ngettext_many(self, messages):
+        '''Translate several messages with plural forms at once
+
+        :arg messages: Iterable of ``(msgid1, msgid2, n)`` tuples
+        :returns: :class:`list` with the result of calling :meth:`ngettext`
+            on each tuple, in the same order
+
+        .. seealso:: :meth:`gettext_many`
+
+        .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+        '''
+        ngettext_ = self.ngettext
+        return [ngettext_(msgid1, msgid2, n) for msgid1, msgid2, n in messages]
 
     def _removed_method_factory(self, name):
         def _removed_method(*args, **kwargs):
@@ -257,6 +642,7 @@ class DummyTranslations(gettext.NullTranslations):
     python2_api = property(_get_python2_api, _set_python2_api)
 
     def _set_input_charset(self, charset):
+        self.clear_cache()
         if self._fallback:
             try:
                 self._fallback.input_charset = charset
@@ -276,7 +662,9 @@ class DummyTranslations(gettext.NullTranslations):
         :meth:`gettext.NullTranslations.set_output_charset` does not set the
         output on fallback objects.  On python-2.3,
         :class:`gettext.NullTranslations` objects don't contain this method.
+        Setting the output charset also clears the result cache.
         '''
+        self.clear_cache()
         if self._fallback:
             try:
                 self._fallback.set_output_charset(charset)
@@ -292,6 +680,15 @@ class DummyTranslations(gettext.NullTranslations):
             '''Compatibility for python2.3 which doesn't have output_charset'''
             return self._output_charset
 
+    # These shadow the gettext module in the rest of the class body so they
+    # come after the code above that uses it
+    gettext = _ApiMethod('gettext', '_gettext', '_ugettext')
+    lgettext = _ApiMethod('lgettext', '_lgettext', '_lgettext')
+    ugettext = _ApiMethod('ugettext', '_ugettext', None)
+    ngettext = _ApiMethod('ngettext', '_ngettext', '_ungettext')
+    lngettext = _ApiMethod('lngettext', '_lngettext', '_lngettext')
+    ungettext = _ApiMethod('ungettext', '_ungettext', None)
+
     def _reencode_if_necessary(self, message, output_encoding):
         '''Return a byte string that's valid in a specific charset.
 
@@ -512,15 +909,60 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
         neither of those, :term:`UTF-8`.  With :meth:`lgettext` and
         :meth:`lngettext` :attr:`output_charset` if set, otherwise
         :func:`locale.getpreferredencoding`.
+    .. versionchanged:: kitchen-1.3.0 ; API kitchen.i18n 2.3.0
+        Remember the result of each lookup, keyed by msgid, method, and
+        :attr:`output_charset`, so that repeated lookups of the same message
+        are a single dict access.  See
+        :attr:`DummyTranslations.result_cache_size`.  The plural form for
+        counts from 0 to 1000 is looked up in a table computed once per
+        Plural-Forms expression instead of evaluating the expression on
+        every call.  The byte :class:`bytes` form of each catalog entry is
+        remembered per output charset and shared by every translation object
+        that uses the catalog, so :meth:`gettext`, :meth:`ngettext`,
+        :meth:`lgettext`, and :meth:`lngettext` only encode a translation once.
     '''
     #pylint: disable-msg=C0103,C0111
+    # The whole catalog is parsed into a dict so it can be saved in
+    # a compiled catalog cache.  Subclasses that override _parse() to store
+    # more than _catalog, _charset, _info, and plural must set this to False
+    _catalog_cacheable = True
+
     def _parse(self, fp):
         gettext.GNUTranslations._parse(self, fp)
+        # Replace the plural function gettext compiled with one that looks
+        # up common values of n in a precomputed table
+        self.plural = _plural_function(_plural_expression(self._info))
+
+    def _encode_entry(self, catalog_key, tmsg, output_encoding):
+        # The encoded form of each catalog entry is kept per output encoding
+        # in a dict that's shared by every copy of this object so an entry
+        # is only encoded once no matter how many translation objects use
+        # the catalog
+        try:
+            encoded = self._encoded_catalogs[output_encoding]
+        except KeyError:
+            encoded = self._encoded_catalogs.setdefault(output_encoding, {})
+        try:
+            return encoded[catalog_key]
+        except KeyError:
+            pass
+        if tmsg.__class__ is not str:
+            # Subclasses may store other things in the catalog
+            return self._reencode_if_necessary(tmsg, output_encoding)
+        result = encoded[catalog_key] = to_bytes(tmsg, encoding=output_encoding)
+        return result
 
     def _gettext(self, message):
         if not isbasestring(message):
             return b''
+        key = (message, 'gettext', self._output_charset)
+        result = self._get_cached_result(key)
+        if result is not _NOT_CACHED:
+            return result
         tmsg = message
+        # Decide what encoding to use for the strings we return
+        output_encoding = (self._output_charset or self._charset or
+                self.input_charset)
         u_message = to_unicode(message, encoding=self.input_charset)
         try:
             tmsg = self._catalog[u_message] #pylint:disable-msg=E1101
@@ -531,12 +973,11 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
                 except (AttributeError, UnicodeError):
                     # Ignore UnicodeErrors: We'll do our own encoding next
                     pass
+            return self._cache_result(key,
+                    self._reencode_if_necessary(tmsg, output_encoding))
 
-        # Next decide what encoding to use for the strings we return
-        output_encoding = (self._output_charset or self._charset or
-                self.input_charset)
-
-        return self._reencode_if_necessary(tmsg, output_encoding)
+        return self._cache_result(key,
+                self._encode_entry(u_message, tmsg, output_encoding))
 
     def _ngettext(self, msgid1, msgid2, n):
         if n == 1:
@@ -546,10 +987,18 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
 
         if not isbasestring(msgid1):
             return b''
+        key = (msgid1, msgid2, n, 'ngettext', self._output_charset)
+        result = self._get_cached_result(key)
+        if result is not _NOT_CACHED:
+            return result
+        # Decide what encoding to use for the strings we return
+        output_encoding = (self._output_charset or self._charset or
+                self.input_charset)
         u_msgid1 = to_unicode(msgid1, encoding=self.input_charset)
+        catalog_key = (u_msgid1, self.plural(n))
         try:
             #pylint:disable-msg=E1101
-            tmsg = self._catalog[(u_msgid1, self.plural(n))]
+            tmsg = self._catalog[catalog_key]
         except KeyError:
             if self._fallback:
                 try:
@@ -557,17 +1006,23 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
                 except (AttributeError, UnicodeError):
                     # Ignore UnicodeErrors: We'll do our own encoding next
                     pass
+            return self._cache_result(key,
+                    self._reencode_if_necessary(tmsg, output_encoding))
 
-        # Next decide what encoding to use for the strings we return
-        output_encoding = (self._output_charset or self._charset or
-                self.input_charset)
-
-        return self._reencode_if_necessary(tmsg, output_encoding)
+        return self._cache_result(key,
+                self._encode_entry(catalog_key, tmsg, output_encoding))
 
     def _lgettext(self, message):
         if not isbasestring(message):
             return b''
+        key = (message, 'lgettext', self._output_charset)
+        result = self._get_cached_result(key)
+        if result is not _NOT_CACHED:
+            return result
         tmsg = message
+        # Decide what encoding to use for the strings we return
+        output_encoding = (self._output_charset or
+                locale.getpreferredencoding())
         u_message = to_unicode(message, encoding=self.input_charset)
         try:
             tmsg = self._catalog[u_message] #pylint:disable-msg=E1101
@@ -578,12 +1033,11 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
                 except (AttributeError, UnicodeError):
                     # Ignore UnicodeErrors: We'll do our own encoding next
                     pass
+            return self._cache_result(key,
+                    self._reencode_if_necessary(tmsg, output_encoding))
 
-        # Next decide what encoding to use for the strings we return
-        output_encoding = (self._output_charset or
-                locale.getpreferredencoding())
-
-        return self._reencode_if_necessary(tmsg, output_encoding)
+        return self._cache_result(key,
+                self._encode_entry(u_message, tmsg, output_encoding))
 
     def _lngettext(self, msgid1, msgid2, n):
         if n == 1:
@@ -593,10 +1047,18 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
 
         if not isbasestring(msgid1):
             return b''
+        key = (msgid1, msgid2, n, 'lngettext', self._output_charset)
+        result = self._get_cached_result(key)
+        if result is not _NOT_CACHED:
+            return result
+        # Decide what encoding to use for the strings we return
+        output_encoding = (self._output_charset or
+                locale.getpreferredencoding())
         u_msgid1 = to_unicode(msgid1, encoding=self.input_charset)
+        catalog_key = (u_msgid1, self.plural(n))
         try:
             #pylint:disable-msg=E1101
-            tmsg = self._catalog[(u_msgid1, self.plural(n))]
+            tmsg = self._catalog[catalog_key]
         except KeyError:
             if self._fallback:
                 try:
@@ -604,17 +1066,20 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
                 except (AttributeError, UnicodeError):
                     # Ignore UnicodeErrors: We'll do our own encoding next
                     pass
+            return self._cache_result(key,
+                    self._reencode_if_necessary(tmsg, output_encoding))
 
-        # Next decide what encoding to use for the strings we return
-        output_encoding = (self._output_charset or
-                locale.getpreferredencoding())
-
-        return self._reencode_if_necessary(tmsg, output_encoding)
+        return self._cache_result(key,
+                self._encode_entry(catalog_key, tmsg, output_encoding))
 
 
     def _ugettext(self, message):
         if not isbasestring(message):
             return ''
+        key = (message, 'ugettext', None)
+        result = self._get_cached_result(key)
+        if result is not _NOT_CACHED:
+            return result
         message = to_unicode(message, encoding=self.input_charset)
         try:
             message = self._catalog[message] #pylint:disable-msg=E1101
@@ -627,7 +1092,8 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
                     pass
 
         # Make sure that we're returning unicode
-        return to_unicode(message, encoding=self.input_charset)
+        return self._cache_result(key,
+                to_unicode(message, encoding=self.input_charset))
 
     def _ungettext(self, msgid1, msgid2, n):
         if n == 1:
@@ -637,6 +1103,10 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
 
         if not isbasestring(msgid1):
             return ''
+        key = (msgid1, msgid2, n, 'ungettext', None)
+        result = self._get_cached_result(key)
+        if result is not _NOT_CACHED:
+            return result
         u_msgid1 = to_unicode(msgid1, encoding=self.input_charset)
         try:
             #pylint:disable-msg=E1101
@@ -650,12 +1120,698 @@ class NewGNUTranslations(DummyTranslations, gettext.GNUTranslations):
                     pass
 
         # Make sure that we're returning unicode
-        return to_unicode(tmsg, encoding=self.input_charset,
-                nonstring='empty')
+        return self._cache_result(key, to_unicode(tmsg,
+                encoding=self.input_charset, nonstring='empty'))
+
+    def gettext_many(self, messages):
+        if self._python2_api:
+            return DummyTranslations.gettext_many(self, messages)
+        # Same results as _ugettext() but everything that doesn't change
+        # between messages is looked up once.  Anything other than a str
+        # message with a str translation (or no translation and no
+        # fallback) goes through _ugettext()
+        cache = self._result_cache
+        catalog = self._catalog #pylint:disable-msg=E1101
+        fallback = self._fallback
+        ugettext = self._ugettext
+        results = []
+        for message in messages:
+            try:
+                result = cache.get((message, 'ugettext', None), _NOT_CACHED)
+            except TypeError:
+                result = ugettext(message)
+            else:
+                if result is _NOT_CACHED:
+                    if message.__class__ is str:
+                        result = catalog.get(message)
+                        if result is None and not fallback:
+                            result = message
+                    if result.__class__ is str:
+                        result = self._cache_result((message, 'ugettext',
+                            None), result)
+                    else:
+                        result = ugettext(message)
+            results.append(result)
+        return results
+
+    def ngettext_many(self, messages):
+        if self._python2_api:
+            return DummyTranslations.ngettext_many(self, messages)
+        # See gettext_many()
+        cache = self._result_cache
+        catalog = self._catalog #pylint:disable-msg=E1101
+        plural = self.plural #pylint:disable-msg=E1101
+        fallback = self._fallback
+        ungettext = self._ungettext
+        results = []
+        for msgid1, msgid2, n in messages:
+            key = (msgid1, msgid2, n, 'ungettext', None)
+            try:
+                result = cache.get(key, _NOT_CACHED)
+            except TypeError:
+                result = ungettext(msgid1, msgid2, n)
+            else:
+                if result is _NOT_CACHED:
+                    if msgid1.__class__ is str:
+                        result = catalog.get((msgid1, plural(n)))
+                        if result is None and not fallback:
+                            result = msgid1 if n == 1 else msgid2
+                    if result.__class__ is str:
+                        result = self._cache_result(key, result)
+                    else:
+                        result = ungettext(msgid1, msgid2, n)
+            results.append(result)
+        return results
+
+
+def _mo_hash(b_msgid):
+    '''Hash a byte :class:`bytes` the same way GNU gettext does when it
+    builds the hash table in a :term:`message catalog`
+    '''
+    hval = 0
+    for char in b_msgid:
+        hval = (hval << 4) + char
+        high_bits = hval & ~0xfffffff
+        if high_bits:
+            hval ^= high_bits >> 24
+            hval ^= high_bits
+    return hval
+
+class _LazyCatalog(collections.abc.Mapping):
+    '''Read-only mapping over the messages in a :term:`message catalog`
+
+    This has the same keys and values as the :attr:`_catalog` dict that
+    :class:`gettext.GNUTranslations` builds but messages are only found and
+    decoded when they are looked up.  Messages are found using the hash table
+    in the file if it has one, otherwise by a binary search of the sorted
+    table of original strings.  Decoded messages are remembered.
+    '''
+    def __init__(self, buf, byteorder, num_strings, orig_table, trans_table,
+            hash_size, hash_table, filename=''):
+        self._buf = buf
+        self._buflen = len(buf)
+        self._entry = struct.Struct(byteorder + 'II')
+        self._word = struct.Struct(byteorder + 'I')
+        self._num_strings = num_strings
+        self._orig_table = orig_table
+        self._trans_table = trans_table
+        # Hash tables need at least three slots for the double hashing
+        self._hash_size = hash_size if hash_size > 2 else 0
+        self._hash_table = hash_table
+        self._filename = filename
+        self._entries = {}
+        self._len = None
+        self.charset = 'ascii'
+
+    def _string(self, table, index):
+        length, offset = self._entry.unpack_from(self._buf, table + index * 8)
+        if offset + length >= self._buflen:
+            raise OSError(0, 'File is corrupt', self._filename)
+        return self._buf[offset:offset + length]
+
+    def _find(self, b_msgid):
+        '''Return the index of a msgid in the original strings table or -1'''
+        if self._hash_size:
+            hval = _mo_hash(b_msgid)
+            idx = hval % self._hash_size
+            incr = 1 + (hval % (self._hash_size - 2))
+            while True:
+                string_num = self._word.unpack_from(self._buf,
+                        self._hash_table + idx * 4)[0]
+                if not string_num:
+                    return -1
+                # Plural entries have the msgid_plural after a NUL byte
+                if self._string(self._orig_table,
+                        string_num - 1).split(b'\x00', 1)[0] == b_msgid:
+                    return string_num - 1
+                if idx >= self._hash_size - incr:
+                    idx -= self._hash_size - incr
+                else:
+                    idx += incr
+
+        low = 0
+        high = self._num_strings
+        while low < high:
+            middle = (low + high) // 2
+            original = self._string(self._orig_table,
+                    middle).split(b'\x00', 1)[0]
+            if original < b_msgid:
+                low = middle + 1
+            elif original > b_msgid:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def _decode_entry(self, index):
+        translation = self._string(self._trans_table, index)
+        if b'\x00' in self._string(self._orig_table, index):
+            return tuple(str(tmsg, self.charset)
+                    for tmsg in translation.split(b'\x00'))
+        return str(translation, self.charset)
+
+    def _lookup(self, msgid):
+        try:
+            return self._entries[msgid]
+        except KeyError:
+            pass
+        if not isinstance(msgid, str):
+            raise KeyError(msgid)
+        try:
+            index = self._find(msgid.encode(self.charset))
+        except UnicodeError:
+            # Can't be in the catalog if it can't be encoded in its charset
+            index = -1
+        if index < 0:
+            raise KeyError(msgid)
+        entry = self._entries[msgid] = self._decode_entry(index)
+        return entry
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            msgid, plural_index = key
+            entry = self._lookup(msgid)
+            if isinstance(entry, tuple) and isinstance(plural_index, int) \
+                    and 0 <= plural_index < len(entry):
+                return entry[plural_index]
+            raise KeyError(key)
+        entry = self._lookup(key)
+        if isinstance(entry, tuple):
+            raise KeyError(key)
+        return entry
+
+    def __iter__(self):
+        for index in range(self._num_strings):
+            msgid = self._string(self._orig_table, index).split(b'\x00', 1)[0]
+            msgid = str(msgid, self.charset)
+            entry = self._entries.get(msgid)
+            if entry is None:
+                entry = self._entries[msgid] = self._decode_entry(index)
+            if isinstance(entry, tuple):
+                for plural_index in range(len(entry)):
+                    yield (msgid, plural_index)
+            else:
+                yield msgid
+
+    def __len__(self):
+        if self._len is None:
+            self._len = sum(1 for key in self)
+        return self._len
+
+
+class LazyGNUTranslations(NewGNUTranslations):
+    ''':class:`NewGNUTranslations` that reads messages from the
+    :term:`message catalog` only when they are looked up
+
+    :class:`gettext.GNUTranslations` decodes every message in the
+    :term:`message catalog` into a dict when the object is created.  This
+    class memory maps the file instead and looks messages up with the file's
+    own hash table (or a binary search of its sorted msgids if it doesn't
+    have one).  Only the messages that are actually used are decoded and those
+    are remembered for later lookups.  This makes startup faster and uses
+    less memory for programs that load large catalogs but only use a few of
+    the messages in them.  Since the mapped pages belong to the page cache,
+    they're shared between processes that use the same catalog.
+
+    Use it by passing it as the ``class_`` parameter of
+    :func:`get_translation_object`::
+
+        translations = get_translation_object('foo',
+                class_=LazyGNUTranslations)
+
+    If the file object that is passed in isn't backed by a real file (for
+    instance, :class:`io.BytesIO`), its contents are read into memory and
+    lookups are done on that copy instead.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    #pylint: disable-msg=C0103,C0111
+    _catalog_cacheable = False
+
+    def _parse(self, fp):
+        filename = getattr(fp, 'name', '')
+        self.plural = _plural_function(None) # germanic plural by default
+        try:
+            buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):
+            # Not backed by a real file (for instance, io.BytesIO) or an
+            # empty file which can't be mmapped
+            buf = fp.read()
+
+        if len(buf) < 28:
+            raise OSError(0, 'Bad magic number', filename)
+        magic = struct.unpack('<I', buf[:4])[0]
+        if magic == self.LE_MAGIC:
+            byteorder = '<'
+        elif magic == self.BE_MAGIC:
+            byteorder = '>'
+        else:
+            raise OSError(0, 'Bad magic number', filename)
+        (version, num_strings, orig_table, trans_table, hash_size,
+                hash_table) = struct.unpack(byteorder + '6I', buf[4:28])
+
+        major_version = self._get_versions(version)[0]
+        if major_version not in self.VERSIONS:
+            raise OSError(0, 'Bad version number ' + str(major_version),
+                    filename)
+
+        self._catalog = catalog = _LazyCatalog(buf, byteorder, num_strings,
+                orig_table, trans_table, hash_size, hash_table, filename)
+
+        # The metadata is the translation of the empty msgid
+        index = catalog._find(b'')
+        if index >= 0:
+            self._parse_metadata(catalog._string(trans_table, index))
+        catalog.charset = self._charset or 'ascii'
+
+    def _parse_metadata(self, tmsg):
+        # Adapted from gettext.GNUTranslations._parse
+        lastk = None
+        for b_item in tmsg.split(b'\n'):
+            item = b_item.decode().strip()
+            if not item:
+                continue
+            # Skip over comment lines:
+            if item.startswith('#-#-#-#-#') and item.endswith('#-#-#-#-#'):
+                continue
+            k = v = None
+            if ':' in item:
+                k, v = item.split(':', 1)
+                k = k.strip().lower()
+                v = v.strip()
+                self._info[k] = v
+                lastk = k
+            elif lastk:
+                self._info[lastk] += '\n' + item
+            if k == 'content-type':
+                self._charset = v.split('charset=')[1]
+            elif k == 'plural-forms':
+                v = v.split(';')
+                plural = v[1].split('plural=')[1]
+                self.plural = _plural_function(plural)
+
+
+def _merge_catalogs(translations, keys):
+    '''Flatten the catalogs of stacked translation objects into one dict
+
+    :arg translations: List of translation objects in lookup order
+    :arg keys: The translation cache keys of the objects.  Used to share
+        the merged catalog between calls.
+    :returns: List of translation objects to stack.  The first object's
+        catalog contains the entries of every catalog that could be merged
+        (earlier catalogs win) and those objects are left out of the list.
+
+    Merging stops at the first object that doesn't have a catalog or whose
+    plural forms differ from the first object's since plural entries are
+    keyed on the index that the catalog's plural function returns.  Those
+    objects and the ones after them are returned so that they remain in the
+    fallback chain.
+    '''
+    first = translations[0]
+    if not hasattr(first, '_catalog'):
+        return translations
+
+    plural_forms = first._info.get('plural-forms')
+    num_merged = 1
+    for translation in translations[1:]:
+        if not hasattr(translation, '_catalog') or \
+                getattr(translation, '_info', {}).get('plural-forms') != plural_forms:
+            break
+        num_merged += 1
+    if num_merged == 1:
+        return translations
+
+    # The source catalogs are compared so that a merged catalog is rebuilt
+    # when one of the catalogs it was built from is reloaded
+    sources = tuple(translation._catalog for translation
+            in translations[:num_merged])
+    merged, encoded = _translations.get_merged(keys[:num_merged], sources)
+
+    # The merged catalog is shared by every object created for this stack.
+    # It's never modified once it's built; anything that wants a different
+    # catalog must assign a new dict rather than mutating this one.
+    first._catalog = merged
+    first._encoded_catalogs = encoded
+    return [first] + translations[num_merged:]
+
+def _new_translation(class_, fp, python2_api):
+    try:
+        return class_(fp, python2_api=python2_api)
+    except TypeError:
+        # Only our translation classes have the python2_api parameter
+        return class_(fp)
+
+def _germanic_plural(n):
+    # Same as the default plural function that gettext.GNUTranslations uses
+    return int(n != 1)
+
+def _plural_expression(info):
+    '''Return the plural expression from a catalog's metadata or None'''
+    plural_forms = info.get('plural-forms')
+    if not plural_forms:
+        return None
+    # Same parsing as gettext.GNUTranslations._parse
+    return plural_forms.split(';')[1].split('plural=')[1]
+
+def _plural_function(expression):
+    '''Return a plural function for a Plural-Forms expression
+
+    The plural index for each n below ``_PLURAL_TABLE_SIZE`` is computed
+    once and looked up in a table afterwards.  Other values (large or
+    negative numbers, non-ints) are passed to the function compiled from the
+    expression.  Catalogs with the same expression share one function.
+
+    :arg expression: The C expression after ``plural=`` in the catalog's
+        Plural-Forms header or :data:`None` for the default germanic plural
+    '''
+    plural = _plural_functions.get(expression)
+    if plural is None:
+        if expression is None:
+            compute = _germanic_plural
+        else:
+            compute = gettext.c2py(expression)
+        table = tuple(compute(n) for n in range(_PLURAL_TABLE_SIZE))
+
+        def plural(n, table=table, compute=compute):
+            # bool is a subclass of int but it goes through compute() so
+            # nothing changes for callers that pass odd types
+            if n.__class__ is int and 0 <= n < _PLURAL_TABLE_SIZE:
+                return table[n]
+            return compute(n)
+        plural = _plural_functions.setdefault(expression, plural)
+    return plural
+
+def _catalog_cache_path(mofile, catalog_cache):
+    if catalog_cache is True:
+        return mofile + '.cache'
+    # Importing hashlib is only worthwhile when a cache directory is used
+    import hashlib
+    return os.path.join(catalog_cache, '%s.cache'
+            % hashlib.sha1(mofile.encode('utf-8', 'surrogateescape')).hexdigest())
+
+def _catalog_cache_key(mofile):
+    mo_stat = os.stat(mofile)
+    return (_CATALOG_CACHE_VERSION, tuple(sys.version_info[:2]), mofile,
+            mo_stat.st_mtime_ns, mo_stat.st_size)
+
+def _read_catalog_cache(class_, cache_key, cache_path, python2_api):
+    '''Create a translation object from a compiled catalog cache file
+
+    :returns: The translation object or :data:`None` if the cache file
+        doesn't exist, can't be read, or is out of date.
+    '''
+    try:
+        with open(cache_path, 'rb') as cache_fh:
+            data = marshal.load(cache_fh)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(data, tuple) or len(data) != 5 or data[0] != cache_key:
+        return None
+
+    charset, info, plural, catalog = data[1:]
+    translation = _new_translation(class_, None, python2_api)
+    translation._catalog = catalog
+    translation._charset = charset
+    translation._info = info
+    translation.plural = _plural_function(plural or None)
+    return translation
+
+def _write_catalog_cache(translation, cache_key, cache_path):
+    if type(translation._catalog) is not dict:
+        # Only catalogs that are fully loaded into a dict can be cached
+        return
+    plural = _plural_expression(translation._info)
+    data = (cache_key, translation._charset, translation._info, plural,
+            translation._catalog)
+
+    # tempfile is only needed when we're writing a cache file
+    import tempfile
+    cache_dir = os.path.dirname(cache_path)
+    temp_path = None
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        temp_fd, temp_path = tempfile.mkstemp(prefix='.catalog-',
+                dir=cache_dir)
+        with os.fdopen(temp_fd, 'wb') as temp_fh:
+            marshal.dump(data, temp_fh)
+        # Rename so that other processes never see a partially written file
+        os.replace(temp_path, cache_path)
+    except (OSError, ValueError):
+        # The cache is only an optimization.  If we can't write it (for
+        # instance, because the directory is read-only) just go on without it
+        if temp_path:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
 
+def _load_translation(class_, mofile, python2_api, catalog_cache=None):
+    '''Create a translation object for a :term:`message catalog`
+
+    When :attr:`catalog_cache` is set and :attr:`class_` supports it, the
+    parsed catalog is read from and saved to a compiled cache file.  See
+    :func:`get_translation_object` for the values it can take.
+    '''
+    use_cache = catalog_cache and getattr(class_, '_catalog_cacheable', False)
+    if use_cache:
+        cache_path = _catalog_cache_path(mofile, catalog_cache)
+        cache_key = _catalog_cache_key(mofile)
+        translation = _read_catalog_cache(class_, cache_key, cache_path,
+                python2_api)
+        if translation is not None:
+            return translation
+
+    mofile_fh = open(mofile, 'rb')
+    try:
+        translation = _new_translation(class_, mofile_fh, python2_api)
+    finally:
+        mofile_fh.close()
+
+    if use_cache:
+        _write_catalog_cache(translation, cache_key, cache_path)
+    return translation
+
+def _expand_language(language):
+    '''Return the variants of a locale name that gettext searches for
+
+    Same as the expansion :func:`gettext.find` does (which isn't part of
+    :mod:`gettext`'s public API): the name is normalized with
+    :func:`locale.normalize` and then every combination of the language with
+    its territory, codeset, and modifier is returned, most specific first.
+    For instance, ``pt_BR.UTF-8`` expands to ``pt_BR.UTF-8``, ``pt_BR``,
+    ``pt.UTF-8``, and ``pt``.
+    '''
+    language = locale.normalize(language)
+    # Split off the optional components from the end
+    optional = {}
+    for separator in ('@', '.', '_'):
+        pos = language.find(separator)
+        if pos >= 0:
+            optional[separator] = (language[pos:], '')
+            language = language[:pos]
+        else:
+            optional[separator] = ('',)
+
+    # gettext drops the codeset first, then the territory, then the
+    # modifier
+    variants = []
+    for modifier, territory, codeset in itertools.product(optional['@'],
+            optional['_'], optional['.']):
+        variants.append(language + territory + codeset + modifier)
+    return variants
+
+def _expand_languages(languages):
+    '''Return the language codes that :func:`gettext.find` would search
+
+    :arg languages: Language codes or :data:`None` to take them from the
+        environment the way :func:`gettext.find` does
+    :returns: tuple of normalized and expanded language codes in the order
+        they are searched
+    '''
+    if languages is None:
+        languages = []
+        for envar in ('LANGUAGE', 'LC_ALL', 'LC_MESSAGES', 'LANG'):
+            val = os.environ.get(envar)
+            if val:
+                languages = val.split(':')
+                break
+        if 'C' not in languages:
+            languages.append('C')
+    languages = tuple(languages)
+
+    expanded = _expanded_languages.get(languages)
+    if expanded is None:
+        expanded = []
+        for lang in languages:
+            for nelang in _expand_language(lang):
+                if nelang not in expanded:
+                    expanded.append(nelang)
+        if 'C' in expanded:
+            # gettext.find stops searching at the C locale
+            expanded = expanded[:expanded.index('C')]
+        expanded = _expanded_languages.setdefault(languages, tuple(expanded))
+    return expanded
+
+def _find_mofiles(domain, localedirs, languages):
+    mofiles = []
+    for localedir in localedirs:
+        for lang in languages:
+            mofile = os.path.join(localedir, lang, 'LC_MESSAGES',
+                    '%s.mo' % domain)
+            if os.path.exists(mofile):
+                mofiles.append(mofile)
+    return mofiles
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _discovery_stamp(localedirs, mofiles):
+    # New language directories change the mtime of the localedir.  Removed or
+    # replaced catalogs change (or remove) the mofile itself
+    return tuple(_mtime(path) for path in itertools.chain(localedirs, mofiles))
+
+def _discover_mofiles(domain, localedirs, languages, use_cache=True,
+        revalidate=False):
+    '''Find the :term:`message catalogs` for a domain
+
+    Works like calling :func:`gettext.find` with ``all=True`` for each
+    localedir but remembers the result so that later calls don't need to
+    touch the filesystem.
+    '''
+    languages = _expand_languages(languages)
+    localedirs = tuple(localedir or _DEFAULT_LOCALEDIR for localedir
+            in itertools.chain(localedirs, (_DEFAULT_LOCALEDIR,)))
+    if not use_cache:
+        return _find_mofiles(domain, localedirs, languages)
+
+    key = (domain, localedirs, languages)
+    with _discovery_lock:
+        entry = _discovery_cache.get(key)
+    if entry is not None:
+        mofiles, probes, stamp = entry
+        if not revalidate:
+            with _discovery_lock:
+                _discovery_stats['hits'] += 1
+                _discovery_stats['probes_saved'] += probes
+            return list(mofiles)
+        if _discovery_stamp(localedirs, mofiles) == stamp:
+            with _discovery_lock:
+                _discovery_stats['hits'] += 1
+                _discovery_stats['probes_saved'] += max(probes - len(stamp), 0)
+            return list(mofiles)
+        with _discovery_lock:
+            _discovery_stats['stale'] += 1
+
+    probes = len(localedirs) * len(languages)
+    # Take the stamp first so a catalog installed during the search makes
+    # the entry stale rather than being missed until the next change
+    stamp = _discovery_stamp(localedirs, ())
+    mofiles = _find_mofiles(domain, localedirs, languages)
+    stamp += tuple(_mtime(path) for path in mofiles)
+    with _discovery_lock:
+        _discovery_stats['misses'] += 1
+        _discovery_stats['probes'] += probes
+        _discovery_cache[key] = (tuple(mofiles), probes, stamp)
+    return mofiles
+
+def clear_discovery_cache():
+    '''Forget which :term:`message catalogs` were found
+
+    :func:`get_translation_object` remembers which :term:`message catalogs`
+    it found for each domain, set of localedirs, and languages.  Call this
+    after installing or removing :term:`message catalogs` so that the next
+    call searches the filesystem again.  The statistics returned by
+    :func:`discovery_cache_info` are reset as well.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    with _discovery_lock:
+        _discovery_cache.clear()
+        for counter in _discovery_stats:
+            _discovery_stats[counter] = 0
+
+def discovery_cache_info():
+    '''Return statistics about the :term:`message catalog` discovery cache
+
+    :returns: dict with these keys:
+
+        :hits: Number of lookups answered from the cache
+        :misses: Number of lookups that had to search the filesystem
+        :stale: Number of cached entries that were found to be out of date
+            when revalidating
+        :probes: Number of paths checked for :term:`message catalogs`
+        :probes_saved: Number of path checks that cache hits avoided
+        :entries: Number of entries in the cache
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    with _discovery_lock:
+        info = dict(_discovery_stats)
+        info['entries'] = len(_discovery_cache)
+    return info
+
+def clear_translation_cache():
+    '''Forget all of the :term:`message catalogs` that have been loaded
+
+    :func:`get_translation_object` keeps the catalogs it loads so that
+    asking for the same catalog again doesn't parse the file again.  This
+    empties that cache and resets the statistics returned by
+    :func:`translation_cache_info`.  Translation objects that were already
+    returned keep working.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    _translations.clear()
+
+def set_translation_cache_limits(maxsize=None, maxbytes=None):
+    '''Bound the number of loaded :term:`message catalogs` that are kept
+
+    :kwarg maxsize: Maximum number of catalogs to keep or :data:`None` for
+        no limit
+    :kwarg maxbytes: Approximate maximum number of bytes of memory to use
+        for the messages in the catalogs or :data:`None` for no limit
+
+    Catalogs combined by ``merge_catalogs=True`` count toward
+    :attr:`maxbytes` and are discarded along with the catalogs they were
+    built from.  When a limit is exceeded, the least recently used catalogs
+    are discarded.  They'll be loaded again the next time they're needed.  By
+    default there are no limits.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    _translations.set_limits(maxsize=maxsize, maxbytes=maxbytes)
+
+def translation_cache_info():
+    '''Return statistics about the loaded :term:`message catalogs`
+
+    :returns: dict with these keys:
+
+        :entries: Number of catalogs in the cache
+        :bytes: Estimate of the memory used by the messages in those catalogs
+            and in the merged catalogs
+        :merged: Number of catalogs combined by ``merge_catalogs=True`` in
+            the cache
+        :paths: List of the paths to the catalogs, least recently used first
+        :hits: Number of times a catalog was found in the cache
+        :misses: Number of times a catalog had to be loaded
+        :reloads: Number of times a catalog was loaded again because it had
+            changed on disk
+        :evictions: Number of catalogs discarded to stay within the limits
+        :maxsize: Limit on the number of catalogs
+        :maxbytes: Limit on the memory used by the catalogs
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    return _translations.info()
 
 def get_translation_object(domain, localedirs=tuple(), languages=None,
-        class_=None, fallback=True, codeset=None, python2_api=True):
+        class_=None, fallback=True, codeset=None, python2_api=True,
+        merge_catalogs=False, catalog_cache=None, discovery_cache=True,
+        revalidate=False):
     '''Get a translation object bound to the :term:`message catalogs`
 
     :arg domain: Name of the message domain.  This should be a unique name
@@ -686,6 +1842,8 @@ def get_translation_object(domain, localedirs=tuple(), languages=None,
 
     :kwarg class_:  The class to use to extract translations from the
         :term:`message catalogs`.  Defaults to :class:`NewGNUTranslations`.
+        :class:`LazyGNUTranslations` may be used to only decode the messages
+        that are looked up.
     :kwarg fallback: If set to data:`False`, raise an :exc:`IOError` if no
         :term:`message catalogs` are found.  If :data:`True`, the default,
         return a :class:`DummyTranslations` object.
@@ -702,6 +1860,50 @@ def get_translation_object(domain, localedirs=tuple(), languages=None,
         Translation objects that use the python3 gettext api (gettext returns
         :class:`str` strings and lgettext returns byte :class:`bytes`.
         ugettext does not exist.)
+    :kwarg merge_catalogs: When :data:`True`, combine the entries of all of
+        the :term:`message catalogs` that were found into a single table
+        attached to the returned object instead of chaining one object per
+        catalog with fallbacks.  Entries from catalogs found earlier take
+        precedence, just as with the fallback chain, so a lookup costs one
+        dict access no matter how many catalogs are involved.  The merged
+        table is built once per set of catalogs and shared by every object
+        returned for them.  Catalogs whose plural forms differ from the first
+        catalog's are not merged and remain fallbacks.  Default is
+        :data:`False`.
+    :kwarg catalog_cache: Where to keep compiled copies of the
+        :term:`message catalogs` so that new processes don't have to parse
+        the :file:`.mo` files again.  If :data:`True`, the compiled copy is
+        saved next to each :file:`.mo` file with a :file:`.cache` extension.
+        If it's a directory name, the compiled copies are saved in that
+        directory (which is created if necessary).  Compiled copies are
+        rebuilt whenever the path, modification time, or size of the
+        :file:`.mo` file changes and are ignored if they can't be read or
+        written.  Only used with translation classes that load the whole
+        catalog (the default :class:`NewGNUTranslations` does,
+        :class:`LazyGNUTranslations` doesn't).  Default is :data:`None`:
+        don't use compiled copies.
+    :kwarg discovery_cache: If :data:`True`, the default, remember which
+        :term:`message catalogs` were found for this domain, set of
+        localedirs, and languages (including the languages taken from the
+        environment) so that later calls don't have to search the
+        filesystem again.  Use :func:`clear_discovery_cache` after installing
+        new :term:`message catalogs` and :func:`discovery_cache_info` to see
+        how well the cache is working.  If :data:`False`, always search.
+
+        .. warning:: This changes what earlier versions of kitchen did.
+            They searched the filesystem on every call so a long running
+            program picked up :term:`message catalogs` that were installed
+            or removed while it ran.  With the cache, that only happens if
+            you pass ``revalidate=True``, call :func:`clear_discovery_cache`,
+            or pass ``discovery_cache=False``.
+    :kwarg revalidate: If :data:`True`, check the modification times of the
+        localedirs and of the :term:`message catalogs` that were found before
+        using a remembered search result or an already loaded catalog.  This
+        notices new language directories, removed catalogs, and catalogs
+        that were updated (which are reloaded) at the cost of a few
+        :func:`os.stat` calls.  Translation objects that were returned before
+        a catalog was reloaded keep using the old messages.  Default is
+        :data:`False`.
     :return: Translation object to get :mod:`gettext` methods from
 
     If you need more flexibility than :func:`easy_gettext_setup`, use this
@@ -784,6 +1986,10 @@ def get_translation_object(domain, localedirs=tuple(), languages=None,
         :func:`gettext.translation` function.
     .. versionchanged:: kitchen-1.2.0 ; API kitchen.i18n 2.2.0
         Add python2_api parameter
+    .. versionchanged:: kitchen-1.3.0 ; API kitchen.i18n 2.3.0
+        Add merge_catalogs, catalog_cache, discovery_cache, and revalidate
+        parameters.  The :term:`message catalogs` that are found are
+        remembered by default
     '''
     if python2_api:
         warnings.warn('get_translation_object returns gettext objects'
@@ -795,47 +2001,123 @@ def get_translation_object(domain, localedirs=tuple(), languages=None,
     if not class_:
         class_ = NewGNUTranslations
 
-    mofiles = []
-    for localedir in itertools.chain(localedirs, (_DEFAULT_LOCALEDIR,)):
-        mofiles.extend(gettext.find(domain, localedir, languages, all=1))
+    mofiles = _discover_mofiles(domain, localedirs, languages,
+            use_cache=discovery_cache, revalidate=revalidate)
     if not mofiles:
         if fallback:
             return DummyTranslations(python2_api=python2_api)
         raise IOError(ENOENT, 'No translation file found for domain', domain)
 
     # Accumulate a translation with fallbacks to all the other mofiles
-    stacked_translations = None
+    translations = []
+    keys = []
     for mofile in mofiles:
         full_path = os.path.abspath(mofile)
-        translation = _translations.get(full_path)
-        if not translation:
-            mofile_fh = open(full_path, 'rb')
-            try:
-                try:
-                    translation = _translations.setdefault(full_path,
-                            class_(mofile_fh, python2_api=python2_api))
-                except TypeError:
-                    # Only our translation classes have the python2_api
-                    # parameter
-                    translation = _translations.setdefault(full_path,
-                            class_(mofile_fh))
-
-            finally:
-                mofile_fh.close()
+        # Objects of different classes may store the catalog differently
+        key = (class_, full_path)
+        translation = _translations.get(key,
+                functools.partial(_load_translation, class_, full_path,
+                    python2_api, catalog_cache), revalidate=revalidate)
 
         # Shallow copy the object so that the fallbacks and output charset can
         # differ but the data we read from the mofile is shared.
-        translation = copy.copy(translation)
-        translation.python2_api = python2_api
-        if codeset:
-            translation.set_output_charset(codeset)
-        if not stacked_translations:
-            stacked_translations = translation
+        if isinstance(translation, DummyTranslations):
+            translation = translation._new_view(python2_api, codeset)
         else:
-            stacked_translations.add_fallback(translation)
+            translation = copy.copy(translation)
+            translation.python2_api = python2_api
+            if codeset:
+                translation.set_output_charset(codeset)
+        translations.append(translation)
+        keys.append(key)
+
+    if merge_catalogs:
+        translations = _merge_catalogs(translations, tuple(keys))
+
+    stacked_translations = translations[0]
+    for translation in translations[1:]:
+        stacked_translations.add_fallback(translation)
 
     return stacked_translations
 
+def preload(domains, localedirs=tuple(), languages=None, class_=None,
+        catalog_cache=None, freeze=False):
+    '''Load :term:`message catalogs` before they're needed
+
+    :arg domains: Name of a message domain or an iterable of them
+    :kwarg localedirs: Directories to look for :term:`message catalogs`
+        under.  Same as for :func:`get_translation_object`.
+    :kwarg languages: Iterable of the language codes to load catalogs for.
+        Each language is loaded as if it had been passed on its own to
+        :func:`get_translation_object` so the catalogs and the search for
+        them are remembered for later calls that ask for that language.  If
+        unspecified, the languages from the user's locale settings are used.
+    :kwarg class_: The class to use to load the catalogs.  Defaults to
+        :class:`NewGNUTranslations`.  See below for when to use
+        :class:`LazyGNUTranslations`.
+    :kwarg catalog_cache: Where to keep compiled copies of the catalogs.
+        Same as for :func:`get_translation_object`.
+    :kwarg freeze: If :data:`True`, call :func:`gc.freeze` after loading so
+        that the garbage collector leaves the loaded objects alone.  This
+        affects every object in the process, not just the catalogs, so it's
+        off by default.
+    :returns: :class:`list` of the paths of the catalogs that were loaded
+
+    Servers that fork worker processes should call this in the parent
+    before forking.  The workers then find the catalogs already loaded
+    instead of each reading and parsing its own copy::
+
+        from kitchen.i18n import preload, get_translation_object
+        preload('myapp', localedirs=['/usr/share/locale'],
+                languages=['de', 'es', 'pt_BR'],
+                class_=LazyGNUTranslations)
+        # fork the workers.  In each one:
+        translations = get_translation_object('myapp',
+                localedirs=['/usr/share/locale'], languages=['de'],
+                class_=LazyGNUTranslations, python2_api=False)
+
+    The operating system shares the parent's memory with the workers until
+    one of them writes to it.  Python writes to an object whenever it
+    changes the object's reference count, and looking up a message does
+    that to the message.  So the pages holding a :class:`NewGNUTranslations`
+    catalog gradually get copied into each worker that uses them.
+    :class:`LazyGNUTranslations` keeps the catalog in a read-only
+    :func:`mmap.mmap` of the file, which is never written to.  Only the
+    messages a worker actually uses are decoded into its own memory, so
+    memory use stays flat as the number of workers grows.  Pass the same
+    ``class_`` to :func:`get_translation_object` in the workers or the
+    catalogs will be loaded again.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    if not class_:
+        class_ = NewGNUTranslations
+    if isinstance(domains, str):
+        domains = (domains,)
+    if languages is None:
+        language_lists = (None,)
+    else:
+        language_lists = [[language] for language in languages]
+
+    paths = []
+    for domain in domains:
+        for language_list in language_lists:
+            for mofile in _discover_mofiles(domain, localedirs,
+                    language_list):
+                full_path = os.path.abspath(mofile)
+                _translations.get((class_, full_path),
+                        functools.partial(_load_translation, class_,
+                            full_path, False, catalog_cache))
+                if full_path not in paths:
+                    paths.append(full_path)
+
+    if freeze:
+        # Only worth importing when it's used
+        import gc
+        gc.collect()
+        gc.freeze()
+    return paths
+
 def easy_gettext_setup(domain, localedirs=tuple(), use_unicode=True):
     ''' Setup translation functions for an application
 
@@ -892,5 +2174,452 @@ def easy_gettext_setup(domain, localedirs=tuple(), use_unicode=True):
         return(translations.gettext, translations.ngettext)
     return(translations.lgettext, translations.lngettext)
 
-__all__ = ('DummyTranslations', 'NewGNUTranslations', 'easy_gettext_setup',
-        'get_translation_object')
+class TranslationRegistry(object):
+    '''Thread-safe pool of ready to use translation objects
+
+    :kwarg localedirs: Directories to search for :term:`message catalogs`.
+        See :func:`get_translation_object`.
+    :kwarg maxsize: Maximum number of translation objects to keep.  When
+        more are needed, the least recently used one is discarded.
+        Default 128.
+    :kwarg translation_kwargs: Any other keyword arguments are passed to
+        :func:`get_translation_object` when a translation object is created.
+        Unless specified, ``python2_api`` is set to :data:`False`.
+
+    Programs that serve users in many languages (for instance, web
+    applications) need a translation object for each language.  Creating
+    a new one with :func:`get_translation_object` for each request is
+    wasteful.  The registry creates each translation object the first time
+    it's requested and hands out the same object afterwards::
+
+        registry = TranslationRegistry(localedirs=('/usr/share/locale',))
+
+        def handle_request(request):
+            token = registry.activate('myapp', languages=request.languages)
+            try:
+                return render(request)
+            finally:
+                deactivate_translations(token)
+
+        def render(request):
+            return current_gettext('Hello World')
+
+    Since the same object is handed out to every caller, don't call
+    :meth:`~DummyTranslations.set_output_charset` or
+    :meth:`~DummyTranslations.add_fallback` on it.  Use the ``codeset``
+    parameter of :meth:`get` instead.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    def __init__(self, localedirs=tuple(), maxsize=128, **translation_kwargs):
+        self.localedirs = tuple(localedirs)
+        self.maxsize = maxsize
+        translation_kwargs.setdefault('python2_api', False)
+        self._translation_kwargs = translation_kwargs
+        self._translations = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, domain, languages=None, codeset=None):
+        '''Return the translation object for a domain and languages
+
+        :arg domain: Name of the message domain
+        :kwarg languages: Iterator of language codes to look for
+            :term:`message catalogs` for.  If unspecified, the user's locale
+            settings are used.
+        :kwarg codeset: Character encoding to use when returning byte
+            :class:`bytes`.  See :func:`get_translation_object`.
+        :returns: Translation object.  Requests for the same domain,
+            languages, and codeset return the same object.
+        '''
+        key = (domain, _expand_languages(languages), codeset)
+        with self._lock:
+            translations = self._translations.get(key)
+            if translations is not None:
+                self._translations.move_to_end(key)
+                return translations
+
+        # Create the object outside of the lock so that lookups of other
+        # languages don't wait on the filesystem
+        translations = get_translation_object(domain, self.localedirs,
+                languages=key[1], codeset=codeset, **self._translation_kwargs)
+
+        with self._lock:
+            # Another thread may have created it in the meantime.  Hand out
+            # the same object to everyone.
+            translations = self._translations.setdefault(key, translations)
+            self._translations.move_to_end(key)
+            while len(self._translations) > self.maxsize:
+                self._translations.popitem(last=False)
+        return translations
+
+    def activate(self, domain, languages=None, codeset=None):
+        '''Make a translation object the current one for this context
+
+        Takes the same arguments as :meth:`get`.
+
+        :returns: Token to pass to :func:`deactivate_translations` to restore
+            the previous translation object
+        '''
+        return activate_translations(self.get(domain, languages=languages,
+            codeset=codeset))
+
+    def clear(self):
+        '''Discard all of the translation objects'''
+        with self._lock:
+            self._translations.clear()
+
+    def __len__(self):
+        return len(self._translations)
+
+
+# The translation object for the current thread or asyncio task
+_current_translations = contextvars.ContextVar('kitchen_i18n_translations',
+        default=None)
+_null_translations = DummyTranslations(python2_api=False)
+
+def activate_translations(translations):
+    '''Set the translation object that :func:`current_gettext` uses
+
+    :arg translations: Translation object to use in the current context
+    :returns: Token to pass to :func:`deactivate_translations` to restore
+        the previous translation object
+
+    The translation object is stored in a :mod:`contextvars` variable so
+    each thread and each :mod:`asyncio` task has its own current
+    translations.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    return _current_translations.set(translations)
+
+def deactivate_translations(token):
+    '''Restore the translation object that was current before
+    :func:`activate_translations` was called
+
+    :arg token: Token returned by :func:`activate_translations` or
+        :meth:`TranslationRegistry.activate`
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    _current_translations.reset(token)
+
+def current_translations():
+    '''Return the translation object for the current context
+
+    :returns: The translation object set by :func:`activate_translations`
+        or a :class:`DummyTranslations` if none has been set
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    translations = _current_translations.get()
+    if translations is None:
+        return _null_translations
+    return translations
+
+def current_gettext(message):
+    '''Translate a message with the current context's translation object
+
+    Suitable for use as :func:`_`::
+
+        from kitchen.i18n import current_gettext as _
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    translations = _current_translations.get()
+    if translations is None:
+        translations = _null_translations
+    return translations.gettext(message)
+
+def current_ngettext(msgid1, msgid2, n):
+    '''Translate a plural message with the current context's translation
+    object
+
+    Suitable for use as :func:`N_`.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    translations = _current_translations.get()
+    if translations is None:
+        translations = _null_translations
+    return translations.ngettext(msgid1, msgid2, n)
+
+#
+# Lookup instrumentation
+#
+
+class _LookupCounters(object):
+    '''Lookup statistics gathered by one thread'''
+    __slots__ = ('depth', 'lookups', 'hits', 'misses', 'fallbacks',
+            'reencodes', 'time', 'missing')
+
+    def __init__(self):
+        # Nonzero while an instrumented lookup is running so that the
+        # lookups it makes in the fallbacks aren't counted again
+        self.depth = 0
+        self.reset()
+
+    def reset(self):
+        self.lookups = 0
+        self.hits = {}
+        self.misses = 0
+        self.fallbacks = 0
+        self.reencodes = 0
+        self.time = 0.0
+        self.missing = collections.Counter()
+
+    def add(self, other):
+        '''Add the counts from another :class:`_LookupCounters` to these'''
+        self.lookups += other.lookups
+        self.misses += other.misses
+        self.fallbacks += other.fallbacks
+        self.reencodes += other.reencodes
+        self.time += other.time
+        for level, hits in list(other.hits.items()):
+            self.hits[level] = self.hits.get(level, 0) + hits
+        self.missing.update(other.missing.copy())
+
+class _LookupCountersOwner(object):
+    '''Holds a thread's :class:`_LookupCounters` in its thread local storage
+
+    The storage is freed when the thread exits.  A finalizer on this object
+    then adds the thread's counts to :data:`_exited_lookup_counters`.
+    '''
+    __slots__ = ('counters', '__weakref__')
+
+    def __init__(self, counters):
+        self.counters = counters
+
+# Counters for every running thread that has done an instrumented lookup so
+# that lookup_stats() can add them up
+_all_lookup_counters = set()
+# Counts from the threads that have exited
+_exited_lookup_counters = _LookupCounters()
+_lookup_counters_lock = threading.Lock()
+_thread_lookup_counters = threading.local()
+# (class, attribute name) => the attribute that instrumentation replaced
+_uninstrumented = {}
+# Held while turning instrumentation on or off
+_lookup_stats_switch_lock = threading.Lock()
+
+def _retire_lookup_counters(counters):
+    with _lookup_counters_lock:
+        _all_lookup_counters.discard(counters)
+        _exited_lookup_counters.add(counters)
+
+def _get_lookup_counters():
+    try:
+        return _thread_lookup_counters.owner.counters
+    except AttributeError:
+        counters = _LookupCounters()
+        owner = _thread_lookup_counters.owner = _LookupCountersOwner(counters)
+        with _lookup_counters_lock:
+            _all_lookup_counters.add(counters)
+        weakref.finalize(owner, _retire_lookup_counters, counters)
+        return counters
+
+def _catalog_level(translations, args, plural):
+    '''Find which translation object in a fallback chain has a message
+
+    :returns: (index of the object in the chain or None if no object has
+        the message, number of objects in the chain that were checked)
+    '''
+    level = 0
+    while translations is not None:
+        catalog = getattr(translations, '_catalog', None)
+        if catalog is not None:
+            try:
+                key = to_unicode(args[0], encoding=getattr(translations,
+                    'input_charset', 'utf-8'))
+                if plural:
+                    key = (key, translations.plural(args[2]))
+                if key in catalog:
+                    return level, level + 1
+            except (TypeError, ValueError):
+                pass
+        translations = getattr(translations, '_fallback', None)
+        level += 1
+    return None, level
+
+def _instrumented_lookup(translations, method, plural, args):
+    counters = _get_lookup_counters()
+    if counters.depth:
+        # Lookup in a fallback.  The outermost lookup accounts for it
+        return method(*args)
+    counters.depth = 1
+    start = time.perf_counter()
+    try:
+        return method(*args)
+    finally:
+        counters.time += time.perf_counter() - start
+        counters.depth = 0
+        counters.lookups += 1
+        if isbasestring(args[0]):
+            level, checked = _catalog_level(translations, args, plural)
+            counters.fallbacks += checked - 1 if checked else 0
+            if level is None:
+                counters.misses += 1
+                counters.missing[to_unicode(args[0])] += 1
+            else:
+                counters.hits[level] = counters.hits.get(level, 0) + 1
+
+class _InstrumentedApiMethod(object):
+    '''Replaces an :class:`_ApiMethod` while instrumentation is enabled
+
+    This is a data descriptor so it takes precedence over the bound methods
+    that :class:`_ApiMethod` saved on the objects.
+    '''
+    __slots__ = ('name', 'api_method', 'plural')
+
+    def __init__(self, name, api_method, plural):
+        self.name = name
+        self.api_method = api_method
+        self.plural = plural
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self.api_method.__get__(None, objtype)
+        method = obj.__dict__.get(self.name)
+        if method is None:
+            method = self.api_method.__get__(obj, objtype)
+        plural = self.plural
+
+        def instrumented(*args):
+            return _instrumented_lookup(obj, method, plural, args)
+        return instrumented
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
+
+def _instrumented_reencode(self, message, output_encoding):
+    result = _uninstrumented[(DummyTranslations, '_reencode_if_necessary')](
+            self, message, output_encoding)
+    if result is not message:
+        _get_lookup_counters().reencodes += 1
+    return result
+
+def enable_lookup_stats():
+    '''Start gathering statistics about message lookups
+
+    Once enabled, every lookup through the gettext methods of
+    :class:`DummyTranslations` and its subclasses is counted, timed, and
+    checked against each :term:`message catalog` in the fallback chain.
+    :func:`lookup_stats` and :func:`missing_messages` report the results.
+    Counters are kept per thread so threads don't contend for them.  When
+    a thread exits, its counts are added to a shared total so programs that
+    start a thread per request don't accumulate counters.  Turning the
+    statistics on and off is safe to do while other threads are looking up
+    messages.
+
+    This slows lookups down considerably so it's meant for finding out
+    where time goes and which messages still need translating, not for
+    leaving on in production.  When it's disabled (the default) lookups
+    don't do any extra work.
+
+    .. note:: Only methods retrieved from a translation object after this is
+        called are instrumented.  Functions saved beforehand, for instance
+        the ones returned by :func:`easy_gettext_setup`, are not, so enable
+        the statistics before setting up translations.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    with _lookup_stats_switch_lock:
+        if _uninstrumented:
+            return
+        replacements = {}
+        for name in _API_METHODS:
+            replacements[(DummyTranslations, name)] = _InstrumentedApiMethod(
+                    name, DummyTranslations.__dict__[name],
+                    name.endswith('ngettext'))
+        # Without their fast paths, the batch methods look up each message
+        # with the instrumented methods.  Replacing them with the generic
+        # versions rather than deleting them means there's never a moment
+        # where the attribute is missing
+        for name in ('gettext_many', 'ngettext_many'):
+            replacements[(NewGNUTranslations, name)] = \
+                    DummyTranslations.__dict__[name]
+        replacements[(DummyTranslations, '_reencode_if_necessary')] = \
+                _instrumented_reencode
+
+        for (cls, name), attr in replacements.items():
+            _uninstrumented[(cls, name)] = cls.__dict__[name]
+            setattr(cls, name, attr)
+
+def disable_lookup_stats():
+    '''Stop gathering statistics about message lookups
+
+    The statistics gathered so far are kept until :func:`reset_lookup_stats`
+    is called.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    with _lookup_stats_switch_lock:
+        for (cls, name), attr in _uninstrumented.items():
+            setattr(cls, name, attr)
+        _uninstrumented.clear()
+
+def _total_lookup_counters():
+    total = _LookupCounters()
+    with _lookup_counters_lock:
+        total.add(_exited_lookup_counters)
+        for counters in _all_lookup_counters:
+            total.add(counters)
+    return total
+
+def reset_lookup_stats():
+    '''Set all of the lookup statistics back to zero
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    with _lookup_counters_lock:
+        for counters in _all_lookup_counters:
+            counters.reset()
+        _exited_lookup_counters.reset()
+
+def lookup_stats():
+    '''Return the statistics gathered since :func:`enable_lookup_stats`
+
+    :returns: dict with these keys, added up across all threads:
+
+        :lookups: Number of messages looked up
+        :hits: dict mapping the position of a :term:`message catalog` in
+            the fallback chain (``0`` for the object the lookup was made on)
+            to the number of messages found there
+        :misses: Number of lookups for messages that weren't in any catalog
+        :fallbacks: Number of times a lookup went on to the next catalog in
+            the fallback chain
+        :reencodes: Number of results that had to be converted to a
+            different encoding
+        :time: Total number of seconds spent in lookups
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    total = _total_lookup_counters()
+    return {'lookups': total.lookups, 'hits': total.hits,
+            'misses': total.misses, 'fallbacks': total.fallbacks,
+            'reencodes': total.reencodes, 'time': total.time}
+
+def missing_messages(limit=None):
+    '''List the messages that weren't found in any :term:`message catalog`
+
+    :kwarg limit: Maximum number of messages to return.  Default is all of
+        them
+    :returns: :class:`list` of (msgid, number of lookups) tuples, most
+        frequently looked up first.  For plural messages the msgid is the
+        singular form.
+
+    Only lookups made while :func:`enable_lookup_stats` is in effect are
+    recorded.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.i18n 2.3.0
+    '''
+    return _total_lookup_counters().missing.most_common(limit)
+
+__all__ = ('DummyTranslations', 'LazyGNUTranslations', 'NewGNUTranslations',
+        'TranslationRegistry', 'activate_translations',
+        'clear_discovery_cache', 'clear_translation_cache',
+        'current_gettext', 'current_ngettext', 'current_translations',
+        'deactivate_translations', 'disable_lookup_stats',
+        'discovery_cache_info', 'easy_gettext_setup', 'enable_lookup_stats',
+        'get_translation_object', 'lookup_stats', 'missing_messages',
+        'preload', 'reset_lookup_stats', 'set_translation_cache_limits',
+        'translation_cache_info')
@@ -25,17 +25,80 @@ Functions to manipulate iterables
 
 .. versionadded:: Kitchen: 0.2.1a1
 
+.. versionchanged:: kitchen 1.3.0, API: kitchen.iterutils 0.1.0
+    :func:`~kitchen.iterutils.isiterable` and
+    :func:`~kitchen.iterutils.iterate` remember whether strings, builtin
+    containers, and types that can never be iterated are iterable.
+    :func:`~kitchen.iterutils.iterate` returns an iterator instead of a
+    generator.
+    Added :func:`~kitchen.iterutils.chunked`,
+    :func:`~kitchen.iterutils.batched_by_size`,
+    :func:`~kitchen.iterutils.sliding_window`,
+    :func:`~kitchen.iterutils.flatten`, and
+    :func:`~kitchen.iterutils.parallel_map`.
+
 .. moduleauthor:: Toshio Kuratomi <toshio@fedoraproject.org>
 .. moduleauthor:: Luke Macken <lmacken@redhat.com>
 '''
 
 from kitchen.versioning import version_tuple_to_string
 
-__version_info__ = ((0, 0, 1),)
+__version_info__ = ((0, 1, 0),)
 __version__ = version_tuple_to_string(__version_info__)
 
+import collections
+import itertools
+import os
+
 from kitchen.text.misc import isbasestring
 
+# What isiterable() decides about each type of object.  Types are only
+# listed when the answer can't differ between objects of that type.  For
+# iterables that's only these builtin types: other types can have an
+# __iter__ that raises TypeError for some of their objects (numpy's 0-d
+# arrays, for instance) so objects of those types are tested every time.
+_SCALAR = 0
+_ITERABLE = 1
+_STRING = 2
+_BUILTIN_ITER_KINDS = {str: _STRING, bytes: _STRING, bytearray: _STRING,
+        list: _ITERABLE, tuple: _ITERABLE, set: _ITERABLE,
+        frozenset: _ITERABLE, dict: _ITERABLE, range: _ITERABLE,
+        type(None): _SCALAR, bool: _SCALAR, int: _SCALAR, float: _SCALAR,
+        complex: _SCALAR}
+# Other types that turned out to be strings or to never be iterable
+_iter_kinds = {}
+# Keep programs that create lots of classes from growing the cache forever
+_ITER_KINDS_MAX = 1024
+
+def _iter_kind(obj):
+    '''Decide whether obj is a string, an iterable, or a scalar'''
+    obj_type = type(obj)
+    try:
+        return _iter_kinds[obj_type]
+    except KeyError:
+        pass
+
+    if isbasestring(obj):
+        kind = _STRING
+    else:
+        try:
+            iter(obj)
+        except TypeError:
+            kind = _SCALAR
+        else:
+            kind = _ITERABLE
+
+    # Strings are strings whatever their value.  A type with neither
+    # __iter__ nor __getitem__ can never be iterated.  Anything else may
+    # depend on the object so it isn't remembered.
+    if kind == _STRING or (kind == _SCALAR
+            and getattr(obj_type, '__iter__', None) is None
+            and not hasattr(obj_type, '__getitem__')):
+        if len(_iter_kinds) >= _ITER_KINDS_MAX:
+            _iter_kinds.clear()
+        _iter_kinds[obj_type] = kind
+    return kind
+
 def isiterable(obj, include_string=False):
     '''Check whether an object is an iterable
 
@@ -47,18 +110,22 @@ def isiterable(obj, include_string=False):
         :data:`False`.  Default :data:`False`.
     :returns: :data:`True` if :attr:`obj` is iterable, otherwise
         :data:`False`.
+
+    .. versionchanged:: kitchen 1.3.0, API: kitchen.iterutils 0.1.0
+        The answer is remembered for strings, builtin containers, and types
+        that can never be iterated so that later objects of those types
+        don't need to be tested.  Objects of other types are still tested
+        every time.
     '''
-    if include_string or not isbasestring(obj):
-        try:
-            iter(obj)
-        except TypeError:
-            return False
-        else:
-            return True
-    return False
+    kind = _BUILTIN_ITER_KINDS.get(type(obj))
+    if kind is None:
+        kind = _iter_kind(obj)
+    if kind == _STRING:
+        return include_string
+    return kind == _ITERABLE
 
 def iterate(obj, include_string=False):
-    '''Generator that can be used to iterate over anything
+    '''Return an iterator that can be used to iterate over anything
 
     :arg obj: The object to iterate over
     :kwarg include_string: if :data:`True`, treat strings as iterables.
@@ -88,11 +155,348 @@ def iterate(obj, include_string=False):
         ['abc']
         >>> list(iterate('abc', include_string=True))
         ['a', 'b', 'c']
+
+    .. versionchanged:: kitchen 1.3.0, API: kitchen.iterutils 0.1.0
+        Return the object's own iterator (or an iterator over a one element
+        tuple for scalars) instead of a generator that yields each item.
+        This means :func:`iter` is called on :attr:`obj` when this function
+        is called rather than when the first item is requested.
     '''
-    if isiterable(obj, include_string=include_string):
-        for item in obj:
+    kind = _BUILTIN_ITER_KINDS.get(type(obj))
+    if kind is None:
+        kind = _iter_kind(obj)
+    if kind == _ITERABLE or (kind == _STRING and include_string):
+        try:
+            return iter(obj)
+        except TypeError:
+            # Iterability can depend on the object's state
+            pass
+    return iter((obj,))
+
+def _flatten(obj, depth, include_string):
+    builtin_kinds = _BUILTIN_ITER_KINDS
+
+    def expandable(item):
+        kind = builtin_kinds.get(type(item))
+        if kind is None:
+            kind = _iter_kind(item)
+        if kind == _STRING:
+            # Iterating a one character str returns the same str again
+            return include_string and not (isinstance(item, str)
+                    and len(item) <= 1)
+        return kind == _ITERABLE
+
+    def expand(item):
+        # Returns None for items that turn out not to be iterable after all
+        if expandable(item):
+            try:
+                return iter(item)
+            except TypeError:
+                pass
+        return None
+
+    iterator = expand(obj)
+    if iterator is None:
+        yield obj
+        return
+
+    # Iterators for each level that's being flattened plus the ids of the
+    # containers they came from so we notice a container inside itself
+    stack = [iterator]
+    path = [id(obj)]
+    on_path = set(path)
+    while stack:
+        for item in stack[-1]:
+            if depth is None or len(stack) <= depth:
+                iterator = expand(item)
+            else:
+                iterator = None
+            if iterator is not None:
+                item_id = id(item)
+                if item_id in on_path:
+                    raise ValueError('flatten() found an iterable that'
+                            ' contains itself')
+                stack.append(iterator)
+                path.append(item_id)
+                on_path.add(item_id)
+                break
             yield item
+        else:
+            # This level is exhausted.  Continue with the one that
+            # contained it
+            stack.pop()
+            on_path.discard(path.pop())
+
+def flatten(obj, depth=None, include_string=False):
+    '''Iterate over the items of nested iterables
+
+    :arg obj: The object to flatten
+    :kwarg depth: How many levels of nested iterables inside :attr:`obj`
+        to flatten.  ``0`` returns the items of :attr:`obj` as they are,
+        just like :func:`iterate`.  Default is :data:`None`: flatten
+        everything.
+    :kwarg include_string: if :data:`True`, treat strings as iterables.
+        Otherwise treat them as a single scalar value.  Default :data:`False`
+    :raises ValueError: if :attr:`depth` is negative.  Also raised while
+        iterating if an iterable contains itself (directly or through
+        other iterables) since flattening it would never end.
+    :returns: Iterator over the non-iterable items
+
+    What counts as iterable is decided the same way as :func:`isiterable`.
+    Like :func:`iterate`, a scalar is returned as the only item.  Nested
+    iterables are walked with an explicit stack rather than recursion so
+    deeply nested data doesn't hit the interpreter's recursion limit.
+    Example usage::
+
+        >>> list(flatten([1, [2, (3, [4])], 'abc']))
+        [1, 2, 3, 4, 'abc']
+        >>> list(flatten([1, [2, (3, [4])]], depth=1))
+        [1, 2, (3, [4])]
+        >>> list(flatten(['ab', ['cd']], include_string=True))
+        ['a', 'b', 'c', 'd']
+        >>> list(flatten(5))
+        [5]
+
+    .. versionadded:: kitchen 1.3.0, API: kitchen.iterutils 0.1.0
+    '''
+    if depth is not None and depth < 0:
+        raise ValueError('depth must not be negative')
+    return _flatten(obj, depth, include_string)
+
+def _chunks_into_buffer(iterator, size):
+    buf = []
+    while True:
+        # Slice assignment refills the same list instead of allocating a new
+        # one for every chunk
+        buf[:] = itertools.islice(iterator, size)
+        if not buf:
+            return
+        yield buf
+
+def chunked(iterable, size, reuse_buffer=False):
+    '''Split an iterable into lists of a fixed number of items
+
+    :arg iterable: Iterable to split up
+    :arg size: Number of items in each list.  The last list may be shorter.
+    :kwarg reuse_buffer: If :data:`True`, every chunk is returned in the
+        same :class:`list`, refilled with the next items each time.  This
+        saves allocating a list per chunk but means you have to be done with
+        a chunk (or copy it) before asking for the next one.  Default
+        :data:`False`
+    :raises ValueError: if :attr:`size` is less than 1
+    :returns: Iterator of :class:`list`
+
+    Example usage::
+
+        >>> list(chunked(range(7), 3))
+        [[0, 1, 2], [3, 4, 5], [6]]
+        >>> for chunk in chunked(range(7), 3, reuse_buffer=True):
+        ...     print(sum(chunk))
+        3
+        12
+        6
+
+    .. versionadded:: kitchen 1.3.0, API: kitchen.iterutils 0.1.0
+    '''
+    if size < 1:
+        raise ValueError('size must be at least 1')
+    iterator = iter(iterable)
+    if reuse_buffer:
+        return _chunks_into_buffer(iterator, size)
+    # Call list(islice()) until it returns an empty list
+    return iter(lambda: list(itertools.islice(iterator, size)), [])
+
+def _batches_by_size(iterable, max_bytes, size):
+    batch = []
+    total = 0
+    for item in iterable:
+        item_size = size(item)
+        if batch and total + item_size > max_bytes:
+            yield batch
+            batch = []
+            total = 0
+        batch.append(item)
+        total += item_size
+    if batch:
+        yield batch
+
+def batched_by_size(iterable, max_bytes, size=len):
+    '''Group items into lists that fit in a size budget
+
+    :arg iterable: Iterable of items to group.  With the default
+        :attr:`size`, these are usually byte :class:`bytes` or :class:`str`
+        strings.
+    :arg max_bytes: Largest total size of the items in one list
+    :kwarg size: Function that returns the size of an item.  Defaults to
+        :func:`len`, which is the number of bytes of a byte :class:`bytes`
+        or the number of characters of a :class:`str`.  To budget
+        :class:`str` strings by their encoded size, pass something like
+        ``lambda item: len(item.encode('utf-8'))``.
+    :raises ValueError: if :attr:`max_bytes` is less than 1
+    :returns: Iterator of :class:`list`
+
+    Items are kept in order.  A new list is started when adding the next
+    item would go over :attr:`max_bytes`.  An item that is larger than
+    :attr:`max_bytes` on its own is returned in a list by itself rather than
+    being split or dropped.  Example usage::
+
+        >>> list(batched_by_size([b'aaaa', b'bb', b'cc', b'ddddddd', b'e'], 6))
+        [[b'aaaa', b'bb'], [b'cc'], [b'ddddddd'], [b'e']]
+
+    .. versionadded:: kitchen 1.3.0, API: kitchen.iterutils 0.1.0
+    '''
+    if max_bytes < 1:
+        raise ValueError('max_bytes must be at least 1')
+    return _batches_by_size(iterable, max_bytes, size)
+
+def _windows(iterator, size):
+    window = collections.deque(itertools.islice(iterator, size), maxlen=size)
+    if len(window) < size:
+        return
+    yield tuple(window)
+    append = window.append
+    for item in iterator:
+        append(item)
+        yield tuple(window)
+
+def sliding_window(iterable, size):
+    '''Return overlapping runs of consecutive items from an iterable
+
+    :arg iterable: Iterable to take the items from
+    :arg size: Number of items in each window
+    :raises ValueError: if :attr:`size` is less than 1
+    :returns: Iterator of :class:`tuple`.  Nothing is returned if
+        :attr:`iterable` has fewer than :attr:`size` items.
+
+    Each window is the previous one moved forward by one item::
+
+        >>> list(sliding_window('abcd', 2))
+        [('a', 'b'), ('b', 'c'), ('c', 'd')]
+
+    .. versionadded:: kitchen 1.3.0, API: kitchen.iterutils 0.1.0
+    '''
+    if size < 1:
+        raise ValueError('size must be at least 1')
+    return _windows(iter(iterable), size)
+
+def _map_chunk(func, chunk):
+    # Runs in the workers.  Module level so process pools can pickle it
+    return [func(item) for item in chunk]
+
+def _parallel_map(func, iterator, workers, mode, chunksize, ordered,
+        serial_threshold):
+    # Small inputs aren't worth starting workers for
+    head = list(itertools.islice(iterator, serial_threshold))
+    if len(head) < serial_threshold or workers == 1:
+        for item in itertools.chain(head, iterator):
+            yield func(item)
+        return
+
+    # Only import concurrent.futures when there's parallel work to do.  It
+    # takes a while to import
+    from concurrent import futures
+    if mode == 'process':
+        executor = futures.ProcessPoolExecutor(max_workers=workers)
     else:
-        yield obj
+        executor = futures.ThreadPoolExecutor(max_workers=workers)
+    chunks = chunked(itertools.chain(head, iterator), chunksize)
+    # Read no further ahead than this many chunks so that a large or endless
+    # input isn't pulled into memory faster than the results are used
+    max_in_flight = workers * 2
+
+    def submit(count):
+        for chunk in itertools.islice(chunks, count):
+            yield executor.submit(_map_chunk, func, chunk)
+
+    pending = None
+    try:
+        if ordered:
+            pending = collections.deque(submit(max_in_flight))
+            while pending:
+                results = pending.popleft().result()
+                # Keep the workers busy while the caller uses the results
+                pending.extend(submit(1))
+                for result in results:
+                    yield result
+        else:
+            pending = set(submit(max_in_flight))
+            while pending:
+                done, pending = futures.wait(pending,
+                        return_when=futures.FIRST_COMPLETED)
+                pending.update(submit(len(done)))
+                for future in done:
+                    for result in future.result():
+                        yield result
+    finally:
+        # The caller stopped early or func raised an exception.  Don't run
+        # the work that nobody will collect
+        if pending:
+            for future in pending:
+                future.cancel()
+        executor.shutdown(wait=True)
+
+def parallel_map(func, iterable, workers=None, mode='thread', chunksize=1,
+        ordered=True, serial_threshold=8):
+    '''Call a function on each item of an iterable using several workers
+
+    :arg func: Function to call with each item
+    :arg iterable: The items.  They're read as the workers need them, so
+        this may be a generator or another endless iterator.
+    :kwarg workers: Number of threads or processes to use.  Defaults to the
+        same number as :mod:`concurrent.futures` uses.  ``1`` calls
+        :attr:`func` in the calling thread.
+    :kwarg mode: ``'thread'`` (the default) runs :attr:`func` in a pool of
+        threads.  This is good for work that waits on I/O or that spends
+        its time in code that releases the global interpreter lock.
+        ``'process'`` runs :attr:`func` in a pool of processes, which is
+        needed to use several CPUs for work done in python code.  :attr:`func`, the items, and
+        the results all have to be picklable to use processes.
+    :kwarg chunksize: Number of items to send to a worker at a time.  With
+        processes, and with cheap functions, larger chunks cut down on
+        overhead.  Default ``1``
+    :kwarg ordered: If :data:`True` (the default), return the results in
+        the same order as the items.  If :data:`False`, return each chunk of
+        results as soon as it's ready.
+    :kwarg serial_threshold: If the iterable has fewer than this many
+        items, call :attr:`func` on them in the calling thread rather than
+        starting workers.  Default ``8``
+    :raises ValueError: if :attr:`mode` isn't ``'thread'`` or
+        ``'process'`` or :attr:`workers` or :attr:`chunksize` is less
+        than 1
+    :returns: Iterator over the results of calling :attr:`func` on each
+        item
+
+    At most twice as many chunks as there are workers are read from
+    :attr:`iterable` ahead of the results that have been returned.  If
+    :attr:`func` raises an exception, it's raised from this iterator when
+    that item's result would have been returned.  Work that hasn't started
+    yet is cancelled when that happens or when the iterator is closed.
+    Example usage::
+
+        from kitchen.text.converters import unicode_to_xml
+        from kitchen.text.misc import guess_file_encoding
+
+        xml_fields = list(parallel_map(unicode_to_xml, fields, chunksize=256))
+        for path, encoding in zip(paths, parallel_map(guess_file_encoding,
+                paths, workers=8)):
+            print(path, encoding)
+
+    .. versionadded:: kitchen 1.3.0, API: kitchen.iterutils 0.1.0
+    '''
+    if mode not in ('thread', 'process'):
+        raise ValueError("mode must be 'thread' or 'process'")
+    if workers is None:
+        # The defaults that concurrent.futures uses
+        if mode == 'process':
+            workers = os.cpu_count() or 1
+        else:
+            workers = min(32, (os.cpu_count() or 1) + 4)
+    if workers < 1:
+        raise ValueError('workers must be at least 1')
+    if chunksize < 1:
+        raise ValueError('chunksize must be at least 1')
+    return _parallel_map(func, iter(iterable), workers, mode, chunksize,
+            ordered, serial_threshold)
 
-__all__ = ('isiterable', 'iterate',)
+__all__ = ('batched_by_size', 'chunked', 'flatten', 'isiterable', 'iterate',
+        'parallel_map', 'sliding_window',)
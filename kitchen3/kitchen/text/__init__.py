@@ -11,7 +11,19 @@ and displaying text on the screen.
 
 from kitchen.versioning import version_tuple_to_string
 
-__version_info__ = ((2, 2, 0),)
+__version_info__ = ((2, 3, 0),)
 __version__ = version_tuple_to_string(__version_info__)
 
+# Submodules are imported the first time they're accessed as attributes of the
+# package (PEP 562)
+_SUBMODULES = frozenset(('converters', 'display', 'exceptions', 'misc',
+    'utf8'))
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        # Importing a submodule sets it as an attribute of the package
+        __import__('%s.%s' % (__name__, name))
+        return globals()[name]
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
 __all__ = ('converters', 'exceptions', 'misc',)
@@ -40,16 +40,23 @@ strings.
     we've simplified :func:`~kitchen.text.converters.exception_to_unicode` and
     :func:`~kitchen.text.converters.exception_to_bytes` to make it unnecessary
 
+.. versionchanged:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    Added :func:`~kitchen.text.converters.bytes_to_xml_stream`,
+    :func:`~kitchen.text.converters.xml_to_bytes_stream`, and
+    :func:`~kitchen.text.converters.guess_encoding_to_xml_batch`
+
 '''
 from base64 import b64encode, b64decode
 
 import codecs
+import itertools
+import re
 import warnings
-import xml.sax.saxutils
 
 from kitchen.text.exceptions import ControlCharError, XmlEncodeError
-from kitchen.text.misc import guess_encoding, html_entities_unescape, \
-        isbytestring, isunicodestring, process_control_chars
+from kitchen.text.misc import find_invalid_xml, guess_encoding, \
+        html_entities_unescape, isbytestring, isunicodestring, \
+        process_control_chars
 
 #: Aliases for the utf-8 codec
 _UTF8_ALIASES = frozenset(('utf-8', 'UTF-8', 'utf8', 'UTF8', 'utf_8', 'UTF_8',
@@ -59,6 +66,27 @@ _LATIN1_ALIASES = frozenset(('latin-1', 'LATIN-1', 'latin1', 'LATIN1',
     'latin', 'LATIN', 'l1', 'L1', 'cp819', 'CP819', '8859', 'iso8859-1',
     'ISO8859-1', 'iso-8859-1', 'ISO-8859-1'))
 
+#: Default number of bytes to process at once when streaming base64 data
+_B64_CHUNK_SIZE = 48 * 1024
+#: Characters that b64decode silently discards from its input
+_B64_IGNORED_RE = re.compile(b'[^A-Za-z0-9+/=]')
+
+#: Encodings (by their codecs.lookup() name) in which the xml special
+#: characters can be escaped by replacing bytes
+_BYTE_ESCAPABLE_ENCODINGS = frozenset(('utf-8', 'iso8859-1', 'ascii'))
+_XML_SPECIAL_BYTES_RE = re.compile(b'[&<>]')
+_XML_ATTRIB_SPECIAL_BYTES_RE = re.compile(b'[&<>"]')
+# xml.sax.saxutils.escape.  Set the first time xml is generated
+_xml_escape = None
+
+def _load_xml_escape():
+    global _xml_escape
+    # xml.sax.saxutils pulls in urllib and http.client so only import it
+    # when xml is actually being generated
+    from xml.sax.saxutils import escape
+    _xml_escape = escape
+    return escape
+
 # EXCEPTION_CONVERTERS is defined below due to using to_unicode
 
 def to_unicode(obj, encoding='utf-8', errors='replace', nonstring=None,
@@ -669,11 +697,15 @@ def unicode_to_xml(string, encoding='utf-8', attrib=False,
     except ControlCharError as exc:
         raise XmlEncodeError(exc.args[0])
 
+    escape = _xml_escape
+    if escape is None:
+        escape = _load_xml_escape()
+
     # Escape characters that have special meaning in xml
     if attrib:
-        string = xml.sax.saxutils.escape(string, entities={'"': "&quot;"})
+        string = escape(string, entities={'"': "&quot;"})
     else:
-        string = xml.sax.saxutils.escape(string)
+        string = escape(string)
 
     string = string.encode(encoding, 'xmlcharrefreplace')
 
@@ -854,6 +886,110 @@ def xml_to_bytes(byte_string, *args, **kwargs):
     '''
     return b64decode(byte_string, *args, **kwargs)
 
+def _iter_byte_chunks(source, chunk_size):
+    '''Yield successive byte chunks from a file object or bytes-like object
+
+    Slices of a bytes-like :attr:`source` are taken through
+    a :class:`memoryview` so that no copy of the data is made.
+    '''
+    if hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        view = memoryview(source).cast('B')
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+
+def bytes_to_xml_stream(source, output, chunk_size=_B64_CHUNK_SIZE):
+    '''Incrementally encode bytes so they are valid inside of any xml file
+
+    :arg source: file object opened in binary mode or a bytes-like object
+        (:class:`bytes`, :class:`bytearray`, :class:`memoryview`) holding the
+        data to transform
+    :arg output: file-like object with a :meth:`write` method that accepts
+        byte :class:`bytes`.  The encoded data is written here.
+    :kwarg chunk_size: Number of bytes of :attr:`source` to encode at once.
+        This is rounded down to a multiple of three so that the chunks can be
+        concatenated without intervening padding.  Default 48KiB.
+    :rtype: int
+    :returns: Number of bytes written to :attr:`output`
+
+    This is the streaming equivalent of :func:`bytes_to_xml`.  The output is
+    byte for byte the same as ``bytes_to_xml(data)`` but only one chunk of the
+    input and its encoded form are held in memory at any time.  Use this when
+    embedding large binary payloads into an xml document that you are writing
+    out incrementally.
+
+    .. seealso::
+
+        :func:`xml_to_bytes_stream`
+            to decode data written by this function
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    # base64 encodes each 3 bytes of input into 4 bytes of output.  As long
+    # as every chunk but the last is a multiple of 3 no padding is emitted in
+    # the middle of the stream.
+    chunk_size = max(3, chunk_size - chunk_size % 3)
+    written = 0
+    leftover = b''
+    for chunk in _iter_byte_chunks(source, chunk_size):
+        if leftover:
+            chunk = leftover + bytes(chunk)
+        aligned = len(chunk) - len(chunk) % 3
+        leftover = bytes(chunk[aligned:])
+        if aligned:
+            encoded = b64encode(chunk[:aligned])
+            output.write(encoded)
+            written += len(encoded)
+    if leftover:
+        encoded = b64encode(leftover)
+        output.write(encoded)
+        written += len(encoded)
+    return written
+
+def xml_to_bytes_stream(source, output, chunk_size=_B64_CHUNK_SIZE):
+    '''Incrementally decode data encoded using :func:`bytes_to_xml_stream`
+
+    :arg source: file object opened in binary mode or a bytes-like object
+        holding the base64 encoded data.  Characters that are not part of the
+        base64 alphabet (for instance, newlines added when pretty printing
+        the xml) are ignored.
+    :arg output: file-like object with a :meth:`write` method that accepts
+        byte :class:`bytes`.  The decoded data is written here.
+    :kwarg chunk_size: Number of bytes of :attr:`source` to read at once.
+        Default 48KiB.
+    :rtype: int
+    :returns: Number of bytes written to :attr:`output`
+    :raises binascii.Error: if :attr:`source` is not validly base64 encoded
+
+    This is the streaming equivalent of :func:`xml_to_bytes`.  Only one chunk
+    of the encoded data and its decoded form are held in memory at any time.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    written = 0
+    leftover = b''
+    for chunk in _iter_byte_chunks(source, chunk_size):
+        chunk = leftover + _B64_IGNORED_RE.sub(b'', chunk)
+        # Only decode complete 4 byte groups; carry the rest into the next
+        # chunk
+        aligned = len(chunk) - len(chunk) % 4
+        leftover = chunk[aligned:]
+        if aligned:
+            decoded = b64decode(chunk[:aligned])
+            output.write(decoded)
+            written += len(decoded)
+    if leftover:
+        # Let b64decode raise the appropriate error for truncated input
+        decoded = b64decode(leftover)
+        output.write(decoded)
+        written += len(decoded)
+    return written
+
 def guess_encoding_to_xml(string, output_encoding='utf-8', attrib=False,
         control_chars='replace'):
     '''Return a byte :class:`bytes` suitable for inclusion in xml
@@ -883,6 +1019,128 @@ def guess_encoding_to_xml(string, output_encoding='utf-8', attrib=False,
             errors='replace', output_encoding=output_encoding,
             attrib=attrib, control_chars=control_chars)
 
+def _guess_encoding_to_xml_item(string, output_encoding, attrib,
+        control_chars, byte_escapable):
+    '''Do the work of :func:`guess_encoding_to_xml_batch` for one string
+
+    :returns: tuple of the xml byte :class:`bytes` and the per-item
+        statistics tuple
+    '''
+    if isunicodestring(string):
+        return (unicode_to_xml(string, encoding=output_encoding,
+            attrib=attrib, control_chars=control_chars), (None, False))
+
+    if find_invalid_xml(string, output_encoding) == -1:
+        # The common case: the bytes can go into the xml file as they are
+        # once the xml special characters are escaped
+        if byte_escapable:
+            string = bytes(string)
+            if attrib:
+                special_re = _XML_ATTRIB_SPECIAL_BYTES_RE
+            else:
+                special_re = _XML_SPECIAL_BYTES_RE
+            if special_re.search(string):
+                string = string.replace(b'&', b'&amp;').replace(b'<',
+                        b'&lt;').replace(b'>', b'&gt;')
+                if attrib:
+                    string = string.replace(b'"', b'&quot;')
+            return (string, (output_encoding, False))
+        return (unicode_to_xml(str(string, output_encoding),
+            encoding=output_encoding, attrib=attrib,
+            control_chars=control_chars), (output_encoding, False))
+
+    string = bytes(string)
+    input_encoding = guess_encoding(string)
+    return (byte_string_to_xml(string, input_encoding=input_encoding,
+        errors='replace', output_encoding=output_encoding, attrib=attrib,
+        control_chars=control_chars), (input_encoding, True))
+
+def _guess_encoding_to_xml_chunk(strings, output_encoding, attrib,
+        control_chars):
+    '''Process a list of strings for :func:`guess_encoding_to_xml_batch`
+
+    This is a module level function so that it can be sent to worker
+    processes.
+    '''
+    byte_escapable = codecs.lookup(output_encoding).name in \
+            _BYTE_ESCAPABLE_ENCODINGS
+    results = []
+    stats = []
+    for string in strings:
+        result, stat = _guess_encoding_to_xml_item(string, output_encoding,
+                attrib, control_chars, byte_escapable)
+        results.append(result)
+        stats.append(stat)
+    return (results, stats)
+
+def guess_encoding_to_xml_batch(strings, output_encoding='utf-8',
+        attrib=False, control_chars='replace', workers=None, chunksize=1000):
+    '''Make a sequence of mostly valid byte :class:`bytes` suitable for
+    inclusion in xml
+
+    :arg strings: Iterable of byte :class:`bytes` (or :class:`str`) to be
+        transformed into byte :class:`bytes` suitable for inclusion in xml
+    :kwarg output_encoding: Output encoding for the byte :class:`bytes`.  This
+        should match the encoding of your xml file.
+    :kwarg attrib: If :data:`True`, escape the items for use in an xml
+        attribute.  If :data:`False` (default) escape the items for use in
+        a text node.
+    :kwarg control_chars: What to do with :term:`control characters` in the
+        strings that need repairing.  See :func:`unicode_to_xml` for the
+        possible values.  Default ``replace``.
+    :kwarg workers: If given, process the strings on
+        a :class:`concurrent.futures.ProcessPoolExecutor` with this many
+        processes.  The strings must be picklable in that case.  Default is
+        to process them in this process.
+    :kwarg chunksize: When using :attr:`workers`, the number of strings sent
+        to a worker process at a time.  Default 1000
+    :raises XmlEncodeError: If :attr:`control_chars` is ``strict`` and a
+        string contains :term:`control characters`
+    :returns: tuple of two lists, each the same length as :attr:`strings`.
+        The first holds the xml ready byte :class:`bytes`.  The second holds
+        a tuple of ``(input_encoding, repaired)`` for each string.
+        ``input_encoding`` is the encoding the string was decoded from
+        (:data:`None` for :class:`str` strings) and ``repaired`` is
+        :data:`True` if the string was not valid in :attr:`output_encoding`
+        and had to go through :func:`guess_encoding_to_xml`.
+
+    This replaces the loop shown in
+    :func:`~kitchen.text.misc.byte_string_valid_xml`'s documentation.  Each
+    string is checked with :func:`~kitchen.text.misc.find_invalid_xml`.
+    Strings that are already valid in :attr:`output_encoding` are assumed to
+    be in that encoding and only have the xml special characters escaped.  For :term:`UTF-8`, ``latin-1``, and :term:`ASCII` output that
+    is done directly on the bytes so valid strings are never decoded.  Only
+    the invalid strings have their encoding guessed and are re-encoded the
+    way :func:`guess_encoding_to_xml` does it.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    if control_chars not in ('replace', 'ignore', 'strict'):
+        raise ValueError('The control_chars argument to'
+                ' guess_encoding_to_xml_batch must be one of ignore, replace,'
+                ' or strict')
+
+    if not workers:
+        return _guess_encoding_to_xml_chunk(strings, output_encoding,
+                attrib, control_chars)
+
+    # Only needed when processing in parallel so don't make every importer
+    # of this module pay for it
+    from concurrent.futures import ProcessPoolExecutor
+
+    strings = iter(strings)
+    chunks = iter(lambda: list(itertools.islice(strings, chunksize)), [])
+    results = []
+    stats = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_results, chunk_stats in executor.map(
+                _guess_encoding_to_xml_chunk, chunks,
+                itertools.repeat(output_encoding), itertools.repeat(attrib),
+                itertools.repeat(control_chars)):
+            results.extend(chunk_results)
+            stats.extend(chunk_stats)
+    return (results, stats)
+
 def to_xml(string, encoding='utf-8', attrib=False, control_chars='ignore'):
     '''*Deprecated*: Use :func:`guess_encoding_to_xml` instead
     '''
@@ -893,8 +1151,9 @@ def to_xml(string, encoding='utf-8', attrib=False, control_chars='ignore'):
             attrib=attrib, control_chars=control_chars)
 
 __all__ = ('BYTE_EXCEPTION_CONVERTERS', 'EXCEPTION_CONVERTERS',
-        'byte_string_to_xml', 'bytes_to_xml', 'exception_to_bytes',
-        'exception_to_unicode', 'getwriter', 'guess_encoding_to_xml',
+        'byte_string_to_xml', 'bytes_to_xml', 'bytes_to_xml_stream',
+        'exception_to_bytes', 'exception_to_unicode', 'getwriter',
+        'guess_encoding_to_xml', 'guess_encoding_to_xml_batch',
         'to_bytes', 'to_str', 'to_unicode', 'to_utf8', 'to_xml',
         'unicode_to_xml', 'xml_to_byte_string', 'xml_to_bytes',
-        'xml_to_unicode')
+        'xml_to_bytes_stream', 'xml_to_unicode')
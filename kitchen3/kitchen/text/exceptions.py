@@ -34,7 +34,14 @@ class XmlEncodeError(exceptions.KitchenError):
 
 class ControlCharError(exceptions.KitchenError):
     '''Exception thrown when an ascii control character is encountered.
+
+    .. attribute:: offset
+
+        Index of the offending character in the string or stream if known,
+        otherwise :data:`None`
     '''
-    pass
+    def __init__(self, *args, **kwargs):
+        self.offset = kwargs.pop('offset', None)
+        super(ControlCharError, self).__init__(*args, **kwargs)
 
 __all__ = ('XmlEncodeError', 'ControlCharError')
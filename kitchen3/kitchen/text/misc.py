@@ -33,29 +33,71 @@ Collection of text functions that don't fit in another category.
     :func:`~kitchen.text.misc.isbytestring`, and
     :func:`~kitchen.text.misc.isunicodestring` to help tell which string type
     is which on python2 and python3
+
+.. versionchanged:: kitchen 1.3.0, API: kitchen.text 2.3.0
+    Added :func:`~kitchen.text.misc.detect_encoding`,
+    :func:`~kitchen.text.misc.guess_file_encoding`,
+    :func:`~kitchen.text.misc.guess_file_encodings`,
+    :func:`~kitchen.text.misc.find_invalid_encoding`,
+    :func:`~kitchen.text.misc.find_invalid_xml`,
+    :func:`~kitchen.text.misc.process_control_chars_stream`, and
+    :class:`~kitchen.text.misc.ControlCharTable`
 '''
-import html.entities
+import codecs
+import functools
 import itertools
+import mmap
 import re
 
-try:
-    import chardet
-except ImportError:
-    chardet = None
-
 from kitchen.text.exceptions import ControlCharError
 
 # Define a threshold for chardet confidence.  If we fall below this we decode
 # byte strings we're guessing about as latin1
 _CHARDET_THRESHHOLD = 0.6
 
+# html.entities.entitydefs.  Set the first time html_entities_unescape() is
+# called
+_html_entitydefs = None
+
+# Only this many bytes from the start of a byte string are handed to chardet.
+# chardet's running time grows with the size of its input while its guess
+# rarely improves past the first few kilobytes.
+_CHARDET_SAMPLE_SIZE = 64 * 1024
+
+# When checking that a byte string is valid in an encoding, decode it this
+# many bytes at a time so we never hold a full decoded copy in memory
+_DECODE_CHUNK_SIZE = 64 * 1024
+
+_NON_ASCII_RE = re.compile(b'[\x80-\xff]')
+
+# Byte order marks and the codec that will strip them when decoding.  The
+# UTF-32 marks need to be checked before the UTF-16 ones because
+# BOM_UTF32_LE starts with BOM_UTF16_LE.
+_BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'),
+        (codecs.BOM_UTF32_LE, 'utf-32'),
+        (codecs.BOM_UTF32_BE, 'utf-32'),
+        (codecs.BOM_UTF16_LE, 'utf-16'),
+        (codecs.BOM_UTF16_BE, 'utf-16'))
+
 # ASCII control codes (the c0 codes) that are illegal in xml 1.0
 # Also unicode control codes (the C1 codes): also illegal in xml
 _CONTROL_CODES = frozenset(itertools.chain(range(0, 8), (11, 12), range(14, 32), range(128, 160)))
 _CONTROL_CHARS = frozenset(map(chr, _CONTROL_CODES))
+_CONTROL_CHARS_RE = re.compile('[%s]' % re.escape(''.join(sorted(_CONTROL_CHARS))))
 _IGNORE_TABLE = dict(zip(_CONTROL_CODES, [None] * len(_CONTROL_CODES)))
 _REPLACE_TABLE = dict(zip(_CONTROL_CODES, ['?'] * len(_CONTROL_CODES)))
 
+# Byte level patterns for the control characters in encodings where we can
+# find them without decoding.  Keyed by the codecs.lookup() name.  In UTF-8
+# the C1 codes are two bytes, \xc2 followed by \x80-\x9f.  \xc2 is never
+# a continuation byte so the match can't start in the middle of a character.
+_C0_BYTES = re.escape(bytes(sorted(c for c in _CONTROL_CODES if c < 128)))
+_CONTROL_BYTES_RE = {
+        'utf-8': re.compile(b'[' + _C0_BYTES + b']|\xc2[\x80-\x9f]'),
+        'iso8859-1': re.compile(b'[' + _C0_BYTES + b'\x80-\x9f]'),
+        'ascii': re.compile(b'[' + _C0_BYTES + b']'),
+        }
+
 # _ENTITY_RE
 _ENTITY_RE = re.compile(r'(?s)<[^>]*>|&#?\w+;')
 
@@ -107,7 +149,104 @@ def isunicodestring(obj):
         return True
     return False
 
-def guess_encoding(byte_string, disable_chardet=False):
+def _load_chardet():
+    '''Return the :mod:`chardet` module or :data:`None` if it isn't installed
+
+    :mod:`chardet` is slow to import and is only needed for byte
+    :class:`bytes` that aren't :term:`UTF-8` so we wait until then to import
+    it.  The module is saved as ``kitchen.text.misc.chardet`` like it was
+    when it was imported up front.  If something has already set that
+    attribute (for instance, to a stub or to :data:`None` to stop
+    :mod:`chardet` from being used), that value is returned instead.
+    '''
+    global chardet
+    try:
+        return chardet
+    except NameError:
+        pass
+    try:
+        import chardet
+    except ImportError:
+        chardet = None
+    return chardet
+
+def __getattr__(name):
+    # kitchen.text.misc.chardet used to be set when the module was imported
+    if name == 'chardet':
+        return _load_chardet()
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+def _detect_buffer_encoding(data, disable_chardet, sample_size):
+    '''Implement :func:`detect_encoding` for any object supporting the
+    buffer protocol
+
+    This lets :func:`guess_file_encoding` work directly on an :class:`mmap`
+    without copying the file into a byte :class:`bytes` first.
+    '''
+    if isbytestring(data):
+        # isascii() is a quick scan that doesn't allocate
+        is_ascii = data.isascii()
+    else:
+        is_ascii = _NON_ASCII_RE.search(data) is None
+    if is_ascii or find_invalid_encoding(data, 'utf-8') == -1:
+        return ('utf-8', 1.0)
+
+    chardet = None
+    if not disable_chardet:
+        chardet = _load_chardet()
+    if chardet:
+        if isbytestring(data) and (sample_size is None
+                or len(data) <= sample_size):
+            sample = data
+        else:
+            with memoryview(data) as view:
+                sample = bytes(view[:sample_size])
+        detection_info = chardet.detect(sample)
+        if detection_info['encoding'] and \
+                detection_info['confidence'] >= _CHARDET_THRESHHOLD:
+            return (detection_info['encoding'], detection_info['confidence'])
+
+    return ('latin-1', 0.0)
+
+def detect_encoding(byte_string, disable_chardet=False,
+        sample_size=_CHARDET_SAMPLE_SIZE):
+    '''Guess the encoding of a byte :class:`bytes` and report our confidence
+
+    :arg byte_string: byte :class:`bytes` to guess the encoding of
+    :kwarg disable_chardet: If this is True, we never attempt to use
+        :mod:`chardet` to guess the encoding.  Default: :data:`False`.
+    :kwarg sample_size: Maximum number of bytes from the start of
+        :attr:`byte_string` that are passed to :mod:`chardet`.  Default 64KiB.
+        Use :data:`None` to have :mod:`chardet` examine the whole string.
+    :raises TypeError: if :attr:`byte_string` is not a byte :class:`bytes` type
+    :returns: tuple of ``(encoding, confidence)``.  ``encoding`` is suitable
+        to pass as the encoding argument when encoding and decoding unicode
+        strings.  ``confidence`` is a float between ``0.0`` and ``1.0``.
+
+    This works like :func:`guess_encoding` but is designed to be cheap on
+    large inputs:
+
+    1) If :attr:`byte_string` is pure :term:`ASCII` we return ``('utf-8',
+       1.0)`` without decoding anything.
+    2) Otherwise we check that it is valid :term:`UTF-8` with an incremental
+       decoder, a chunk at a time, discarding the decoded text.  If it is
+       valid we return ``('utf-8', 1.0)``.
+    3) If :mod:`chardet` is available and not disabled, it is run over the
+       first :attr:`sample_size` bytes.  If its confidence is at least
+       ``0.6`` we return its guess and confidence.
+    4) Otherwise we return ``('latin-1', 0.0)``.  ``latin-1`` can decode any
+       byte so using it will not cause :exc:`UnicodeError` although the
+       output may be mangled.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    if not isbytestring(byte_string):
+        raise TypeError('byte_string must be a byte string (bytes, bytearray)')
+
+    return _detect_buffer_encoding(byte_string, disable_chardet, sample_size)
+
+def guess_encoding(byte_string, disable_chardet=False,
+        sample_size=_CHARDET_SAMPLE_SIZE):
     '''Try to guess the encoding of a byte :class:`bytes`
 
     :arg byte_string: byte :class:`bytes` to guess the encoding of
@@ -115,6 +254,9 @@ def guess_encoding(byte_string, disable_chardet=False):
         :mod:`chardet` to guess the encoding.  This is useful if you need to
         have reproducibility whether :mod:`chardet` is installed or not.
         Default: :data:`False`.
+    :kwarg sample_size: Maximum number of bytes from the start of
+        :attr:`byte_string` that are passed to :mod:`chardet`.  Default 64KiB.
+        Use :data:`None` to have :mod:`chardet` examine the whole string.
     :raises TypeError: if :attr:`byte_string` is not a byte :class:`bytes` type
     :returns: string containing a guess at the encoding of
         :attr:`byte_string`.  This is appropriate to pass as the encoding
@@ -129,24 +271,128 @@ def guess_encoding(byte_string, disable_chardet=False):
     arbitrarily claim that it is ``latin-1``.  Since ``latin-1`` will encode
     to every byte, decoding from ``latin-1`` to :class:`str` will not
     cause :exc:`UnicodeErrors` although the output might be mangled.
+
+    .. seealso::
+
+        :func:`detect_encoding`
+            if you also want to know how confident the guess is
+
+    .. versionchanged:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+        Validate :term:`UTF-8` incrementally and only hand the first
+        :attr:`sample_size` bytes to :mod:`chardet`.
     '''
-    if not isbytestring(byte_string):
-        raise TypeError('byte_string must be a byte string (bytes, bytearray)')
-    input_encoding = 'utf-8'
+    return detect_encoding(byte_string, disable_chardet=disable_chardet,
+            sample_size=sample_size)[0]
+
+def _detect_file_data_encoding(data, disable_chardet, sample_size):
+    for bom, encoding in _BOMS:
+        if data[:len(bom)] == bom:
+            return (encoding, 1.0)
+    return _detect_buffer_encoding(data, disable_chardet, sample_size)
+
+def _detect_fileobj_encoding(fileobj, disable_chardet, sample_size):
+    try:
+        fileno = fileobj.fileno()
+    except (AttributeError, OSError):
+        # Not backed by a real file (for instance, io.BytesIO).  We have to
+        # read the data into memory
+        return _detect_file_data_encoding(fileobj.read(), disable_chardet,
+                sample_size)
+
     try:
-        str(byte_string, input_encoding, 'strict')
-    except UnicodeDecodeError:
-        input_encoding = None
+        position = fileobj.tell()
+        mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        # Empty files can't be mapped and neither can pipes, sockets, or
+        # ttys.  Read those instead
+        return _detect_file_data_encoding(fileobj.read(), disable_chardet,
+                sample_size)
 
-    if not input_encoding and chardet and not disable_chardet:
-        detection_info = chardet.detect(byte_string)
-        if detection_info['confidence'] >= _CHARDET_THRESHHOLD:
-            input_encoding = detection_info['encoding']
+    try:
+        if not position:
+            return _detect_file_data_encoding(mapped, disable_chardet,
+                    sample_size)
+        # Start where the file object is, the same as reading it would
+        with memoryview(mapped) as view:
+            with view[position:] as data:
+                return _detect_file_data_encoding(data, disable_chardet,
+                        sample_size)
+    finally:
+        mapped.close()
+
+def guess_file_encoding(path_or_fileobj, disable_chardet=False,
+        sample_size=_CHARDET_SAMPLE_SIZE):
+    '''Guess the encoding of a file without reading it into memory
+
+    :arg path_or_fileobj: Path to the file or a file object opened in binary
+        mode
+    :kwarg disable_chardet: If this is True, we never attempt to use
+        :mod:`chardet` to guess the encoding.  Default: :data:`False`.
+    :kwarg sample_size: Maximum number of bytes from the start of the file
+        that are passed to :mod:`chardet`.  Default 64KiB.
+    :raises OSError: if the file cannot be opened or mapped
+    :returns: tuple of ``(encoding, confidence)`` as described in
+        :func:`detect_encoding`
+
+    The file is memory mapped and examined in place so only the portions
+    that are actually looked at are paged in and no copy of the file's
+    contents is made.  If the file starts with a byte order mark we return
+    the codec that knows how to strip that mark when decoding
+    (``utf-8-sig``, ``utf-16``, or ``utf-32``) with a confidence of ``1.0``.
+    Otherwise the detection works the same as :func:`detect_encoding`.
+
+    File objects that can't be memory mapped (pipes, sockets, ttys, empty
+    files) or that are not backed by a real file (for instance,
+    :class:`io.BytesIO`) are read into memory and passed to
+    :func:`detect_encoding`.  Either way, a file object is examined from
+    its current position onwards.
+
+    .. seealso::
+
+        :func:`guess_file_encodings`
+            to examine many files at once
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    if hasattr(path_or_fileobj, 'read'):
+        return _detect_fileobj_encoding(path_or_fileobj, disable_chardet,
+                sample_size)
 
-    if not input_encoding:
-        input_encoding = 'latin-1'
+    with open(path_or_fileobj, 'rb') as fileobj:
+        return _detect_fileobj_encoding(fileobj, disable_chardet, sample_size)
 
-    return input_encoding
+def guess_file_encodings(paths, workers=None, disable_chardet=False,
+        sample_size=_CHARDET_SAMPLE_SIZE):
+    '''Guess the encodings of many files using a pool of threads
+
+    :arg paths: Iterable of paths to files
+    :kwarg workers: Maximum number of threads to use.  Defaults to the
+        :class:`concurrent.futures.ThreadPoolExecutor` default.
+    :kwarg disable_chardet: If this is True, we never attempt to use
+        :mod:`chardet` to guess the encoding.  Default: :data:`False`.
+    :kwarg sample_size: Maximum number of bytes from the start of each file
+        that are passed to :mod:`chardet`.  Default 64KiB.
+    :raises OSError: if one of the files cannot be opened or mapped
+    :returns: :class:`dict` mapping each path to the ``(encoding,
+        confidence)`` tuple that :func:`guess_file_encoding` returns for it
+
+    Much of the time spent classifying large numbers of files is spent
+    waiting on the filesystem so running them through a thread pool lets
+    that waiting overlap.  The threads are run by
+    :func:`kitchen.iterutils.parallel_map` so a handful of files is
+    examined in the calling thread instead.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    # kitchen.iterutils imports this module so it can't be imported at the
+    # top
+    from kitchen.iterutils import parallel_map
+
+    paths = list(paths)
+    results = parallel_map(functools.partial(guess_file_encoding,
+            disable_chardet=disable_chardet, sample_size=sample_size), paths,
+            workers=workers)
+    return dict(zip(paths, results))
 
 def str_eq(str1, str2, encoding='utf-8', errors='replace'):
     '''Compare two strings, converting to byte :class:`bytes` if one is
@@ -195,6 +441,57 @@ def str_eq(str1, str2, encoding='utf-8', errors='replace'):
 
     return False
 
+class ControlCharTable(object):
+    '''Precompiled translation table for :func:`process_control_chars`
+
+    :arg mapping: :class:`dict` mapping characters (or their unicode
+        ordinals) to their replacement.  Replacements may be a :class:`str`
+        string, an ordinal, or :data:`None` to remove the character.  This is
+        the same format that :meth:`str.maketrans` takes.
+
+    Pass an instance of this as the ``strategy`` to
+    :func:`process_control_chars` or :func:`process_control_chars_stream` to
+    use your own replacements.  The table is normalized and the set of
+    characters it handles is computed when the object is created so build it
+    once and reuse it::
+
+        CONTROL_TO_SPACE = ControlCharTable(dict((c, ' ') for c in range(32)))
+        clean = process_control_chars(text, strategy=CONTROL_TO_SPACE)
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    __slots__ = ('table', 'chars')
+
+    def __init__(self, mapping):
+        #: Translation table suitable for :meth:`str.translate`
+        self.table = str.maketrans(mapping)
+        #: :class:`frozenset` of the characters that the table translates
+        self.chars = frozenset(map(chr, self.table))
+
+def _get_control_table(strategy, func_name):
+    '''Return the translation table and set of characters for a strategy
+
+    The table is :data:`None` for the ``strict`` strategy.
+    '''
+    if isinstance(strategy, ControlCharTable):
+        return (strategy.table, strategy.chars)
+    if strategy == 'replace':
+        return (_REPLACE_TABLE, _CONTROL_CHARS)
+    if strategy == 'ignore':
+        return (_IGNORE_TABLE, _CONTROL_CHARS)
+    if strategy == 'strict':
+        return (None, _CONTROL_CHARS)
+    raise ValueError('The strategy argument to %s must be one of ignore,'
+            ' replace, strict, or a ControlCharTable' % func_name)
+
+def _control_char_error(string, offset=0):
+    '''Create a :exc:`ControlCharError` for the first control character in
+    string
+    '''
+    offset += _CONTROL_CHARS_RE.search(string).start()
+    return ControlCharError('ASCII control code present in string input at'
+            ' offset %d' % offset, offset=offset)
+
 def process_control_chars(string, strategy='replace'):
     '''Look for and transform :term:`control characters` in a string
 
@@ -209,42 +506,103 @@ def process_control_chars(string, strategy='replace'):
         :ignore: Remove the characters altogether from the output
         :strict: Raise a :exc:`~kitchen.text.exceptions.ControlCharError` when
             we encounter a control character
+
+        A :class:`ControlCharTable` may also be given to use custom
+        replacements.
     :raises TypeError: if :attr:`string` is not a unicode string.
     :raises ValueError: if the strategy is not one of replace, ignore, or
         strict.
     :raises kitchen.text.exceptions.ControlCharError: if the strategy is
         ``strict`` and a :term:`control character` is present in the
-        :attr:`string`
+        :attr:`string`.  The exception's ``offset`` attribute is the index of
+        the first :term:`control character`.
     :returns: :class:`str` string with no :term:`control characters` in
         it.
 
     .. versionchanged:: kitchen 1.2.0, API: kitchen.text 2.2.0
         Strip out the C1 control characters in addition to the C0 control
         characters.
+    .. versionchanged:: kitchen 1.3.0, API: kitchen.text 2.3.0
+        Accept a :class:`ControlCharTable` as the strategy and report the
+        offset of the control character in ``strict`` mode.
     '''
     if not isunicodestring(string):
         raise TypeError('process_control_char must have a unicode type'
                 ' (str) as the first argument.')
-    if strategy not in ('replace', 'ignore', 'strict'):
-        raise ValueError('The strategy argument to process_control_chars'
-                ' must be one of ignore, replace, or strict')
+    control_table, control_chars = _get_control_table(strategy,
+            'process_control_chars')
 
     # Most strings don't have control chars and translating carries
     # a higher cost than testing whether the chars are in the string
     # So only translate if necessary
-    if not _CONTROL_CHARS.isdisjoint(string):
-        if strategy == 'replace':
-            control_table = _REPLACE_TABLE
-        elif strategy == 'ignore':
-            control_table = _IGNORE_TABLE
-        else:
+    if not control_chars.isdisjoint(string):
+        if control_table is None:
             # strategy can only equal 'strict'
-            raise ControlCharError('ASCII control code present in string'
-                    ' input')
+            raise _control_char_error(string)
         string = string.translate(control_table)
 
     return string
 
+def process_control_chars_stream(source, strategy='replace',
+        chunk_size=_DECODE_CHUNK_SIZE):
+    '''Transform :term:`control characters` in text from a stream
+
+    :arg source: text file object (opened in text mode) or an iterable of
+        :class:`str` strings
+    :kwarg strategy: What to do with :term:`control characters`.  Takes the
+        same values as :func:`process_control_chars`
+    :kwarg chunk_size: When :attr:`source` is a file object, the number of
+        characters to read from it at a time.  Default 64Ki characters.
+    :raises TypeError: if :attr:`source` yields something other than
+        a :class:`str` string
+    :raises ValueError: if the strategy is not valid
+    :raises kitchen.text.exceptions.ControlCharError: if the strategy is
+        ``strict`` and a :term:`control character` is found.  The exception's
+        ``offset`` attribute is the index of the character counted from the
+        start of the stream.
+    :returns: generator of :class:`str` strings with no :term:`control
+        characters` in them
+
+    This is the streaming equivalent of :func:`process_control_chars` for
+    text that is too large to hold in memory, for instance, to sanitize a
+    large log file::
+
+        with open('build.log', encoding='utf-8', errors='replace') as log:
+            with open('build.xml.log', 'w', encoding='utf-8') as output:
+                output.writelines(process_control_chars_stream(log))
+
+    Chunks without any :term:`control characters` in them are passed through
+    without being translated.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    control_table, control_chars = _get_control_table(strategy,
+            'process_control_chars_stream')
+
+    if hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), '')
+    else:
+        chunks = source
+
+    # Use a separate generator so that bad arguments raise immediately
+    # instead of on the first iteration
+    return _process_control_chars_chunks(chunks, control_table,
+            control_chars)
+
+def _process_control_chars_chunks(chunks, control_table, control_chars):
+    offset = 0
+    for chunk in chunks:
+        if not isunicodestring(chunk):
+            raise TypeError('process_control_chars_stream must be given'
+                    ' unicode (str) strings')
+        if not control_chars.isdisjoint(chunk):
+            if control_table is None:
+                raise _control_char_error(chunk, offset)
+            yield chunk.translate(control_table)
+        else:
+            yield chunk
+        offset += len(chunk)
+
 # Originally written by Fredrik Lundh (January 15, 2003) and placed in the
 # public domain::
 #
@@ -264,6 +622,13 @@ def html_entities_unescape(string):
     :rtype: :class:`str` string
     :returns: The plain text without html entities
     '''
+    global _html_entitydefs
+    if _html_entitydefs is None:
+        # Imported here so that importing kitchen.text doesn't load it
+        import html.entities
+        _html_entitydefs = html.entities.entitydefs
+    entitydefs = _html_entitydefs
+
     def fixup(match):
         string = match.group(0)
         if string[:1] == "<":
@@ -279,7 +644,7 @@ def html_entities_unescape(string):
                 # it in the output as is
                 pass
         elif string[:1] == "&":
-            entity = html.entities.entitydefs.get(string[1:-1])
+            entity = entitydefs.get(string[1:-1])
             if entity:
                 if entity[:2] == "&#":
                     try:
@@ -297,13 +662,122 @@ def html_entities_unescape(string):
                 ' for its first argument')
     return re.sub(_ENTITY_RE, fixup, string)
 
+def find_invalid_encoding(byte_string, encoding='utf-8'):
+    '''Find the first byte that is not valid in a specific encoding
+
+    :arg byte_string: bytes-like object (:class:`bytes`, :class:`bytearray`,
+        :class:`memoryview`, :class:`mmap.mmap`) to check
+    :kwarg encoding: encoding to test against.  Defaults to :term:`UTF-8`.
+    :raises TypeError: if :attr:`byte_string` is not a bytes-like object
+    :returns: Offset of the first byte that cannot be decoded using
+        :attr:`encoding` or ``-1`` if all of :attr:`byte_string` is valid
+
+    The data is decoded in 64KiB slices of a :class:`memoryview` and the
+    decoded text is thrown away as we go so memory use stays constant no
+    matter how large :attr:`byte_string` is.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    with memoryview(byte_string) as view:
+        view = view.cast('B')
+        if len(view) <= _DECODE_CHUNK_SIZE:
+            try:
+                str(view, encoding)
+            except UnicodeDecodeError as exc:
+                return exc.start
+            return -1
+
+        decoder = codecs.getincrementaldecoder(encoding)()
+        start = 0
+        pending = 0
+        try:
+            for start in range(0, len(view), _DECODE_CHUNK_SIZE):
+                # Bytes from the end of the previous chunk that the decoder
+                # is holding onto are prepended to this chunk when decoding
+                pending = len(decoder.getstate()[0])
+                decoder.decode(view[start:start + _DECODE_CHUNK_SIZE])
+            start = len(view)
+            pending = len(decoder.getstate()[0])
+            decoder.decode(b'', True)
+        except UnicodeDecodeError as exc:
+            return start - pending + exc.start
+    return -1
+
+def _find_control_char(view, encoding):
+    '''Find the first xml-invalid control character in data that is known
+    to be valid in encoding
+    '''
+    control_re = _CONTROL_BYTES_RE.get(codecs.lookup(encoding).name)
+    if control_re:
+        # We can scan the raw bytes
+        match = control_re.search(view)
+        if match:
+            return match.start()
+        return -1
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for start in range(0, len(view), _DECODE_CHUNK_SIZE):
+        pending = view[start - len(decoder.getstate()[0]):start]
+        u_chunk = decoder.decode(view[start:start + _DECODE_CHUNK_SIZE])
+        match = _CONTROL_CHARS_RE.search(u_chunk)
+        if match:
+            # Figure out how many bytes precede the control character by
+            # re-encoding the text in front of it
+            return (start - len(pending)
+                    + len(u_chunk[:match.start()].encode(encoding)))
+    return -1
+
+def find_invalid_xml(byte_string, encoding='utf-8'):
+    '''Find the first byte that would make a byte :class:`bytes` invalid in
+    xml
+
+    :arg byte_string: bytes-like object (:class:`bytes`, :class:`bytearray`,
+        :class:`memoryview`, :class:`mmap.mmap`) to check
+    :kwarg encoding: Encoding of the xml file.  Default: :term:`UTF-8`
+    :raises TypeError: if :attr:`byte_string` is not a bytes-like object
+    :returns: Offset of the first byte that is either not valid in
+        :attr:`encoding` or starts a :term:`control character` that xml does
+        not allow.  ``-1`` if :attr:`byte_string` can be placed in the xml
+        file as is.
+
+    For :term:`UTF-8`, ``latin-1``, and :term:`ASCII`, :term:`control
+    characters` are found with a precompiled regular expression run over the
+    raw bytes so no text is decoded at all, and the validity check then only
+    needs to look at the bytes in front of the first control character.
+    Other encodings are decoded incrementally a chunk at a time.
+
+    .. versionadded:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+    '''
+    with memoryview(byte_string) as view:
+        view = view.cast('B')
+        if codecs.lookup(encoding).name in _CONTROL_BYTES_RE:
+            control_offset = _find_control_char(view, encoding)
+            if control_offset == -1:
+                return find_invalid_encoding(view, encoding)
+            # Only the bytes in front of the control character could hold
+            # an earlier problem
+            invalid_offset = find_invalid_encoding(view[:control_offset],
+                    encoding)
+            if invalid_offset == -1:
+                return control_offset
+            return invalid_offset
+
+        invalid_offset = find_invalid_encoding(view, encoding)
+        if invalid_offset == -1:
+            return _find_control_char(view, encoding)
+        control_offset = _find_control_char(view[:invalid_offset], encoding)
+        if control_offset == -1:
+            return invalid_offset
+        return control_offset
+
 def byte_string_valid_xml(byte_string, encoding='utf-8'):
     '''Check that a byte :class:`bytes` would be valid in xml
 
-    :arg byte_string: Byte :class:`bytes` to check
+    :arg byte_string: bytes-like object (:class:`bytes`, :class:`bytearray`,
+        :class:`memoryview`, :class:`mmap.mmap`) to check
     :arg encoding: Encoding of the xml file.  Default: :term:`UTF-8`
     :returns: :data:`True` if the string is valid.  :data:`False` if it would
-        be invalid in the xml file
+        be invalid in the xml file or isn't a bytes-like object
 
     In some cases you'll have a whole bunch of byte strings and rather than
     transforming them to :class:`str` and back to byte :class:`bytes` for
@@ -318,25 +792,24 @@ def byte_string_valid_xml(byte_string, encoding='utf-8'):
             else:
                 processed_array.append(guess_bytes_to_xml(string, encoding='utf-8'))
         output_xml(processed_array)
+
+    .. seealso::
+
+        :func:`find_invalid_xml`
+            if you need to know where the problem is
+
+    .. versionchanged:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+        Accept the same bytes-like objects as :func:`find_invalid_xml` and
+        check the string without decoding all of it.
     '''
-    if not isbytestring(byte_string):
-        # Not a byte string
+    if isunicodestring(byte_string):
         return False
-
     try:
-        u_string = str(byte_string, encoding)
-    except UnicodeError:
-        # Not encoded with the xml file's encoding
-        return False
-
-    data = frozenset(u_string)
-    if data.intersection(_CONTROL_CHARS):
-        # Contains control codes
+        return find_invalid_xml(byte_string, encoding) == -1
+    except TypeError:
+        # Not a bytes-like object
         return False
 
-    # The byte string is compatible with this xml file
-    return True
-
 def byte_string_valid_encoding(byte_string, encoding='utf-8'):
     '''Detect if a byte :class:`bytes` is valid in a specific encoding
 
@@ -353,16 +826,21 @@ def byte_string_valid_encoding(byte_string, encoding='utf-8'):
         :class:`bytes` actually was encoded in that encoding.  If you want that
         sort of functionality, you probably want to use
         :func:`~kitchen.text.misc.guess_encoding` instead.
-    '''
-    try:
-        str(byte_string, encoding)
-    except UnicodeError:
-        # Not encoded with the xml file's encoding
-        return False
 
-    # byte string is valid in this encoding
-    return True
+    .. seealso::
 
-__all__ = ('byte_string_valid_encoding', 'byte_string_valid_xml',
-        'guess_encoding', 'html_entities_unescape', 'isbasestring',
-        'isbytestring', 'isunicodestring', 'process_control_chars', 'str_eq')
+        :func:`find_invalid_encoding`
+            if you need to know where the problem is
+
+    .. versionchanged:: kitchen 1.3.0 ; API kitchen.text 2.3.0
+        Accept :class:`bytearray` and :class:`memoryview` and check the
+        string without keeping a decoded copy.
+    '''
+    return find_invalid_encoding(byte_string, encoding) == -1
+
+__all__ = ('ControlCharTable', 'byte_string_valid_encoding',
+        'byte_string_valid_xml', 'detect_encoding', 'find_invalid_encoding',
+        'find_invalid_xml', 'guess_encoding', 'guess_file_encoding',
+        'guess_file_encodings', 'html_entities_unescape', 'isbasestring',
+        'isbytestring', 'isunicodestring', 'process_control_chars',
+        'process_control_chars_stream', 'str_eq')
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+#
+# Helpers for the benchmark tests.  Timings depend on what else the machine
+# is doing so the benchmarks are skipped unless KITCHEN_BENCHMARKS is set in
+# the environment.  Running one of the benchmark files directly prints its
+# timings:
+#
+#   PYTHONPATH=. python tests/test_iterutils_bench.py
+import os
+import timeit
+
+from nose.plugins.skip import SkipTest
+
+# Times each measurement is repeated.  The fastest one is used to keep noise
+# from other processes out of the comparison
+REPEAT = 5
+
+def best_time(func, number=1):
+    '''Return the fastest of :data:`REPEAT` runs of func in seconds
+
+    :kwarg number: Number of times to call func in each run
+    '''
+    return min(timeit.repeat(func, number=number, repeat=REPEAT))
+
+def require_benchmarks():
+    '''Skip the calling test unless benchmarks were asked for'''
+    if not os.environ.get('KITCHEN_BENCHMARKS'):
+        raise SkipTest('set KITCHEN_BENCHMARKS=1 to run benchmarks')
+
+def report(benchmarks):
+    '''Print the timings from functions that return (kitchen time, naive
+    time)
+
+    Each function's docstring describes what it measures.
+    '''
+    for benchmark in benchmarks:
+        fast_time, naive_time = benchmark()
+        print('%s: %.1fms, naive %.1fms' % (' '.join(benchmark.__doc__.split()),
+            fast_time * 1000, naive_time * 1000))
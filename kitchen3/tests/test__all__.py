@@ -45,6 +45,7 @@ class Test__all__(object):
         ('kitchen.text', 'converters', 'b64decode'),
         ('kitchen.text', 'converters', 'b64encode'),
         ('kitchen.text', 'converters', 'ControlCharError'),
+        ('kitchen.text', 'converters', 'find_invalid_xml'),
         ('kitchen.text', 'converters', 'guess_encoding'),
         ('kitchen.text', 'converters', 'html_entities_unescape'),
         ('kitchen.text', 'converters', 'isbytestring'),
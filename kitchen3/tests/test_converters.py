@@ -203,6 +203,40 @@ class TestConverters(unittest.TestCase, base_classes.UnicodeTestData):
     def test_xml_to_bytes(self):
         tools.eq_(converters.xml_to_bytes(self.b_byte_encoded), self.b_byte_chars)
 
+    def test_bytes_to_xml_stream(self):
+        # Chunk sizes that are and are not multiples of three must give the
+        # same output as the whole buffer encoder
+        for chunk_size in (1, 3, 7, 64, 1024):
+            output = io.BytesIO()
+            written = converters.bytes_to_xml_stream(io.BytesIO(self.b_byte_chars),
+                    output, chunk_size=chunk_size)
+            tools.eq_(output.getvalue(), self.b_byte_encoded)
+            tools.eq_(written, len(self.b_byte_encoded))
+
+            output = io.BytesIO()
+            converters.bytes_to_xml_stream(memoryview(self.b_byte_chars),
+                    output, chunk_size=chunk_size)
+            tools.eq_(output.getvalue(), self.b_byte_encoded)
+
+        output = io.BytesIO()
+        tools.eq_(converters.bytes_to_xml_stream(b'', output), 0)
+        tools.eq_(output.getvalue(), b'')
+
+    def test_xml_to_bytes_stream(self):
+        for chunk_size in (1, 3, 7, 64, 1024):
+            output = io.BytesIO()
+            written = converters.xml_to_bytes_stream(io.BytesIO(self.b_byte_encoded),
+                    output, chunk_size=chunk_size)
+            tools.eq_(output.getvalue(), self.b_byte_chars)
+            tools.eq_(written, len(self.b_byte_chars))
+
+        # Whitespace inserted into the xml is ignored
+        wrapped = b'\n'.join(self.b_byte_encoded[i:i + 76]
+                for i in range(0, len(self.b_byte_encoded), 76))
+        output = io.BytesIO()
+        converters.xml_to_bytes_stream(memoryview(wrapped), output, chunk_size=5)
+        tools.eq_(output.getvalue(), self.b_byte_chars)
+
     def test_guess_encoding_to_xml(self):
         tools.eq_(converters.guess_encoding_to_xml(self.u_entity), self.utf8_entity_escape)
         tools.eq_(converters.guess_encoding_to_xml(self.utf8_spanish), self.utf8_spanish)
@@ -223,6 +257,49 @@ class TestConverters(unittest.TestCase, base_classes.UnicodeTestData):
             tools.eq_(converters.guess_encoding_to_xml(self.euc_jp_japanese),
                     self.utf8_mangled_euc_jp_as_latin1)
 
+    def test_guess_encoding_to_xml_batch(self):
+        strings = [self.utf8_spanish, self.latin1_spanish, self.utf8_entity,
+                self.u_entity, self.utf8_ascii_chars, self.euc_jp_japanese,
+                b'"quoted" & <tagged>', b'']
+        for attrib in (False, True):
+            expected = [converters.guess_encoding_to_xml(s, attrib=attrib)
+                    for s in strings]
+            results, stats = converters.guess_encoding_to_xml_batch(strings,
+                    attrib=attrib)
+            tools.eq_(results, expected)
+            tools.eq_(len(stats), len(strings))
+            tools.eq_(stats[0], ('utf-8', False))
+            tools.eq_(stats[1][1], True)
+            tools.eq_(stats[3], (None, False))
+            tools.eq_(stats[4], ('utf-8', True))
+
+        # Output encodings that can't be escaped bytewise.  Strings that are
+        # valid in the output encoding are assumed to be in that encoding
+        strings = [self.euc_jp_japanese, self.u_entity, b'a & b',
+                self.utf8_ascii_chars]
+        expected = [converters.byte_string_to_xml(self.euc_jp_japanese,
+                    input_encoding='euc_jp', output_encoding='euc_jp'),
+                converters.unicode_to_xml(self.u_entity, encoding='euc_jp'),
+                b'a &amp; b',
+                converters.guess_encoding_to_xml(self.utf8_ascii_chars,
+                    output_encoding='euc_jp')]
+        results, stats = converters.guess_encoding_to_xml_batch(strings,
+                output_encoding='euc_jp')
+        tools.eq_(results, expected)
+        tools.eq_(stats[0], ('euc_jp', False))
+        tools.eq_(stats[3], ('utf-8', True))
+
+        tools.assert_raises(XmlEncodeError, converters.guess_encoding_to_xml_batch,
+                [self.utf8_ascii_chars], control_chars='strict')
+        tools.assert_raises(ValueError, converters.guess_encoding_to_xml_batch,
+                [self.utf8_spanish], control_chars='foo')
+
+    def test_guess_encoding_to_xml_batch_workers(self):
+        strings = [self.utf8_spanish, self.latin1_spanish, self.utf8_entity] * 5
+        expected = converters.guess_encoding_to_xml_batch(strings)
+        tools.eq_(converters.guess_encoding_to_xml_batch(strings, workers=2,
+            chunksize=4), expected)
+
 class TestGetWriter(unittest.TestCase, base_classes.UnicodeTestData):
     def setUp(self):
         self.io = io.BytesIO()
@@ -2,9 +2,20 @@
 #
 import unittest
 from nose import tools
+from nose.plugins.skip import SkipTest
 
+import copy
+import gettext
+import io
+import itertools
 import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import types
+import warnings
 
 from kitchen import i18n
 
@@ -876,3 +887,1075 @@ class TestDefaultLocaleDir(unittest.TestCase, base_classes.UnicodeTestData):
         # Returns msgid because the string is in a fallback catalog which we
         # haven't setup
         tools.eq_(_(self.u_in_fallback), self.utf8_in_fallback)
+
+
+class TestResultCache(unittest.TestCase, base_classes.UnicodeTestData):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.translations = i18n.get_translation_object('test',
+                ['%s/data/locale/' % os.path.dirname(__file__),
+                    '%s/data/locale-old' % os.path.dirname(__file__)])
+
+    def tearDown(self):
+        if self.old_LC_ALL:
+            os.environ['LC_ALL'] = self.old_LC_ALL
+        else:
+            del(os.environ['LC_ALL'])
+
+        if self.old_LANGUAGE:
+            os.environ['LANGUAGE'] = self.old_LANGUAGE
+
+    def test_results_cached(self):
+        tools.eq_(self.translations.gettext(self.u_kitchen), self.utf8_pt_kitchen)
+        tools.ok_((self.u_kitchen, 'gettext', None) in self.translations._result_cache)
+        tools.eq_(self.translations.gettext(self.u_kitchen), self.utf8_pt_kitchen)
+        tools.eq_(self.translations.ungettext(self.u_lemon, self.u_lemons, 2), self.u_limoes)
+        tools.ok_((self.u_lemon, self.u_lemons, 2, 'ungettext', None)
+                in self.translations._result_cache)
+        tools.eq_(self.translations.ungettext(self.u_lemon, self.u_lemons, 2), self.u_limoes)
+        # Messages from fallback catalogs are cached too
+        tools.eq_(self.translations.ugettext(self.u_in_fallback), self.u_yes_in_fallback)
+        tools.eq_(self.translations.ugettext(self.u_in_fallback), self.u_yes_in_fallback)
+
+    def test_set_output_charset_invalidates(self):
+        tools.eq_(self.translations.gettext(self.u_spanish), self.utf8_spanish)
+        self.translations.set_output_charset('latin1')
+        tools.eq_(self.translations._result_cache, {})
+        tools.eq_(self.translations.gettext(self.u_spanish), self.latin1_spanish)
+        tools.eq_(self.translations.lgettext(self.u_spanish), self.latin1_spanish)
+
+    def test_input_charset_invalidates(self):
+        tools.eq_(self.translations.ugettext(self.latin1_spanish),
+                self.u_mangled_spanish_latin1_as_utf8)
+        self.translations.input_charset = 'latin1'
+        tools.eq_(self.translations.ugettext(self.latin1_spanish), self.u_spanish)
+
+    def test_add_fallback_invalidates(self):
+        translations = i18n.get_translation_object('test',
+                ['%s/data/locale/' % os.path.dirname(__file__)])
+        tools.eq_(translations.ugettext(self.u_in_fallback), self.u_in_fallback)
+        translations.add_fallback(i18n.get_translation_object('test',
+                ['%s/data/locale-old' % os.path.dirname(__file__)]))
+        tools.eq_(translations.ugettext(self.u_in_fallback), self.u_yes_in_fallback)
+
+    def test_cache_bounded(self):
+        self.translations.result_cache_size = 2
+        for message in (self.u_kitchen, self.u_kuratomi, self.u_ja_kuratomi):
+            self.translations.ugettext(message)
+        tools.eq_(len(self.translations._result_cache), 2)
+        tools.ok_((self.u_kitchen, 'ugettext', None) not in self.translations._result_cache)
+
+        self.translations.result_cache_size = 0
+        self.translations.clear_cache()
+        tools.eq_(self.translations.ugettext(self.u_kitchen), self.u_pt_kitchen)
+        tools.eq_(self.translations._result_cache, {})
+
+    def test_cache_bounded_threads(self):
+        self.translations.result_cache_size = 16
+        errors = []
+        def translate(start):
+            try:
+                for i in range(start, start + 500):
+                    tools.eq_(self.translations.ugettext('message %d' % i),
+                            'message %d' % i)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=translate, args=(i * 500,))
+                for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tools.eq_(errors, [])
+        tools.eq_(len(self.translations._result_cache), 16)
+        # Unhashable messages aren't cached but still translate
+        tools.eq_(self.translations._cache_result(([],), 'result'), 'result')
+
+    def test_copies_do_not_share_cache(self):
+        translation = i18n.get_translation_object('test',
+                ['%s/data/locale/' % os.path.dirname(__file__)])
+        other = i18n.get_translation_object('test',
+                ['%s/data/locale/' % os.path.dirname(__file__)], codeset='latin1')
+        tools.eq_(translation.gettext(self.u_spanish), self.utf8_spanish)
+        tools.eq_(other.gettext(self.u_spanish), self.latin1_spanish)
+        tools.ok_(translation._result_cache is not other._result_cache)
+
+
+class TestTranslationViews(unittest.TestCase, base_classes.UnicodeTestData):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.localedirs = ['%s/data/locale/' % os.path.dirname(__file__),
+                '%s/data/locale-old' % os.path.dirname(__file__)]
+
+    def tearDown(self):
+        if self.old_LC_ALL:
+            os.environ['LC_ALL'] = self.old_LC_ALL
+        else:
+            del(os.environ['LC_ALL'])
+
+        if self.old_LANGUAGE:
+            os.environ['LANGUAGE'] = self.old_LANGUAGE
+
+    def test_shares_catalog(self):
+        translations = i18n.get_translation_object('test', self.localedirs,
+                python2_api=False)
+        other = i18n.get_translation_object('test', self.localedirs,
+                python2_api=True, codeset='latin1')
+        tools.ok_(translations is not other)
+        tools.eq_(translations.__class__, i18n.NewGNUTranslations)
+        tools.ok_(translations._catalog is other._catalog)
+        tools.ok_(translations.plural is other.plural)
+        tools.ok_(translations._fallback._catalog is other._fallback._catalog)
+        tools.eq_(translations._output_charset, None)
+        tools.eq_(other._output_charset, 'latin1')
+        tools.eq_(other._fallback._output_charset, 'latin1')
+        tools.eq_(translations.gettext(self.u_spanish), self.u_spanish)
+        tools.eq_(other.gettext(self.u_spanish), self.latin1_spanish)
+
+    def test_methods_bound_on_use(self):
+        translations = i18n.get_translation_object('test', self.localedirs,
+                python2_api=False)
+        for name in ('gettext', 'ngettext', 'lgettext', 'ugettext'):
+            tools.ok_(name not in translations.__dict__)
+        tools.eq_(translations.gettext(self.u_kitchen), self.u_pt_kitchen)
+        tools.ok_(translations.__dict__['gettext'].__self__ is translations)
+        tools.assert_raises(AttributeError, translations.ugettext, 'message')
+
+        translations.python2_api = True
+        tools.eq_(translations.gettext(self.u_kitchen), self.utf8_pt_kitchen)
+        tools.eq_(translations.ugettext(self.u_kitchen), self.u_pt_kitchen)
+
+    def test_copy_binds_to_copy(self):
+        translations = i18n.get_translation_object('test', self.localedirs,
+                python2_api=False)
+        translations.gettext(self.u_kitchen)
+        other = copy.copy(translations)
+        tools.ok_(other.gettext.__self__ is other)
+        other.set_output_charset('latin1')
+        tools.eq_(translations._output_charset, None)
+
+    def test_encoded_entries_shared(self):
+        translations = i18n.get_translation_object('test', self.localedirs)
+        other = i18n.get_translation_object('test', self.localedirs)
+        latin1 = i18n.get_translation_object('test', self.localedirs,
+                codeset='latin1')
+        tools.ok_(translations._encoded_catalogs is other._encoded_catalogs)
+        result = translations.gettext(self.u_kitchen)
+        tools.eq_(result, self.utf8_pt_kitchen)
+        tools.ok_(other.gettext(self.u_kitchen) is result)
+        tools.eq_(translations._encoded_catalogs['utf-8'][self.u_kitchen],
+                self.utf8_pt_kitchen)
+        tools.eq_(translations.ngettext(self.u_lemon, self.u_lemons, 2),
+                self.utf8_limoes)
+        tools.eq_(latin1.ngettext(self.u_lemon, self.u_lemons, 2),
+                self.latin1_limoes)
+        tools.eq_(translations._encoded_catalogs['latin1'][(self.u_lemon, 1)],
+                self.latin1_limoes)
+        # Messages from the fallback catalog are encoded by the fallback
+        tools.eq_(translations.gettext(self.u_in_fallback),
+                self.utf8_yes_in_fallback)
+        tools.ok_(self.u_in_fallback not in
+                translations._encoded_catalogs['utf-8'])
+        tools.ok_(self.u_in_fallback in
+                translations._fallback._encoded_catalogs['utf-8'])
+
+    def test_merged_encoded_entries(self):
+        translations = i18n.get_translation_object('test', self.localedirs)
+        merged = i18n.get_translation_object('test', self.localedirs,
+                merge_catalogs=True)
+        tools.ok_(merged._encoded_catalogs is not translations._encoded_catalogs)
+        tools.eq_(merged.gettext(self.u_in_fallback), self.utf8_yes_in_fallback)
+        tools.ok_(self.u_in_fallback not in
+                translations._encoded_catalogs.get('utf-8', {}))
+        other = i18n.get_translation_object('test', self.localedirs,
+                merge_catalogs=True)
+        tools.ok_(merged._encoded_catalogs is other._encoded_catalogs)
+
+    def test_one_warning_per_call(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            i18n.get_translation_object('test', self.localedirs)
+        tools.eq_(len(caught), 1)
+
+
+class TestLookupStats(unittest.TestCase, base_classes.UnicodeTestData):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.localedirs = ['%s/data/locale/' % os.path.dirname(__file__),
+                '%s/data/locale-old' % os.path.dirname(__file__)]
+        i18n.reset_lookup_stats()
+        i18n.enable_lookup_stats()
+
+    def tearDown(self):
+        i18n.disable_lookup_stats()
+        i18n.reset_lookup_stats()
+        if self.old_LC_ALL:
+            os.environ['LC_ALL'] = self.old_LC_ALL
+        else:
+            del(os.environ['LC_ALL'])
+
+        if self.old_LANGUAGE:
+            os.environ['LANGUAGE'] = self.old_LANGUAGE
+
+    def test_counts(self):
+        translations = i18n.get_translation_object('test', self.localedirs)
+        tools.eq_(translations.ugettext(self.u_kitchen), self.u_pt_kitchen)
+        tools.eq_(translations.ugettext(self.u_in_fallback), self.u_yes_in_fallback)
+        tools.eq_(translations.ungettext(self.u_lemon, self.u_lemons, 2), self.u_limoes)
+        for i in range(3):
+            tools.eq_(translations.ugettext(self.u_not_in_catalog), self.u_not_in_catalog)
+        tools.eq_(translations.ungettext(self.u_spanish, self.u_spanish, 2),
+                self.u_spanish)
+        tools.eq_(translations.gettext_many([self.u_kitchen, self.u_spanish]),
+                [self.utf8_pt_kitchen, self.utf8_spanish])
+
+        stats = i18n.lookup_stats()
+        tools.eq_(stats['lookups'], 9)
+        tools.eq_(stats['hits'], {0: 3, 1: 1})
+        tools.eq_(stats['misses'], 5)
+        # One for the fallback hit, one for each miss
+        tools.eq_(stats['fallbacks'], 6)
+        tools.ok_(stats['time'] > 0)
+        tools.eq_(i18n.missing_messages(), [(self.u_not_in_catalog, 3),
+            (self.u_spanish, 2)])
+        tools.eq_(i18n.missing_messages(1), [(self.u_not_in_catalog, 3)])
+
+    def test_reencodes(self):
+        translations = i18n.get_translation_object('test', self.localedirs,
+                codeset='latin1')
+        tools.eq_(translations.gettext(self.u_spanish), self.latin1_spanish)
+        tools.eq_(translations.gettext(self.latin1_spanish), self.latin1_spanish)
+        tools.eq_(i18n.lookup_stats()['reencodes'], 1)
+
+    def test_threads_added_up(self):
+        translations = i18n.get_translation_object('test', self.localedirs,
+                python2_api=False)
+        threads = [threading.Thread(target=translations.gettext,
+            args=(self.u_not_in_catalog,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tools.eq_(i18n.lookup_stats()['lookups'], 4)
+        tools.eq_(i18n.missing_messages(), [(self.u_not_in_catalog, 4)])
+
+    def test_exited_threads_folded(self):
+        translations = i18n.get_translation_object('test', self.localedirs,
+                python2_api=False)
+        before = len(i18n._all_lookup_counters)
+        for i in range(20):
+            thread = threading.Thread(target=translations.gettext,
+                    args=(self.u_not_in_catalog,))
+            thread.start()
+            thread.join()
+        # The exited threads' counters aren't kept but their counts are
+        tools.ok_(len(i18n._all_lookup_counters) <= before + 1)
+        tools.eq_(i18n.lookup_stats()['lookups'], 20)
+        tools.eq_(i18n.missing_messages(), [(self.u_not_in_catalog, 20)])
+        i18n.reset_lookup_stats()
+        tools.eq_(i18n.lookup_stats()['lookups'], 0)
+
+    def test_switch_while_looking_up(self):
+        translations = i18n.get_translation_object('test', self.localedirs,
+                python2_api=False)
+        i18n.disable_lookup_stats()
+        many = i18n.NewGNUTranslations.__dict__['gettext_many']
+        errors = []
+        done = threading.Event()
+
+        def look_up():
+            try:
+                while not done.is_set():
+                    translations.gettext_many([self.u_kitchen])
+                    translations.gettext(self.u_kitchen)
+            except Exception as e:
+                errors.append(e)
+
+        def switch():
+            for i in range(200):
+                i18n.enable_lookup_stats()
+                i18n.disable_lookup_stats()
+
+        lookers = [threading.Thread(target=look_up) for i in range(2)]
+        switchers = [threading.Thread(target=switch) for i in range(4)]
+        for thread in lookers + switchers:
+            thread.start()
+        for thread in switchers:
+            thread.join()
+        done.set()
+        for thread in lookers:
+            thread.join()
+        tools.eq_(errors, [])
+        tools.eq_(i18n._uninstrumented, {})
+        tools.ok_(i18n.NewGNUTranslations.__dict__['gettext_many'] is many)
+
+    def test_disabled(self):
+        i18n.disable_lookup_stats()
+        translations = i18n.get_translation_object('test', self.localedirs,
+                python2_api=False)
+        translations.gettext(self.u_not_in_catalog)
+        translations.gettext_many([self.u_not_in_catalog])
+        # Nothing is wrapped when the stats are off
+        tools.ok_(translations.gettext.__self__ is translations)
+        tools.eq_(i18n.lookup_stats()['lookups'], 0)
+        tools.eq_(i18n.missing_messages(), [])
+
+
+class TestBatchTranslation(unittest.TestCase, base_classes.UnicodeTestData):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.localedirs = ['%s/data/locale/' % os.path.dirname(__file__),
+                '%s/data/locale-old' % os.path.dirname(__file__)]
+
+    def tearDown(self):
+        if self.old_LC_ALL:
+            os.environ['LC_ALL'] = self.old_LC_ALL
+        else:
+            del(os.environ['LC_ALL'])
+
+        if self.old_LANGUAGE:
+            os.environ['LANGUAGE'] = self.old_LANGUAGE
+
+    def all_translations(self):
+        for python2_api in (True, False):
+            yield i18n.DummyTranslations(python2_api=python2_api)
+            for kwargs in ({}, {'merge_catalogs': True},
+                    {'class_': i18n.LazyGNUTranslations}):
+                yield i18n.get_translation_object('test', self.localedirs,
+                        python2_api=python2_api, **kwargs)
+            yield i18n.get_translation_object('test', self.localedirs[:1],
+                    python2_api=python2_api)
+
+    def test_gettext_many(self):
+        messages = [self.u_kitchen, self.utf8_kitchen, self.u_in_fallback,
+                self.u_not_in_catalog, self.latin1_spanish, None, 5,
+                self.u_kitchen]
+        for translations in self.all_translations():
+            expected = [translations.gettext(message) for message in messages]
+            translations.clear_cache()
+            tools.eq_(translations.gettext_many(messages), expected)
+            # And again with the results cached
+            tools.eq_(translations.gettext_many(iter(messages)), expected)
+
+    def test_ngettext_many(self):
+        messages = [(self.u_lemon, self.u_lemons, n) for n in range(4)]
+        messages.extend([(self.utf8_lemon, self.utf8_lemons, 2),
+            (self.u_not_in_catalog, self.utf8_not_in_catalog, 2),
+            (self.u_not_in_catalog, self.utf8_not_in_catalog, 1),
+            (None, None, 1)])
+        for translations in self.all_translations():
+            expected = [translations.ngettext(*message) for message in messages]
+            translations.clear_cache()
+            tools.eq_(translations.ngettext_many(messages), expected)
+            tools.eq_(translations.ngettext_many(messages), expected)
+
+    def test_cached(self):
+        translations = i18n.get_translation_object('test', self.localedirs,
+                python2_api=False)
+        translations.clear_cache()
+        tools.eq_(translations.gettext_many([self.u_kitchen]),
+                [self.u_pt_kitchen])
+        tools.eq_(translations._result_cache[(self.u_kitchen, 'ugettext',
+            None)], self.u_pt_kitchen)
+        tools.eq_(translations.ngettext_many([(self.u_lemon, self.u_lemons, 2)]),
+                [self.u_limoes])
+        tools.ok_((self.u_lemon, self.u_lemons, 2, 'ungettext', None)
+                in translations._result_cache)
+
+
+class TestMergedNewGNURealTranslations_UTF8(TestFallbackNewGNURealTranslations_UTF8):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.translations = i18n.get_translation_object('test',
+                ['%s/data/locale/' % os.path.dirname(__file__),
+                    '%s/data/locale-old' % os.path.dirname(__file__)],
+                merge_catalogs=True)
+
+    def test_merged(self):
+        '''All of the catalogs were merged so there's no fallback chain'''
+        tools.eq_(self.translations._fallback, None)
+        tools.ok_(self.u_in_fallback in self.translations._catalog)
+        # The first catalog's entries win
+        tools.eq_(self.translations._catalog[self.u_kitchen], self.u_pt_kitchen)
+
+    def test_merged_catalog_shared(self):
+        other = i18n.get_translation_object('test',
+                ['%s/data/locale/' % os.path.dirname(__file__),
+                    '%s/data/locale-old' % os.path.dirname(__file__)],
+                merge_catalogs=True, codeset='latin1')
+        tools.ok_(other._catalog is self.translations._catalog)
+
+        # The objects in the unmerged cache are untouched
+        unmerged = i18n.get_translation_object('test',
+                ['%s/data/locale/' % os.path.dirname(__file__)])
+        tools.ok_(self.u_in_fallback not in unmerged._catalog)
+
+
+class TestLazyGNURealTranslations_UTF8(TestNewGNURealTranslations_UTF8):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.translations = i18n.get_translation_object('test',
+                ['%s/data/locale/' % os.path.dirname(__file__)],
+                class_=i18n.LazyGNUTranslations)
+
+    def test_class(self):
+        tools.ok_(isinstance(self.translations, i18n.LazyGNUTranslations))
+
+
+class TestFallbackLazyGNURealTranslations_UTF8(TestFallbackNewGNURealTranslations_UTF8):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.translations = i18n.get_translation_object('test',
+                ['%s/data/locale/' % os.path.dirname(__file__),
+                    '%s/data/locale-old' % os.path.dirname(__file__)],
+                class_=i18n.LazyGNUTranslations)
+
+
+class TestPluralFunction(unittest.TestCase):
+    mofiles = ('%s/data/locale/pt_BR/LC_MESSAGES/test.mo' % os.path.dirname(__file__),
+            '%s/data/locale-old/pt_BR/LC_MESSAGES/test.mo' % os.path.dirname(__file__))
+
+    expressions = ('(n > 1)',
+            # Polish
+            '(n==1 ? 0 : n%10>=2 && n%10<=4 && (n%100<10 || n%100>=20) ? 1 : 2)',
+            # Arabic
+            '(n==0 ? 0 : n==1 ? 1 : n==2 ? 2 : n%100>=3 && n%100<=10 ? 3'
+                ' : n%100>=11 ? 4 : 5)')
+
+    def test_same_as_gettext(self):
+        for expression in self.expressions:
+            plural = i18n._plural_function(expression)
+            compiled = gettext.c2py(expression)
+            for n in itertools.chain(range(-5, 2500), (10 ** 6 + 2, 2 ** 70)):
+                tools.eq_(plural(n), compiled(n))
+        plural = i18n._plural_function(None)
+        for n in (0, 1, 2, 1000, 1001, 5000):
+            tools.eq_(plural(n), int(n != 1))
+
+    def test_non_int(self):
+        plural = i18n._plural_function('(n > 1)')
+        # Values that aren't in the table are checked by gettext's function
+        tools.assert_raises(TypeError, plural, '2')
+        tools.eq_(plural(True), 0)
+
+    def test_shared(self):
+        translations = []
+        for cls in (i18n.NewGNUTranslations, i18n.LazyGNUTranslations):
+            for mofile in self.mofiles:
+                with open(mofile, 'rb') as mo_fh:
+                    translations.append(cls(mo_fh))
+        plural = translations[0].plural
+        tools.ok_(plural is i18n._plural_function('(n > 1)'))
+        for translation in translations[1:]:
+            tools.ok_(translation.plural is plural)
+
+
+class TestLazyGNUTranslations(unittest.TestCase):
+    mofiles = ('%s/data/locale/pt_BR/LC_MESSAGES/test.mo' % os.path.dirname(__file__),
+            # This catalog has a hash table
+            '%s/data/locale-old/pt_BR/LC_MESSAGES/test.mo' % os.path.dirname(__file__))
+
+    def test_same_as_eager_catalog(self):
+        for mofile in self.mofiles:
+            with open(mofile, 'rb') as mo_fh:
+                eager = i18n.NewGNUTranslations(mo_fh)
+            with open(mofile, 'rb') as mo_fh:
+                lazy = i18n.LazyGNUTranslations(mo_fh)
+            for msgid, msgstr in eager._catalog.items():
+                tools.eq_(lazy._catalog[msgid], msgstr)
+            tools.eq_(dict(lazy._catalog), eager._catalog)
+            tools.eq_(len(lazy._catalog), len(eager._catalog))
+            tools.eq_(lazy._info, eager._info)
+            tools.eq_(lazy._charset, eager._charset)
+            tools.eq_([lazy.plural(n) for n in range(4)],
+                    [eager.plural(n) for n in range(4)])
+
+    def test_decodes_on_demand(self):
+        with open(self.mofiles[1], 'rb') as mo_fh:
+            lazy = i18n.LazyGNUTranslations(mo_fh)
+        tools.eq_(lazy._catalog._entries, {})
+        tools.eq_(lazy._catalog['kitchen sink'], 'placeholder')
+        tools.eq_(list(lazy._catalog._entries.keys()), ['kitchen sink'])
+
+    def test_missing(self):
+        for mofile in self.mofiles:
+            with open(mofile, 'rb') as mo_fh:
+                lazy = i18n.LazyGNUTranslations(mo_fh)
+            tools.ok_('not in the catalog' not in lazy._catalog)
+            tools.ok_('￿' not in lazy._catalog)
+            # Plural msgids aren't available as singular keys and vice versa
+            tools.ok_('1 lemon' not in lazy._catalog)
+            tools.ok_(('1 lemon', 2) not in lazy._catalog)
+            tools.ok_(('kitchen sink', 0) not in lazy._catalog)
+
+    def test_file_object_without_fileno(self):
+        with open(self.mofiles[0], 'rb') as mo_fh:
+            data = mo_fh.read()
+        lazy = i18n.LazyGNUTranslations(io.BytesIO(data))
+        tools.eq_(lazy._catalog['kitchen sink'], 'pia da cozinha')
+
+    def test_bad_file(self):
+        tools.assert_raises(OSError, i18n.LazyGNUTranslations, io.BytesIO(b''))
+        tools.assert_raises(OSError, i18n.LazyGNUTranslations,
+                io.BytesIO(b'\x00' * 32))
+
+
+class CountingGNUTranslations(i18n.NewGNUTranslations):
+    parsed = 0
+
+    def _parse(self, fp):
+        CountingGNUTranslations.parsed += 1
+        i18n.NewGNUTranslations._parse(self, fp)
+
+
+class TestCatalogCache(unittest.TestCase, base_classes.UnicodeTestData):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.localedir = os.path.join(self.tmpdir, 'locale')
+        shutil.copytree('%s/data/locale-old' % os.path.dirname(__file__),
+                self.localedir)
+        self.mofile = os.path.join(self.localedir, 'pt_BR', 'LC_MESSAGES',
+                'test.mo')
+        self.cachedir = os.path.join(self.tmpdir, 'cache')
+        CountingGNUTranslations.parsed = 0
+
+    def tearDown(self):
+        if self.old_LC_ALL:
+            os.environ['LC_ALL'] = self.old_LC_ALL
+        else:
+            del(os.environ['LC_ALL'])
+
+        if self.old_LANGUAGE:
+            os.environ['LANGUAGE'] = self.old_LANGUAGE
+
+        shutil.rmtree(self.tmpdir)
+        for key in list(i18n._translations):
+            if key[0] is CountingGNUTranslations:
+                i18n._translations.discard(key)
+
+    def load(self, catalog_cache):
+        # Simulate a new process
+        for key in list(i18n._translations):
+            if key[0] is CountingGNUTranslations:
+                i18n._translations.discard(key)
+        return i18n.get_translation_object('test', [self.localedir],
+                class_=CountingGNUTranslations, python2_api=False,
+                catalog_cache=catalog_cache)
+
+    def check_translations(self, translations):
+        tools.eq_(translations.gettext(self.u_kitchen), 'placeholder')
+        tools.eq_(translations.gettext(self.u_in_fallback), self.u_yes_in_fallback)
+        tools.eq_(translations.ngettext(self.u_limao, self.u_limoes, 1), '1 placeholder')
+        tools.eq_(translations.ngettext(self.u_limao, self.u_limoes, 2), '4 placeholders')
+        tools.eq_(translations.lgettext(self.u_in_fallback), self.utf8_yes_in_fallback)
+
+    def test_cache_dir(self):
+        self.check_translations(self.load(self.cachedir))
+        tools.eq_(CountingGNUTranslations.parsed, 1)
+        tools.eq_(len(os.listdir(self.cachedir)), 1)
+
+        translations = self.load(self.cachedir)
+        tools.eq_(CountingGNUTranslations.parsed, 1)
+        self.check_translations(translations)
+        with open(self.mofile, 'rb') as mo_fh:
+            parsed = i18n.NewGNUTranslations(mo_fh)
+        tools.eq_(translations._catalog, parsed._catalog)
+        tools.eq_(translations._info, parsed._info)
+        tools.eq_(translations._charset, parsed._charset)
+
+    def test_cache_next_to_mofile(self):
+        self.check_translations(self.load(True))
+        tools.ok_(os.path.exists(self.mofile + '.cache'))
+        self.check_translations(self.load(True))
+        tools.eq_(CountingGNUTranslations.parsed, 1)
+
+    def test_stale_cache(self):
+        self.load(self.cachedir)
+        mo_stat = os.stat(self.mofile)
+        os.utime(self.mofile, ns=(mo_stat.st_atime_ns,
+            mo_stat.st_mtime_ns + 1000000000))
+        self.check_translations(self.load(self.cachedir))
+        tools.eq_(CountingGNUTranslations.parsed, 2)
+        self.load(self.cachedir)
+        tools.eq_(CountingGNUTranslations.parsed, 2)
+
+    def test_corrupt_cache(self):
+        self.load(True)
+        with open(self.mofile + '.cache', 'wb') as cache_fh:
+            cache_fh.write(b'\x00garbage')
+        self.check_translations(self.load(True))
+        tools.eq_(CountingGNUTranslations.parsed, 2)
+
+    def test_unwritable_cache(self):
+        # A regular file where the cache directory should be
+        open(self.cachedir, 'w').close()
+        self.check_translations(self.load(self.cachedir))
+        self.check_translations(self.load(self.cachedir))
+        tools.eq_(CountingGNUTranslations.parsed, 2)
+
+    def test_lazy_not_cached(self):
+        translations = i18n.get_translation_object('test', [self.localedir],
+                class_=i18n.LazyGNUTranslations, catalog_cache=self.cachedir)
+        tools.ok_(isinstance(translations, i18n.LazyGNUTranslations))
+        tools.ok_(not os.path.exists(self.cachedir))
+
+
+class TestTranslationCache(unittest.TestCase, base_classes.UnicodeTestData):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.localedir = os.path.join(self.tmpdir, 'locale')
+        shutil.copytree('%s/data/locale-old' % os.path.dirname(__file__),
+                self.localedir)
+        self.mofile = os.path.join(self.localedir, 'pt_BR', 'LC_MESSAGES',
+                'test.mo')
+        CountingGNUTranslations.parsed = 0
+        i18n.clear_translation_cache()
+
+    def tearDown(self):
+        if self.old_LC_ALL:
+            os.environ['LC_ALL'] = self.old_LC_ALL
+        else:
+            del(os.environ['LC_ALL'])
+
+        if self.old_LANGUAGE:
+            os.environ['LANGUAGE'] = self.old_LANGUAGE
+
+        shutil.rmtree(self.tmpdir)
+        i18n.set_translation_cache_limits()
+        i18n.clear_translation_cache()
+
+    def load(self, **kwargs):
+        return i18n.get_translation_object('test', [self.localedir],
+                class_=CountingGNUTranslations, python2_api=False, **kwargs)
+
+    def test_info(self):
+        self.load()
+        self.load()
+        info = i18n.translation_cache_info()
+        tools.eq_(info['entries'], 1)
+        tools.eq_(info['misses'], 1)
+        tools.eq_(info['hits'], 1)
+        tools.eq_(info['paths'], [self.mofile])
+        tools.ok_(info['bytes'] > 0)
+        tools.eq_(CountingGNUTranslations.parsed, 1)
+
+        i18n.clear_translation_cache()
+        info = i18n.translation_cache_info()
+        tools.eq_((info['entries'], info['bytes'], info['hits']), (0, 0, 0))
+
+    def test_revalidate_reloads_changed_catalog(self):
+        self.load()
+        mo_stat = os.stat(self.mofile)
+        os.utime(self.mofile, ns=(mo_stat.st_atime_ns,
+            mo_stat.st_mtime_ns + 1000000000))
+        # Without revalidate the loaded catalog is used as is
+        self.load()
+        tools.eq_(CountingGNUTranslations.parsed, 1)
+
+        translations = self.load(revalidate=True)
+        tools.eq_(CountingGNUTranslations.parsed, 2)
+        tools.eq_(translations.gettext(self.u_kitchen), 'placeholder')
+        tools.eq_(i18n.translation_cache_info()['reloads'], 1)
+        self.load(revalidate=True)
+        tools.eq_(CountingGNUTranslations.parsed, 2)
+
+    def test_merged_catalog_follows_reload(self):
+        translations = self.load(merge_catalogs=True)
+        catalog = translations._catalog
+        tools.ok_(self.load(merge_catalogs=True)._catalog is catalog)
+
+        mo_stat = os.stat(self.mofile)
+        os.utime(self.mofile, ns=(mo_stat.st_atime_ns,
+            mo_stat.st_mtime_ns + 1000000000))
+        translations = self.load(merge_catalogs=True, revalidate=True)
+        tools.ok_(translations._catalog is not catalog)
+        tools.eq_(translations.gettext(self.u_kitchen), 'placeholder')
+
+    def test_preload(self):
+        paths = i18n.preload(['test'], [self.localedir], languages=['pt_BR',
+            'de'], class_=CountingGNUTranslations)
+        tools.eq_(paths, [self.mofile])
+        tools.eq_(CountingGNUTranslations.parsed, 1)
+        translations = self.load()
+        tools.eq_(CountingGNUTranslations.parsed, 1)
+        tools.eq_(translations.gettext(self.u_kitchen), 'placeholder')
+
+    def test_preload_shares_lazy_catalog(self):
+        i18n.preload('test', [self.localedir], class_=i18n.LazyGNUTranslations)
+        translations = i18n.get_translation_object('test', [self.localedir],
+                class_=i18n.LazyGNUTranslations, python2_api=False)
+        cached = [entry[0] for key, entry in i18n._translations._entries.items()
+                if key[0] is i18n.LazyGNUTranslations]
+        tools.eq_(len(cached), 1)
+        tools.ok_(translations._catalog is cached[0]._catalog)
+
+    def test_preload_before_fork(self):
+        if not hasattr(os, 'fork'):
+            raise SkipTest('os.fork is not available')
+        i18n.preload('test', [self.localedir], class_=CountingGNUTranslations)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                translations = self.load()
+                os.write(write_fd, ('%s %s' % (CountingGNUTranslations.parsed,
+                    translations.gettext(self.u_kitchen))).encode('utf-8'))
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as pipe:
+            output = pipe.read().decode('utf-8')
+        os.waitpid(pid, 0)
+        tools.eq_(output, '1 placeholder')
+
+    def test_maxsize(self):
+        cache = i18n._TranslationCache(maxsize=2)
+        for path in ('a', 'b', 'c'):
+            cache.get((None, path), lambda: i18n.DummyTranslations())
+        tools.eq_(list(cache), [(None, 'b'), (None, 'c')])
+        # Using an entry makes it the most recently used
+        cache.get((None, 'b'), lambda: None)
+        cache.get((None, 'd'), lambda: i18n.DummyTranslations())
+        tools.eq_(list(cache), [(None, 'b'), (None, 'd')])
+        tools.eq_(cache.info()['evictions'], 2)
+
+    def test_maxbytes(self):
+        self.load()
+        size = i18n.translation_cache_info()['bytes']
+        i18n.set_translation_cache_limits(maxbytes=size)
+        i18n.get_translation_object('test', [self.localedir],
+                class_=i18n.NewGNUTranslations, python2_api=False)
+        info = i18n.translation_cache_info()
+        tools.eq_(info['entries'], 1)
+        tools.eq_(info['evictions'], 1)
+        # The newest catalog is kept even when it alone is over the limit
+        i18n.set_translation_cache_limits(maxbytes=1)
+        tools.eq_(i18n.translation_cache_info()['entries'], 1)
+
+    def test_maxbytes_frees_merged_catalogs(self):
+        shutil.copytree('%s/data/locale' % os.path.dirname(__file__),
+                os.path.join(self.tmpdir, 'locale-new'))
+        localedirs = [os.path.join(self.tmpdir, 'locale-new'), self.localedir]
+        translations = i18n.get_translation_object('test', localedirs,
+                class_=CountingGNUTranslations, python2_api=False,
+                merge_catalogs=True)
+        merged = translations._catalog
+        info = i18n.translation_cache_info()
+        tools.eq_((info['entries'], info['merged']), (2, 1))
+        tools.ok_(info['bytes'] > sum(i18n._catalog_size(entry[0])
+            for entry in i18n._translations._entries.values()))
+
+        # Evicting either catalog it was built from frees the merged catalog
+        refs = sys.getrefcount(merged)
+        i18n.set_translation_cache_limits(maxbytes=1)
+        tools.eq_(sys.getrefcount(merged), refs - 1)
+        info = i18n.translation_cache_info()
+        tools.eq_((info['entries'], info['merged']), (1, 0))
+        tools.eq_(info['bytes'], i18n._catalog_size(
+            list(i18n._translations._entries.values())[0][0]))
+
+    def test_single_flight(self):
+        cache = i18n._TranslationCache()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def load():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return i18n.DummyTranslations()
+
+        results = []
+        def worker():
+            results.append(cache.get((None, 'slow'), load))
+
+        threads = [threading.Thread(target=worker) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        tools.eq_(len(calls), 1)
+        tools.eq_(len(results), 8)
+        tools.ok_(all(result is results[0] for result in results))
+
+    def test_failed_load(self):
+        cache = i18n._TranslationCache()
+        def load():
+            raise IOError('boom')
+        tools.assert_raises(IOError, cache.get, (None, 'bad'), load)
+        tools.eq_(len(cache), 0)
+        # A later attempt isn't blocked by the failed one
+        translations = i18n.DummyTranslations()
+        tools.ok_(cache.get((None, 'bad'), lambda: translations) is translations)
+
+
+class TestDiscoveryCache(unittest.TestCase, base_classes.UnicodeTestData):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.localedir = os.path.join(self.tmpdir, 'locale')
+        os.mkdir(self.localedir)
+        i18n.clear_discovery_cache()
+
+    def tearDown(self):
+        if self.old_LC_ALL:
+            os.environ['LC_ALL'] = self.old_LC_ALL
+        else:
+            del(os.environ['LC_ALL'])
+
+        if self.old_LANGUAGE:
+            os.environ['LANGUAGE'] = self.old_LANGUAGE
+
+        shutil.rmtree(self.tmpdir)
+        i18n.clear_discovery_cache()
+
+    def install_catalog(self, lang):
+        shutil.copytree('%s/data/locale/pt_BR' % os.path.dirname(__file__),
+                os.path.join(self.localedir, lang))
+        # Make sure the new directory changes the localedir's mtime
+        localedir_stat = os.stat(self.localedir)
+        os.utime(self.localedir, ns=(localedir_stat.st_atime_ns,
+            localedir_stat.st_mtime_ns + 1000000000))
+
+    def translate(self, **kwargs):
+        translations = i18n.get_translation_object('test', [self.localedir],
+                python2_api=False, **kwargs)
+        return translations.gettext(self.u_kitchen)
+
+    def test_same_as_gettext_find(self):
+        self.install_catalog('pt_BR')
+        localedirs = ['%s/data/locale/' % os.path.dirname(__file__),
+                '%s/data/locale-old' % os.path.dirname(__file__), self.localedir]
+        for languages in (None, ['pt_BR'], ['pt'], ['C', 'pt_BR'], ['de', 'pt_BR.UTF-8']):
+            expected = []
+            for localedir in localedirs + [i18n._DEFAULT_LOCALEDIR]:
+                expected.extend(gettext.find('test', localedir, languages, all=1))
+            tools.eq_(i18n._discover_mofiles('test', localedirs, languages), expected)
+            tools.eq_(i18n._discover_mofiles('test', localedirs, languages), expected)
+
+    def test_hits(self):
+        self.install_catalog('pt_BR')
+        tools.eq_(self.translate(), self.u_pt_kitchen)
+        info = i18n.discovery_cache_info()
+        tools.eq_((info['hits'], info['misses'], info['entries']), (0, 1, 1))
+        tools.ok_(info['probes'] > 0)
+
+        tools.eq_(self.translate(), self.u_pt_kitchen)
+        info = i18n.discovery_cache_info()
+        tools.eq_((info['hits'], info['misses']), (1, 1))
+        tools.eq_(info['probes_saved'], info['probes'])
+
+        # The languages from the environment are part of the key
+        os.environ['LC_ALL'] = 'de_DE.utf8'
+        tools.eq_(self.translate(), self.u_kitchen)
+        tools.eq_(i18n.discovery_cache_info()['misses'], 2)
+
+    def test_clear(self):
+        tools.eq_(self.translate(), self.u_kitchen)
+        self.install_catalog('pt_BR')
+        # Without revalidation, the new catalog isn't seen
+        tools.eq_(self.translate(), self.u_kitchen)
+        i18n.clear_discovery_cache()
+        tools.eq_(i18n.discovery_cache_info()['entries'], 0)
+        tools.eq_(self.translate(), self.u_pt_kitchen)
+
+    def test_revalidate(self):
+        tools.eq_(self.translate(revalidate=True), self.u_kitchen)
+        tools.eq_(self.translate(revalidate=True), self.u_kitchen)
+        tools.eq_(i18n.discovery_cache_info()['hits'], 1)
+        self.install_catalog('pt_BR')
+        tools.eq_(self.translate(revalidate=True), self.u_pt_kitchen)
+        info = i18n.discovery_cache_info()
+        tools.eq_((info['hits'], info['misses'], info['stale']), (1, 2, 1))
+
+    def test_expand_language(self):
+        # Compare with gettext's private implementation that this replaces
+        for language in ('pt_BR.UTF-8', 'pt_BR', 'pt', 'de_DE@euro',
+                'sr_RS.UTF-8@latin', 'ca_ES@valencia', 'ja.eucJP', 'C', ''):
+            tools.eq_(i18n._expand_language(language),
+                    gettext._expand_lang(language))
+
+    def test_threads(self):
+        self.install_catalog('pt_BR')
+        def discover():
+            for i in range(50):
+                i18n._discover_mofiles('test', [self.localedir], None)
+        threads = [threading.Thread(target=discover) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        info = i18n.discovery_cache_info()
+        tools.eq_(info['hits'] + info['misses'], 400)
+        tools.eq_(info['entries'], 1)
+
+    def test_disabled(self):
+        tools.eq_(self.translate(discovery_cache=False), self.u_kitchen)
+        self.install_catalog('pt_BR')
+        tools.eq_(self.translate(discovery_cache=False), self.u_pt_kitchen)
+        tools.eq_(i18n.discovery_cache_info()['entries'], 0)
+
+
+class TestKitchenGettext(unittest.TestCase):
+    def run_python(self, code):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.check_output([sys.executable, '-c', code],
+                env=env).decode('utf-8').strip()
+
+    def test_lazy_setup(self):
+        '''Importing kitchen doesn't search for message catalogs'''
+        tools.eq_(self.run_python('import kitchen, kitchen.i18n;'
+            ' print(kitchen.i18n.discovery_cache_info()["misses"],'
+            ' len(kitchen.i18n._translations))'), '0 0')
+        tools.eq_(self.run_python('import kitchen, kitchen.i18n;'
+            ' kitchen._("a"); kitchen.b_("a");'
+            ' info = kitchen.i18n.discovery_cache_info();'
+            ' print(info["misses"], info["hits"])'), '1 1')
+
+    def test_gettext_funcs(self):
+        import kitchen
+        tools.eq_(kitchen._('kitchen sink'), 'kitchen sink')
+        tools.eq_(kitchen.N_('lemon', 'lemons', 2), 'lemons')
+        tools.eq_(kitchen.b_('kitchen sink'), b'kitchen sink')
+        tools.eq_(kitchen.bN_('lemon', 'lemons', 1), b'lemon')
+
+
+class TestTranslationRegistry(unittest.TestCase, base_classes.UnicodeTestData):
+    def setUp(self):
+        self.old_LC_ALL = os.environ.get('LC_ALL', None)
+        os.environ['LC_ALL'] = 'pt_BR.utf8'
+
+        self.old_LANGUAGE = os.environ.pop('LANGUAGE', None)
+
+        self.registry = i18n.TranslationRegistry(localedirs=(
+            '%s/data/locale/' % os.path.dirname(__file__),), maxsize=2)
+
+    def tearDown(self):
+        if self.old_LC_ALL:
+            os.environ['LC_ALL'] = self.old_LC_ALL
+        else:
+            del(os.environ['LC_ALL'])
+
+        if self.old_LANGUAGE:
+            os.environ['LANGUAGE'] = self.old_LANGUAGE
+
+    def test_get(self):
+        translations = self.registry.get('test', languages=['pt_BR'])
+        tools.eq_(translations.gettext(self.u_kitchen), self.u_pt_kitchen)
+        tools.ok_(self.registry.get('test', languages=('pt_BR',)) is translations)
+        # Languages from the environment
+        tools.eq_(self.registry.get('test').gettext(self.u_kitchen), self.u_pt_kitchen)
+        tools.ok_(self.registry.get('test') is self.registry.get('test'))
+
+        self.registry.maxsize = 4
+        latin1 = self.registry.get('test', languages=['pt_BR'], codeset='latin1')
+        tools.ok_(latin1 is not translations)
+        tools.eq_(latin1.lgettext(self.u_kitchen), self.latin1_pt_kitchen)
+
+        dummy = self.registry.get('test', languages=['de'])
+        tools.ok_(isinstance(dummy, i18n.DummyTranslations))
+        tools.eq_(dummy.gettext(self.u_kitchen), self.u_kitchen)
+
+    def test_lru(self):
+        pt = self.registry.get('test', languages=['pt_BR'])
+        de = self.registry.get('test', languages=['de'])
+        # Use pt so de is the least recently used
+        self.registry.get('test', languages=['pt_BR'])
+        self.registry.get('test', languages=['fr'])
+        tools.eq_(len(self.registry), 2)
+        tools.ok_(self.registry.get('test', languages=['pt_BR']) is pt)
+        tools.ok_(self.registry.get('test', languages=['de']) is not de)
+
+        self.registry.clear()
+        tools.eq_(len(self.registry), 0)
+
+    def test_threads(self):
+        results = []
+        def get():
+            results.append(self.registry.get('test', languages=['pt_BR']))
+        threads = [threading.Thread(target=get) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tools.eq_(len(results), 8)
+        tools.ok_(all(result is results[0] for result in results))
+
+    def test_current_translations(self):
+        tools.eq_(i18n.current_gettext(self.u_kitchen), self.u_kitchen)
+        tools.eq_(i18n.current_ngettext(self.u_lemon, self.u_lemons, 2), self.u_lemons)
+
+        token = self.registry.activate('test', languages=['pt_BR'])
+        try:
+            tools.ok_(i18n.current_translations() is
+                    self.registry.get('test', languages=['pt_BR']))
+            tools.eq_(i18n.current_gettext(self.u_kitchen), self.u_pt_kitchen)
+            tools.eq_(i18n.current_ngettext(self.u_lemon, self.u_lemons, 2), self.u_limoes)
+
+            # Other threads have their own current translations
+            results = []
+            thread = threading.Thread(target=lambda: results.append(
+                i18n.current_gettext(self.u_kitchen)))
+            thread.start()
+            thread.join()
+            tools.eq_(results, [self.u_kitchen])
+        finally:
+            i18n.deactivate_translations(token)
+        tools.eq_(i18n.current_gettext(self.u_kitchen), self.u_kitchen)
+
+    def test_asyncio_tasks(self):
+        import asyncio
+        async def translate(languages):
+            i18n.activate_translations(self.registry.get('test', languages=languages))
+            await asyncio.sleep(0)
+            return i18n.current_gettext(self.u_kitchen)
+        async def main():
+            return await asyncio.gather(translate(['pt_BR']), translate(['de']))
+        tools.eq_(asyncio.run(main()), [self.u_pt_kitchen, self.u_kitchen])
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# Benchmarks for the kitchen.i18n plural tables.  Plural functions built by
+# kitchen look the plural index up in a table of _PLURAL_TABLE_SIZE entries
+# instead of evaluating the catalog's Plural-Forms expression each time.
+# They're timed against the function that gettext.c2py() compiles from the
+# same expression.  See benchmark.py for how to run them.
+import copy
+import gettext
+import os
+import unittest
+
+from nose import tools
+
+from kitchen import i18n
+
+import benchmark
+
+# Counts formatted per run.  These are all below _PLURAL_TABLE_SIZE, which is
+# what a UI showing item counts mostly sees
+COUNTS = range(1000)
+# Times each run goes through COUNTS
+LOOPS = 20
+
+GERMANIC = 'n != 1'
+# Russian, one of the longer expressions in common use
+RUSSIAN = ('(n%10==1 && n%100!=11 ? 0 : n%10>=2 && n%10<=4 &&'
+        ' (n%100<10 || n%100>=20) ? 1 : 2)')
+
+def compare(fast, naive):
+    '''Time calling fast and naive on every count in :data:`COUNTS` after
+    checking that they agree
+
+    :returns: tuple of (fast time, naive time) in seconds
+    '''
+    tools.eq_([fast(n) for n in COUNTS], [naive(n) for n in COUNTS])
+
+    def run(func):
+        def loops():
+            for i in range(LOOPS):
+                for n in COUNTS:
+                    func(n)
+        return loops
+    return (benchmark.best_time(run(fast)), benchmark.best_time(run(naive)))
+
+def bench_germanic():
+    '''plural function for n != 1, :data:`LOOPS` x :data:`COUNTS` counts'''
+    return compare(i18n._plural_function(GERMANIC), gettext.c2py(GERMANIC))
+
+def bench_russian():
+    '''plural function for the Russian expression, :data:`LOOPS` x
+    :data:`COUNTS` counts
+    '''
+    return compare(i18n._plural_function(RUSSIAN), gettext.c2py(RUSSIAN))
+
+def bench_ngettext():
+    '''NewGNUTranslations.ngettext() of a catalog message, :data:`LOOPS` x
+    :data:`COUNTS` counts
+    '''
+    localedir = '%s/data/locale' % os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(localedir, 'pt_BR', 'LC_MESSAGES', 'test.mo'),
+            'rb') as mofile:
+        fast = i18n.NewGNUTranslations(mofile, python2_api=False)
+    naive = copy.copy(fast)
+    naive.plural = gettext.c2py(i18n._plural_expression(fast._info))
+    # Look each count up in the catalog rather than the result cache
+    fast.result_cache_size = naive.result_cache_size = 0
+    return compare(lambda n: fast.ngettext('1 lemon', '4 lemons', n),
+            lambda n: naive.ngettext('1 lemon', '4 lemons', n))
+
+BENCHMARKS = (bench_germanic, bench_russian, bench_ngettext)
+
+class TestPluralBenchmark(unittest.TestCase):
+    def setUp(self):
+        benchmark.require_benchmarks()
+
+    def test_germanic(self):
+        bench_germanic()
+
+    def test_russian(self):
+        bench_russian()
+
+    def test_ngettext(self):
+        bench_ngettext()
+
+if __name__ == '__main__':
+    benchmark.report(BENCHMARKS)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# Import time benchmarks.  These run python with -X importtime and check that
+# importing kitchen modules doesn't pull in modules that are slow to import
+# and only needed by a few functions.
+import os
+import subprocess
+import sys
+import unittest
+
+from nose import tools
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that importing kitchen must not load.  Each one is imported by the
+# functions that need it.
+HEAVY_MODULES = frozenset(('chardet', 'gettext', 'html.entities', 'locale',
+    'concurrent.futures', 'http.client', 'urllib.request', 'xml.sax.saxutils'))
+
+def import_times(statement):
+    '''Run statement in a new interpreter with -X importtime
+
+    :returns: dict mapping each module that was imported to its cumulative
+        import time in microseconds
+    '''
+    env = dict(os.environ)
+    env['PYTHONPATH'] = KITCHEN_DIR
+    process = subprocess.Popen([sys.executable, '-X', 'importtime', '-c',
+        statement], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stderr = process.communicate()[1].decode('utf-8', 'replace')
+    tools.eq_(process.returncode, 0, stderr)
+
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            times[fields[2].strip()] = int(fields[1])
+        except (IndexError, ValueError):
+            # Header line
+            continue
+    return times
+
+class TestImportTime(unittest.TestCase):
+    def check_no_heavy_imports(self, statement):
+        times = import_times(statement)
+        # Modules python itself imported before ours don't show up.  Those
+        # aren't our responsibility
+        heavy = HEAVY_MODULES.intersection(times)
+        tools.ok_(not heavy, '%s imported %s' % (statement,
+            ', '.join(sorted(heavy))))
+        return times
+
+    def test_kitchen(self):
+        times = self.check_no_heavy_imports('import kitchen')
+        tools.ok_('kitchen.i18n' not in times)
+        tools.ok_('kitchen.text' not in times)
+
+    def test_converters(self):
+        self.check_no_heavy_imports('import kitchen.text.converters')
+
+    def test_text_modules(self):
+        self.check_no_heavy_imports('import kitchen.text.misc,'
+                ' kitchen.text.display, kitchen.text.utf8, kitchen.iterutils,'
+                ' kitchen.collections')
+
+    def test_lazy_attributes(self):
+        times = import_times('import kitchen; kitchen.text.converters.to_bytes;'
+                ' kitchen.i18n')
+        tools.ok_('kitchen.text.converters' in times)
+        tools.ok_('kitchen.i18n' in times)
+
+    def test_lazy_imports_work(self):
+        from kitchen.text import converters, misc
+        tools.eq_(converters.unicode_to_xml('<&>', attrib=True), b'&lt;&amp;&gt;')
+        tools.eq_(misc.html_entities_unescape('&lt;&eacute;'), '<é')
+        misc.chardet
+        # Later calls use the saved modules instead of importing again
+        tools.ok_(converters._xml_escape is not None)
+        tools.ok_(misc._html_entitydefs is not None)
+        tools.assert_raises(AttributeError, getattr, misc, 'not_here')
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 #
+import itertools
+import threading
 import unittest
 from nose import tools
 
@@ -60,3 +62,213 @@ class TestIterutils(unittest.TestCase):
         tools.eq_(list(iterutils.iterate(b'abc', include_string=True)), [ord(b'a'), ord(b'b'), ord(b'c')])
         tools.ok_(list(iterutils.iterate('abc')) == ['abc'])
         tools.ok_(list(iterutils.iterate('abc', include_string=True)) == ['a', 'b', 'c'])
+
+    def test_iterate_returns_iterator(self):
+        items = iter([1, 2, 3])
+        tools.ok_(iterutils.iterate(items) is items)
+        tools.eq_(next(iterutils.iterate([4, 5])), 4)
+        tools.eq_(next(iterutils.iterate(4)), 4)
+
+
+    def test_chunked(self):
+        tools.eq_(list(iterutils.chunked(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]])
+        tools.eq_(list(iterutils.chunked(range(6), 3)), [[0, 1, 2], [3, 4, 5]])
+        tools.eq_(list(iterutils.chunked([], 3)), [])
+        tools.eq_(list(iterutils.chunked(iter('abc'), 1)), [['a'], ['b'], ['c']])
+        tools.assert_raises(ValueError, iterutils.chunked, [1], 0)
+
+    def test_chunked_reuse_buffer(self):
+        chunks = []
+        buffers = set()
+        for chunk in iterutils.chunked(range(7), 3, reuse_buffer=True):
+            chunks.append(list(chunk))
+            buffers.add(id(chunk))
+        tools.eq_(chunks, [[0, 1, 2], [3, 4, 5], [6]])
+        tools.eq_(len(buffers), 1)
+
+    def test_batched_by_size(self):
+        tools.eq_(list(iterutils.batched_by_size([b'aaaa', b'bb', b'cc',
+            b'ddddddd', b'e'], 6)), [[b'aaaa', b'bb'], [b'cc'], [b'ddddddd'],
+                [b'e']])
+        tools.eq_(list(iterutils.batched_by_size(['ab', 'cd', 'ef'], 4)),
+                [['ab', 'cd'], ['ef']])
+        tools.eq_(list(iterutils.batched_by_size([], 4)), [])
+        # Sized by the encoded length instead of the number of characters
+        tools.eq_(list(iterutils.batched_by_size(['caf\xe9', 'abc'], 4,
+            size=lambda item: len(item.encode('utf-8')))), [['caf\xe9'], ['abc']])
+        tools.assert_raises(ValueError, iterutils.batched_by_size, [b'a'], 0)
+
+    def test_sliding_window(self):
+        tools.eq_(list(iterutils.sliding_window('abcd', 2)),
+                [('a', 'b'), ('b', 'c'), ('c', 'd')])
+        tools.eq_(list(iterutils.sliding_window(range(3), 3)), [(0, 1, 2)])
+        tools.eq_(list(iterutils.sliding_window(range(2), 3)), [])
+        tools.eq_(list(iterutils.sliding_window(iter([1, 2]), 1)), [(1,), (2,)])
+        tools.assert_raises(ValueError, iterutils.sliding_window, [1], 0)
+
+    def test_flatten(self):
+        tools.eq_(list(iterutils.flatten([1, [2, (3, [4])], 'abc', b'de'])),
+                [1, 2, 3, 4, 'abc', b'de'])
+        tools.eq_(list(iterutils.flatten([[], [[]], 1])), [1])
+        tools.eq_(list(iterutils.flatten(5)), [5])
+        tools.eq_(list(iterutils.flatten('abc')), ['abc'])
+        tools.eq_(sorted(iterutils.flatten({'a': 1, 'b': 2})), ['a', 'b'])
+        tools.eq_(list(iterutils.flatten(iter([iter([1, 2]), 3]))), [1, 2, 3])
+
+    def test_flatten_depth(self):
+        data = [1, [2, (3, [4])]]
+        tools.eq_(list(iterutils.flatten(data, depth=0)), [1, [2, (3, [4])]])
+        tools.eq_(list(iterutils.flatten(data, depth=1)), [1, 2, (3, [4])])
+        tools.eq_(list(iterutils.flatten(data, depth=2)), [1, 2, 3, [4]])
+        tools.eq_(list(iterutils.flatten(data, depth=3)), [1, 2, 3, 4])
+        tools.assert_raises(ValueError, iterutils.flatten, data, -1)
+
+    def test_flatten_strings(self):
+        tools.eq_(list(iterutils.flatten(['ab', ['c', '']], include_string=True)),
+                ['a', 'b', 'c', ''])
+        tools.eq_(list(iterutils.flatten([b'ab'], include_string=True)),
+                [ord(b'a'), ord(b'b')])
+
+    def test_flatten_deep(self):
+        data = []
+        for i in range(100000):
+            data = [data, i]
+        tools.eq_(list(iterutils.flatten(data)), list(range(100000)))
+
+    def test_flatten_cycles(self):
+        data = [1, [2]]
+        data[1].append(data)
+        tools.assert_raises(ValueError, list, iterutils.flatten(data))
+        # The same list appearing twice is not a cycle
+        shared = [1, 2]
+        tools.eq_(list(iterutils.flatten([shared, [shared]])), [1, 2, 1, 2])
+
+    def test_parallel_map(self):
+        tools.eq_(list(iterutils.parallel_map(str, range(100), workers=4)),
+                [str(i) for i in range(100)])
+        tools.eq_(list(iterutils.parallel_map(str, range(100), workers=4,
+                chunksize=7)), [str(i) for i in range(100)])
+        tools.eq_(sorted(iterutils.parallel_map(abs, range(-50, 50),
+                workers=4, chunksize=3, ordered=False)),
+                sorted(abs(i) for i in range(-50, 50)))
+        tools.eq_(list(iterutils.parallel_map(str, [], workers=4)), [])
+
+    def test_parallel_map_processes(self):
+        tools.eq_(list(iterutils.parallel_map(abs, range(-20, 20), workers=2,
+                mode='process', chunksize=5)),
+                [abs(i) for i in range(-20, 20)])
+
+    def test_parallel_map_serial(self):
+        main = threading.get_ident()
+        threads = lambda item: threading.get_ident()
+        # Small inputs and a single worker run in the calling thread
+        tools.eq_(set(iterutils.parallel_map(threads, range(3), workers=4)),
+                set([main]))
+        tools.eq_(set(iterutils.parallel_map(threads, range(100), workers=1)),
+                set([main]))
+        tools.ok_(main not in set(iterutils.parallel_map(threads, range(100),
+                workers=4)))
+
+    def test_parallel_map_lazy(self):
+        consumed = []
+        def counting():
+            for i in itertools.count():
+                consumed.append(i)
+                yield i
+        results = iterutils.parallel_map(str, counting(), workers=2,
+                chunksize=10)
+        tools.eq_(list(itertools.islice(results, 5)),
+                ['0', '1', '2', '3', '4'])
+        results.close()
+        # No more than workers * 2 chunks plus the one being returned
+        tools.ok_(len(consumed) <= 50)
+
+    def test_parallel_map_errors(self):
+        def fail(item):
+            if item == 30:
+                raise KeyError(item)
+            return item
+        results = iterutils.parallel_map(fail, range(100), workers=4)
+        tools.eq_(list(itertools.islice(results, 30)), list(range(30)))
+        tools.assert_raises(KeyError, next, results)
+        tools.assert_raises(ValueError, iterutils.parallel_map, str, [],
+                mode='greenlet')
+        tools.assert_raises(ValueError, iterutils.parallel_map, str, [],
+                workers=0)
+        tools.assert_raises(ValueError, iterutils.parallel_map, str, [],
+                chunksize=0)
+
+class GetItemOnly(object):
+    '''Only iterable through the __getitem__ sequence protocol'''
+    def __init__(self, length):
+        self.length = length
+
+    def __getitem__(self, index):
+        if index >= self.length:
+            raise IndexError(index)
+        return index
+
+
+class IterRaises(object):
+    def __init__(self, iterable):
+        self.iterable = iterable
+
+    def __iter__(self):
+        if not self.iterable:
+            raise TypeError('not iterable')
+        return iter([1])
+
+
+class StrSubclass(str):
+    pass
+
+
+class TestIterKindCache(unittest.TestCase):
+    def test_getitem_only(self):
+        tools.ok_(iterutils.isiterable(GetItemOnly(2)))
+        tools.eq_(list(iterutils.iterate(GetItemOnly(2))), [0, 1])
+        tools.ok_(GetItemOnly not in iterutils._iter_kinds)
+
+    def test_iter_raising_type_error(self):
+        # Whether these are iterable depends on the object so each one is
+        # tested no matter which order they're seen in
+        for first in (False, True):
+            tools.eq_(iterutils.isiterable(IterRaises(first)), first)
+            tools.eq_(iterutils.isiterable(IterRaises(not first)), not first)
+            tools.ok_(IterRaises not in iterutils._iter_kinds)
+        scalar = IterRaises(False)
+        tools.eq_(list(iterutils.iterate(IterRaises(True))), [1])
+        tools.eq_(list(iterutils.iterate(scalar)), [scalar])
+
+    def test_flatten_iter_raising_type_error(self):
+        scalar = IterRaises(False)
+        tools.eq_(list(iterutils.flatten([IterRaises(True), scalar,
+                [IterRaises(True)]])), [1, scalar, 1])
+        tools.eq_(list(iterutils.flatten(scalar)), [scalar])
+
+    def test_cache_overflow(self):
+        for i in range(iterutils._ITER_KINDS_MAX + 100):
+            iterutils.isiterable(type('Scalar%d' % i, (object,), {})())
+        tools.ok_(len(iterutils._iter_kinds) <= iterutils._ITER_KINDS_MAX)
+        # The builtin types are still answered without testing the object
+        iter_kind = iterutils._iter_kind
+        def not_cached(obj):
+            raise AssertionError('%r was not cached' % type(obj))
+        iterutils._iter_kind = not_cached
+        try:
+            tools.ok_(iterutils.isiterable([1]))
+            tools.ok_(not iterutils.isiterable(1))
+            tools.eq_(list(iterutils.iterate('ab')), ['ab'])
+            tools.eq_(list(iterutils.flatten([[1], (2,)])), [1, 2])
+        finally:
+            iterutils._iter_kind = iter_kind
+
+    def test_cached(self):
+        class Scalar(object):
+            pass
+        tools.ok_(not iterutils.isiterable(Scalar()))
+        tools.eq_(iterutils._iter_kinds[Scalar], iterutils._SCALAR)
+        tools.ok_(iterutils.isiterable(StrSubclass('ab'), include_string=True))
+        tools.ok_(not iterutils.isiterable(StrSubclass('ab')))
+        tools.eq_(list(iterutils.iterate(StrSubclass('ab'))), ['ab'])
+        tools.eq_(iterutils._iter_kinds[StrSubclass], iterutils._STRING)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# Benchmarks for the kitchen.iterutils batching helpers.  Each helper is timed
+# against the way people write it by hand.  See benchmark.py for how to run
+# them.
+import collections
+import unittest
+
+from nose import tools
+
+from kitchen import iterutils
+
+import benchmark
+
+# Number of items fed to each helper
+ITEMS = 100000
+
+def naive_chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def naive_sliding_window(iterable, size):
+    window = collections.deque(maxlen=size)
+    for item in iterable:
+        window.append(item)
+        if len(window) == size:
+            yield tuple(window)
+
+def naive_batched_by_size(iterable, max_bytes):
+    batch = []
+    total = 0
+    for item in iterable:
+        if batch and total + len(item) > max_bytes:
+            yield batch
+            batch = []
+            total = 0
+        batch.append(item)
+        total += len(item)
+    if batch:
+        yield batch
+
+def compare(fast, naive):
+    '''Time fast and naive after checking that they return the same items
+
+    :returns: tuple of (fast time, naive time) in seconds
+    '''
+    tools.eq_(list(fast()), list(naive()))
+    return (benchmark.best_time(lambda: list(fast())),
+            benchmark.best_time(lambda: list(naive())))
+
+def bench_chunked():
+    '''chunked() into lists of 100 items from :data:`ITEMS` ints'''
+    return compare(lambda: iterutils.chunked(range(ITEMS), 100),
+            lambda: naive_chunked(range(ITEMS), 100))
+
+def bench_sliding_window():
+    '''sliding_window() of 5 items over :data:`ITEMS` ints'''
+    return compare(lambda: iterutils.sliding_window(range(ITEMS), 5),
+            lambda: naive_sliding_window(range(ITEMS), 5))
+
+def bench_batched_by_size():
+    '''batched_by_size() with a 4096 byte budget over :data:`ITEMS` byte
+    strings of 1 to 64 bytes
+    '''
+    data = [b'x' * (i % 64 + 1) for i in range(ITEMS)]
+    return compare(lambda: iterutils.batched_by_size(data, 4096),
+            lambda: naive_batched_by_size(data, 4096))
+
+BENCHMARKS = (bench_chunked, bench_sliding_window, bench_batched_by_size)
+
+class TestIterutilsBenchmark(unittest.TestCase):
+    def setUp(self):
+        benchmark.require_benchmarks()
+
+    def test_chunked(self):
+        bench_chunked()
+
+    def test_sliding_window(self):
+        bench_sliding_window()
+
+    def test_batched_by_size(self):
+        bench_batched_by_size()
+
+if __name__ == '__main__':
+    benchmark.report(BENCHMARKS)
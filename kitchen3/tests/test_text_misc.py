@@ -4,6 +4,13 @@ import unittest
 from nose import tools
 from nose.plugins.skip import SkipTest
 
+import codecs
+import io
+import mmap
+import os
+import shutil
+import tempfile
+
 try:
     import chardet
 except ImportError:
@@ -44,6 +51,25 @@ class TestTextMisc(unittest.TestCase, base_classes.UnicodeTestData):
         else:
             raise SkipTest('chardet not installed, euc_jp will not be guessed correctly')
 
+    def test_chardet_attribute(self):
+        class StubChardet(object):
+            @staticmethod
+            def detect(byte_string):
+                return {'encoding': 'euc-jp', 'confidence': 0.99}
+
+        old_chardet = misc.__dict__.pop('chardet', None)
+        try:
+            # Setting the module attribute decides which chardet is used
+            misc.chardet = StubChardet
+            tools.eq_(misc.guess_encoding(self.latin1_spanish), 'euc-jp')
+            misc.chardet = None
+            tools.eq_(misc.guess_encoding(self.euc_jp_japanese), 'latin-1')
+        finally:
+            misc.__dict__.pop('chardet', None)
+            if old_chardet is not None:
+                misc.chardet = old_chardet
+        tools.ok_(misc.chardet is chardet)
+
     def test_guess_encoding_with_chardet_uninstalled(self):
         if chardet:
             raise SkipTest('chardet installed, euc_jp will not be mangled')
@@ -52,6 +78,92 @@ class TestTextMisc(unittest.TestCase, base_classes.UnicodeTestData):
                 misc.guess_encoding(self.euc_jp_japanese)) ==
                 self.u_mangled_euc_jp_as_latin1)
 
+    def test_detect_encoding(self):
+        tools.assert_raises(TypeError, misc.detect_encoding, self.u_spanish)
+
+        tools.eq_(misc.detect_encoding(self.b_ascii, disable_chardet=True), ('utf-8', 1.0))
+        tools.eq_(misc.detect_encoding(self.utf8_spanish, disable_chardet=True), ('utf-8', 1.0))
+        tools.eq_(misc.detect_encoding(self.latin1_spanish, disable_chardet=True), ('latin-1', 0.0))
+        tools.eq_(misc.detect_encoding(bytearray(self.utf8_japanese), disable_chardet=True), ('utf-8', 1.0))
+
+    def test_detect_encoding_large_input(self):
+        # Inputs larger than the decode chunk size are validated
+        # incrementally.  Make sure multibyte characters split across chunk
+        # boundaries don't confuse the validation
+        big_utf8 = self.utf8_japanese * (misc._DECODE_CHUNK_SIZE // len(self.utf8_japanese) + 7)
+        tools.eq_(misc.detect_encoding(big_utf8, disable_chardet=True), ('utf-8', 1.0))
+        tools.eq_(misc.detect_encoding(big_utf8 + b'\xff', disable_chardet=True), ('latin-1', 0.0))
+        tools.eq_(misc.detect_encoding(big_utf8[:-1], disable_chardet=True), ('latin-1', 0.0))
+
+    def test_guess_file_encoding(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            files = {'utf8': self.utf8_spanish,
+                    'latin1': self.latin1_spanish,
+                    'empty': b'',
+                    'bom8': codecs.BOM_UTF8 + self.utf8_spanish,
+                    'bom16': self.u_spanish.encode('utf-16'),
+                    'bom32': self.u_spanish.encode('utf-32'),
+                    }
+            expected = {'utf8': ('utf-8', 1.0),
+                    'latin1': ('latin-1', 0.0),
+                    'empty': ('utf-8', 1.0),
+                    'bom8': ('utf-8-sig', 1.0),
+                    'bom16': ('utf-16', 1.0),
+                    'bom32': ('utf-32', 1.0),
+                    }
+            paths = {}
+            for name, data in files.items():
+                paths[name] = os.path.join(tmpdir, name)
+                with open(paths[name], 'wb') as f:
+                    f.write(data)
+
+            for name, path in paths.items():
+                tools.eq_(misc.guess_file_encoding(path, disable_chardet=True),
+                        expected[name])
+                with open(path, 'rb') as f:
+                    tools.eq_(misc.guess_file_encoding(f, disable_chardet=True),
+                            expected[name])
+                tools.eq_(misc.guess_file_encoding(io.BytesIO(files[name]),
+                    disable_chardet=True), expected[name])
+
+            results = misc.guess_file_encodings(paths.values(), workers=2,
+                    disable_chardet=True)
+            tools.eq_(results, dict((paths[n], expected[n]) for n in paths))
+
+            tools.assert_raises(OSError, misc.guess_file_encoding,
+                    os.path.join(tmpdir, 'nonexistent'))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_guess_file_encoding_pipe(self):
+        # Pipes can't be memory mapped so they're read instead
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(write_fd, 'wb') as pipe:
+            pipe.write(self.latin1_spanish)
+        with os.fdopen(read_fd, 'rb') as pipe:
+            tools.eq_(misc.guess_file_encoding(pipe, disable_chardet=True),
+                    ('latin-1', 0.0))
+
+    def test_guess_file_encoding_position(self):
+        data = self.latin1_spanish + codecs.BOM_UTF8 + self.utf8_spanish
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'data')
+            with open(path, 'wb') as f:
+                f.write(data)
+            # Files and in memory objects both start at the current position
+            with open(path, 'rb') as f:
+                f.seek(len(self.latin1_spanish))
+                tools.eq_(misc.guess_file_encoding(f, disable_chardet=True),
+                        ('utf-8-sig', 1.0))
+            memory = io.BytesIO(data)
+            memory.seek(len(self.latin1_spanish))
+            tools.eq_(misc.guess_file_encoding(memory, disable_chardet=True),
+                    ('utf-8-sig', 1.0))
+        finally:
+            shutil.rmtree(tmpdir)
+
     def test_str_eq(self):
         # str vs str:
         tools.ok_(misc.str_eq(self.euc_jp_japanese, self.euc_jp_japanese) == True)
@@ -106,6 +218,50 @@ class TestTextMisc(unittest.TestCase, base_classes.UnicodeTestData):
         tools.ok_(misc.process_control_chars(self.u_ascii_chars,
             strategy='replace') == self.u_ascii_ctrl_replace)
 
+    def test_process_control_chars_strict_offset(self):
+        try:
+            misc.process_control_chars('abc\x01', strategy='strict')
+        except ControlCharError as exc:
+            tools.eq_(exc.offset, 3)
+        else:
+            tools.ok_(False, 'ControlCharError not raised')
+        tools.assert_raises(ValueError, misc.process_control_chars, 'abc',
+                strategy='foo')
+
+    def test_process_control_chars_table(self):
+        table = misc.ControlCharTable({'\x01': ' ', 2: None, '\x03': 'x'})
+        tools.eq_(table.chars, frozenset(('\x01', '\x02', '\x03')))
+        tools.eq_(misc.process_control_chars('a\x01b\x02c\x03d\x04',
+            strategy=table), 'a bcxd\x04')
+        tools.eq_(misc.process_control_chars('plain', strategy=table), 'plain')
+
+    def test_process_control_chars_stream(self):
+        chunks = [self.u_ascii_chars[i:i + 7]
+                for i in range(0, len(self.u_ascii_chars), 7)]
+        tools.eq_(''.join(misc.process_control_chars_stream(chunks,
+            strategy='ignore')), self.u_ascii_no_ctrl)
+        tools.eq_(''.join(misc.process_control_chars_stream(
+            io.StringIO(self.u_ascii_chars), chunk_size=5)),
+            self.u_ascii_ctrl_replace)
+
+        # Chunks without control chars are passed through untouched
+        clean = ['abc', 'def']
+        tools.eq_([id(c) for c in misc.process_control_chars_stream(clean)],
+                [id(c) for c in clean])
+
+        try:
+            list(misc.process_control_chars_stream(
+                io.StringIO('abcdefgh\x01'), strategy='strict', chunk_size=3))
+        except ControlCharError as exc:
+            tools.eq_(exc.offset, 8)
+        else:
+            tools.ok_(False, 'ControlCharError not raised')
+
+        tools.assert_raises(TypeError, list,
+                misc.process_control_chars_stream([b'bytes']))
+        tools.assert_raises(ValueError, misc.process_control_chars_stream,
+                ['abc'], strategy='foo')
+
     def test_html_entities_unescape(self):
         tools.assert_raises(TypeError, misc.html_entities_unescape, b'byte string')
         tools.ok_(misc.html_entities_unescape(self.u_entity_escape) == self.u_entity)
@@ -126,10 +282,65 @@ class TestTextMisc(unittest.TestCase, base_classes.UnicodeTestData):
 
         tools.ok_(misc.byte_string_valid_xml(self.utf8_ascii_chars) == False)
 
+    def test_byte_string_valid_xml_buffer_types(self):
+        tools.ok_(misc.byte_string_valid_xml(bytearray(self.utf8_japanese)))
+        tools.ok_(misc.byte_string_valid_xml(memoryview(self.utf8_japanese)))
+        tools.ok_(misc.byte_string_valid_xml(memoryview(self.utf8_ascii_chars)) == False)
+        # Same types as find_invalid_xml() accepts
+        for data in (self.utf8_japanese, self.utf8_ascii_chars):
+            with tempfile.TemporaryFile() as f:
+                f.write(data)
+                f.flush()
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    tools.eq_(misc.byte_string_valid_xml(mapped),
+                            misc.find_invalid_xml(mapped) == -1)
+                finally:
+                    mapped.close()
+        tools.ok_(misc.byte_string_valid_xml(None) == False)
+
+    def test_find_invalid_xml(self):
+        tools.assert_raises(TypeError, misc.find_invalid_xml, 'unicode string')
+
+        tools.eq_(misc.find_invalid_xml(self.utf8_japanese), -1)
+        tools.eq_(misc.find_invalid_xml(self.euc_jp_japanese, 'euc_jp'), -1)
+        tools.eq_(misc.find_invalid_xml(self.latin1_spanish, 'latin-1'), -1)
+
+        tools.eq_(misc.find_invalid_xml(b'abc\x01def'), 3)
+        tools.eq_(misc.find_invalid_xml(b'abc\x01def', 'latin-1'), 3)
+        tools.eq_(misc.find_invalid_xml(b'abc\x01def', 'euc_jp'), 3)
+        # C1 control codes
+        tools.eq_(misc.find_invalid_xml('ab\x85'.encode('utf-8')), 2)
+        tools.eq_(misc.find_invalid_xml(b'ab\x85', 'latin-1'), 2)
+        # Whichever comes first, invalid byte or control char, is reported
+        tools.eq_(misc.find_invalid_xml(b'ab\xffc\x01'), 2)
+        tools.eq_(misc.find_invalid_xml(b'a\x01b\xffc'), 1)
+        tools.eq_(misc.find_invalid_xml(self.euc_jp_japanese + b'\x01', 'euc_jp'),
+                len(self.euc_jp_japanese))
+
+    def test_find_invalid_encoding(self):
+        tools.assert_raises(TypeError, misc.find_invalid_encoding, 'unicode string')
+        tools.eq_(misc.find_invalid_encoding(self.utf8_japanese), -1)
+        tools.eq_(misc.find_invalid_encoding(memoryview(self.utf8_japanese)), -1)
+        tools.eq_(misc.find_invalid_encoding(b'abc\xff'), 3)
+        tools.eq_(misc.find_invalid_encoding(self.euc_jp_japanese, 'euc_jp'), -1)
+
+        # Larger than one decode chunk
+        big = self.utf8_japanese * (misc._DECODE_CHUNK_SIZE // len(self.utf8_japanese) + 7)
+        tools.eq_(misc.find_invalid_encoding(big), -1)
+        tools.eq_(misc.find_invalid_encoding(big + b'\xffabc'), len(big))
+        tools.eq_(misc.find_invalid_encoding(big + self.utf8_japanese[:-1]),
+                len(big) + len(self.utf8_japanese) - 3)
+        tools.eq_(misc.find_invalid_xml(bytearray(big + b'\x01')), len(big))
+        big = self.euc_jp_japanese * (misc._DECODE_CHUNK_SIZE // len(self.euc_jp_japanese) + 7)
+        tools.eq_(misc.find_invalid_xml(big + b'\x01', 'euc_jp'), len(big))
+
     def test_byte_string_valid_encoding(self):
         '''Test that a byte sequence is validated'''
         tools.ok_(misc.byte_string_valid_encoding(self.utf8_japanese) == True)
         tools.ok_(misc.byte_string_valid_encoding(self.euc_jp_japanese, encoding='euc_jp') == True)
+        tools.ok_(misc.byte_string_valid_encoding(bytearray(self.utf8_japanese)) == True)
+        tools.ok_(misc.byte_string_valid_encoding(memoryview(self.utf8_japanese)) == True)
 
     def test_byte_string_invalid_encoding(self):
         '''Test that we return False with non-encoded chars'''